@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import asyncio
+from dataclasses import asdict
 import ipaddress
 import logging
 from datetime import timedelta
@@ -11,29 +12,45 @@ import voluptuous as vol
 from alphaess import alphaess
 
 from homeassistant.config_entries import ConfigEntry, ConfigSubentry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
 from homeassistant.helpers import device_registry as dr, entity_registry as er
-from homeassistant.util import slugify
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.util import dt as dt_util, slugify
 
 import homeassistant.helpers.config_validation as cv
 
 from .const import (
+    BULK_WRITE_CONCURRENCY,
     CONF_SCAN_INTERVAL_SECONDS,
     CONF_DISABLE_NOTIFICATIONS,
     CONF_EV_CHARGER_MODEL,
     CONF_INVERTER_MODEL,
     CONF_IP_ADDRESS,
+    CONF_LOCAL_FIRST,
     DEFAULT_SCAN_INTERVAL_SECONDS,
+    DISCOVERY_INTERVAL,
     MAX_SCAN_INTERVAL_SECONDS,
     MIN_SCAN_INTERVAL_SECONDS,
     CONF_PARENT_INVERTER,
     CONF_SERIAL_NUMBER,
     DOMAIN,
     PLATFORMS,
+    SIGNAL_SUBENTRY_UPDATED,
     SUBENTRY_TYPE_EV_CHARGER,
     SUBENTRY_TYPE_INVERTER,
 )
 from .coordinator import AlphaESSDataUpdateCoordinator
+from .fleet import soc_target, split_target, window_hours
+from .optimizer import slot_values
+from .simulator import ScheduleConfig
 from .enums import AlphaESSNames
 
 _LOGGER = logging.getLogger(__name__)
@@ -50,6 +67,85 @@ SERVICE_BATTERY_CHARGE_SCHEMA = vol.Schema(
     }
 )
 
+SERVICE_BACKFILL_HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional('serial'): cv.string,
+        vol.Optional('days', default=7): vol.All(cv.positive_int, vol.Range(min=1, max=365)),
+    }
+)
+
+# A curve is a day of numbers from midnight, or entries with a start time and value
+CURVE_SCHEMA = vol.All(cv.ensure_list, [vol.Any(vol.Coerce(float), dict)])
+
+SERVICE_OPTIMIZE_SCHEDULE_SCHEMA = vol.All(
+    vol.Schema(
+        {
+            vol.Required('serial'): cv.string,
+            vol.Optional('prices'): CURVE_SCHEMA,
+            vol.Optional('price_entity'): cv.entity_id,
+            vol.Optional('price_attribute'): cv.string,
+            vol.Optional('export_price', default=0.0): vol.Any(vol.Coerce(float), CURVE_SCHEMA),
+            vol.Optional('load_forecast'): CURVE_SCHEMA,
+            vol.Optional('pv_forecast'): CURVE_SCHEMA,
+            vol.Optional('pv_forecast_entity'): cv.entity_id,
+            vol.Optional('pv_forecast_attribute'): cv.string,
+            vol.Optional('max_power'): vol.All(vol.Coerce(float), vol.Range(min=0.1)),
+            vol.Optional('apply', default=True): cv.boolean,
+        }
+    ),
+    cv.has_at_least_one_key('prices', 'price_entity'),
+)
+
+SCHEDULE_SCHEMA = vol.Schema(
+    {
+        vol.Optional('name'): cv.string,
+        vol.Optional('charge_enabled'): cv.boolean,
+        vol.Optional('cp1start'): cv.string,
+        vol.Optional('cp1end'): cv.string,
+        vol.Optional('cp2start'): cv.string,
+        vol.Optional('cp2end'): cv.string,
+        vol.Optional('chargestopsoc'): vol.All(cv.positive_int, vol.Range(min=0, max=100)),
+        vol.Optional('discharge_enabled'): cv.boolean,
+        vol.Optional('dp1start'): cv.string,
+        vol.Optional('dp1end'): cv.string,
+        vol.Optional('dp2start'): cv.string,
+        vol.Optional('dp2end'): cv.string,
+        vol.Optional('dischargecutoffsoc'): vol.All(cv.positive_int, vol.Range(min=0, max=100)),
+    }
+)
+
+SERVICE_SIMULATE_SCHEDULE_SCHEMA = vol.Schema(
+    {
+        vol.Required('serial'): cv.string,
+        vol.Required('schedules'): vol.All(cv.ensure_list, [SCHEDULE_SCHEMA]),
+        vol.Optional('days', default=7): vol.All(cv.positive_int, vol.Range(min=1, max=365)),
+        vol.Optional('prices'): CURVE_SCHEMA,
+        vol.Optional('export_price', default=0.0): vol.Coerce(float),
+        vol.Optional('max_power'): vol.All(vol.Coerce(float), vol.Range(min=0.1)),
+    }
+)
+
+SERVICE_DISTRIBUTE_POWER_SCHEMA = vol.Schema(
+    {
+        vol.Required('direction'): vol.In(['charge', 'discharge']),
+        vol.Required('energy'): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Required('start'): cv.string,
+        vol.Required('end'): cv.string,
+        vol.Optional('serials'): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional('max_soc', default=100): vol.All(cv.positive_int, vol.Range(min=0, max=100)),
+        vol.Optional('min_soc', default=10): vol.All(cv.positive_int, vol.Range(min=0, max=100)),
+    }
+)
+
+# Attributes price and forecast integrations publish their curves in
+CURVE_ATTRIBUTES = (
+    ("raw_today", "raw_tomorrow"),
+    ("forecasts",),
+    ("prices",),
+    ("detailedForecast",),
+    ("today", "tomorrow"),
+)
+
 SERVICE_BATTERY_DISCHARGE_SCHEMA = vol.Schema(
     {
         vol.Required('serial'): cv.string,
@@ -62,6 +158,241 @@ SERVICE_BATTERY_DISCHARGE_SCHEMA = vol.Schema(
     }
 )
 
+# Service field -> coordinator data key, per config section
+CHARGE_SERVICE_FIELDS = {
+    'enabled': 'gridCharge',
+    'cp1start': 'charge_timeChaf1',
+    'cp1end': 'charge_timeChae1',
+    'cp2start': 'charge_timeChaf2',
+    'cp2end': 'charge_timeChae2',
+    'chargestopsoc': AlphaESSNames.batHighCap,
+}
+
+DISCHARGE_SERVICE_FIELDS = {
+    'enabled': 'ctrDis',
+    'dp1start': 'discharge_timeDisf1',
+    'dp1end': 'discharge_timeDise1',
+    'dp2start': 'discharge_timeDisf2',
+    'dp2end': 'discharge_timeDise2',
+    'dischargecutoffsoc': AlphaESSNames.batUseCap,
+}
+
+
+def _bulk_schema(fields: dict) -> vol.All:
+    """Return a bulk service schema: shared settings plus serials and/or per-serial settings."""
+    settings = {
+        vol.Optional(field): (
+            cv.boolean if field == 'enabled'
+            else vol.All(cv.positive_int, vol.Range(min=0, max=100)) if field.endswith('soc')
+            else cv.string
+        )
+        for field in fields
+    }
+    return vol.All(
+        vol.Schema(
+            {
+                vol.Optional('serials'): vol.All(cv.ensure_list, [cv.string]),
+                vol.Optional('systems'): {cv.string: vol.Schema(settings)},
+                **settings,
+            }
+        ),
+        cv.has_at_least_one_key('serials', 'systems'),
+    )
+
+
+SERVICE_BATTERY_CHARGE_BULK_SCHEMA = _bulk_schema(CHARGE_SERVICE_FIELDS)
+SERVICE_BATTERY_DISCHARGE_BULK_SCHEMA = _bulk_schema(DISCHARGE_SERVICE_FIELDS)
+
+
+def _get_coordinators(hass: HomeAssistant) -> list[AlphaESSDataUpdateCoordinator]:
+    """Return the coordinators of all loaded AlphaESS entries."""
+    return [
+        value for value in hass.data.get(DOMAIN, {}).values()
+        if isinstance(value, AlphaESSDataUpdateCoordinator)
+    ]
+
+
+async def _async_bulk_config(
+    hass: HomeAssistant, call: ServiceCall, section: str, fields: dict[str, str]
+) -> ServiceResponse:
+    """Apply one config section to many inverters and report per serial.
+
+    Settings given at the top level apply to every serial; ``systems``
+    entries override them per serial. Writes go through each inverter's
+    command queue, so they respect the API throttle, and at most
+    BULK_WRITE_CONCURRENCY inverters are written and awaited at once.
+    """
+    shared = {field: call.data[field] for field in fields if field in call.data}
+    targets = {serial: dict(shared) for serial in call.data.get('serials', [])}
+    for serial, overrides in call.data.get('systems', {}).items():
+        targets.setdefault(serial, dict(shared)).update(overrides)
+
+    for serial, settings in targets.items():
+        if missing := [field for field in fields if field not in settings]:
+            raise ServiceValidationError(f"Missing {', '.join(missing)} for {serial}")
+
+    owners = {
+        serial: coordinator
+        for coordinator in _get_coordinators(hass)
+        for serial in coordinator.data or {}
+    }
+    semaphore = asyncio.Semaphore(BULK_WRITE_CONCURRENCY)
+
+    async def apply(serial: str, settings: dict) -> dict:
+        coordinator = owners.get(serial)
+        if coordinator is None:
+            return {'status': 'unknown_serial'}
+
+        # Field maps list enabled, period 1 start/end, period 2 start/end, SOC
+        enabled, start1, end1, start2, end2, soc = (settings[field] for field in fields)
+        if section == "ChargeConfig":
+            build = coordinator.charge_config_values
+        else:
+            build = coordinator.discharge_config_values
+        changes = build(soc, int(enabled is True), start1, end1, start2, end2)
+
+        async with semaphore:
+            try:
+                status = await coordinator.async_apply_config(serial, section, changes)
+            except Exception as err:  # Report per serial instead of failing the whole call
+                _LOGGER.error(f"Bulk {section} write failed for {serial}: {err}")
+                return {'status': 'failed', 'error': str(err)}
+
+        serial_data = coordinator.data.get(serial, {})
+        config = {field: serial_data.get(key) for field, key in fields.items()}
+        if config['enabled'] is not None:
+            config['enabled'] = bool(int(config['enabled']))
+        return {'status': status, 'config': config}
+
+    results = await asyncio.gather(*(apply(serial, settings) for serial, settings in targets.items()))
+    return {'results': dict(zip(targets, results))}
+
+
+async def _async_distribute_power(hass: HomeAssistant, call: ServiceCall) -> ServiceResponse:
+    """Split a site charge or discharge target (kWh) over the inverters and apply it.
+
+    Each inverter gets period 1 set to the window and a SOC limit that
+    stops it once its share has moved; period 2 is left as it is. Shares
+    follow each battery's headroom to ``max_soc``/``min_soc``, capped at
+    what the inverter power can move within the window. Writes run like
+    the bulk services, at most BULK_WRITE_CONCURRENCY at a time.
+    """
+    charge = call.data['direction'] == 'charge'
+    start, end = call.data['start'], call.data['end']
+    hours = window_hours(start, end)
+    if not hours:
+        raise ServiceValidationError("The window start and end must differ")
+
+    requested = call.data.get('serials')
+    owners = {
+        serial: coordinator
+        for coordinator in _get_coordinators(hass)
+        for serial in coordinator.data or {}
+        if requested is None or serial in requested
+    }
+    results: dict[str, dict] = {
+        serial: {'status': 'unknown_serial'} for serial in requested or [] if serial not in owners
+    }
+
+    batteries = {}
+    for serial, coordinator in owners.items():
+        serial_data = coordinator.data[serial]
+        installed = serial_data.get(AlphaESSNames.cobat)
+        power = serial_data.get(AlphaESSNames.poinv)
+        stored = serial_data.get(AlphaESSNames.surplusCobat)
+        soc = serial_data.get(AlphaESSNames.BatterySOC)
+        if not installed or not power or (stored is None and soc is None):
+            results[serial] = {'status': 'no_battery_data'}
+            continue
+        installed = float(installed)
+        stored = float(stored) if stored is not None else installed * float(soc) / 100
+        headroom = (
+            installed * call.data['max_soc'] / 100 - stored if charge
+            else stored - installed * call.data['min_soc'] / 100
+        )
+        batteries[serial] = (installed, stored, headroom, float(power) * hours)
+
+    shares = split_target(
+        call.data['energy'],
+        [battery[2] for battery in batteries.values()],
+        [battery[3] for battery in batteries.values()],
+    ) if batteries else []
+    semaphore = asyncio.Semaphore(BULK_WRITE_CONCURRENCY)
+
+    async def apply(serial: str, share: float) -> dict:
+        installed, stored, _, _ = batteries[serial]
+        if share <= 0:
+            return {'status': 'skipped', 'share': 0.0}
+
+        coordinator = owners[serial]
+        limit = soc_target(stored, installed, share, charge)
+        schedule = coordinator.current_schedule(serial)
+        if charge:
+            (start2, end2) = schedule.charge_windows[1]
+            section = "ChargeConfig"
+            changes = coordinator.charge_config_values(limit, 1, start, end, start2, end2)
+        else:
+            (start2, end2) = schedule.discharge_windows[1]
+            section = "DisChargeConfig"
+            changes = coordinator.discharge_config_values(limit, 1, start, end, start2, end2)
+
+        async with semaphore:
+            try:
+                status = await coordinator.async_apply_config(serial, section, changes)
+            except Exception as err:  # Report per serial instead of failing the whole call
+                _LOGGER.error(f"Fleet {section} write failed for {serial}: {err}")
+                return {'status': 'failed', 'share': round(share, 3), 'error': str(err)}
+        return {'status': status, 'share': round(share, 3), 'soc_limit': limit}
+
+    applied = await asyncio.gather(*(apply(serial, float(share)) for serial, share in zip(batteries, shares)))
+    results.update(zip(batteries, applied))
+    allocated = float(sum(shares))
+    return {
+        'allocated': round(allocated, 3),
+        'unallocated': round(call.data['energy'] - allocated, 3),
+        'results': results,
+    }
+
+
+def _curve_from_entity(hass: HomeAssistant, entity_id: str, attribute: str | None) -> list:
+    """Return the curve a price or forecast entity publishes in its attributes."""
+    state = hass.states.get(entity_id)
+    if state is None:
+        raise ServiceValidationError(f"Entity {entity_id} not found")
+
+    if attribute:
+        curve = state.attributes.get(attribute)
+    else:
+        curve = next((
+            [entry for name in names for entry in state.attributes.get(name) or []]
+            for names in CURVE_ATTRIBUTES
+            if any(state.attributes.get(name) for name in names)
+        ), None)
+    if not curve or not isinstance(curve, list):
+        raise ServiceValidationError(f"Entity {entity_id} has no curve attribute")
+    return curve
+
+
+def _schedule_from_fields(base: ScheduleConfig, fields: dict) -> ScheduleConfig:
+    """Return a schedule from service fields, taking unset ones from ``base``."""
+    charge = [list(window) for window in base.charge_windows]
+    discharge = [list(window) for window in base.discharge_windows]
+    for period in (1, 2):
+        for position, edge in enumerate(('start', 'end')):
+            if f'cp{period}{edge}' in fields:
+                charge[period - 1][position] = fields[f'cp{period}{edge}']
+            if f'dp{period}{edge}' in fields:
+                discharge[period - 1][position] = fields[f'dp{period}{edge}']
+
+    return ScheduleConfig(
+        grid_charge=fields.get('charge_enabled', base.grid_charge),
+        charge_windows=[tuple(window) for window in charge],
+        discharge_control=fields.get('discharge_enabled', base.discharge_control),
+        discharge_windows=[tuple(window) for window in discharge],
+        max_soc=fields.get('chargestopsoc', base.max_soc),
+        min_soc=fields.get('dischargecutoffsoc', base.min_soc),
+    )
+
 
 def _build_ip_address_map(entry: ConfigEntry) -> dict[str, str | None]:
     """Build a mapping of serial number to IP address from subentries."""
@@ -83,6 +414,17 @@ def _build_ip_address_map(entry: ConfigEntry) -> dict[str, str | None]:
     return ip_map
 
 
+def _build_local_first_serials(entry: ConfigEntry) -> set[str]:
+    """Return the serials of inverters whose local API takes priority over the cloud."""
+    return {
+        subentry.data[CONF_SERIAL_NUMBER]
+        for subentry in entry.subentries.values()
+        if subentry.subentry_type == SUBENTRY_TYPE_INVERTER
+        and subentry.data.get(CONF_LOCAL_FIRST)
+        and subentry.data.get(CONF_SERIAL_NUMBER)
+    }
+
+
 def _build_inverter_model_list(entry: ConfigEntry) -> list[str]:
     """Build a list of inverter models from subentries."""
     models = []
@@ -94,6 +436,32 @@ def _build_inverter_model_list(entry: ConfigEntry) -> list[str]:
     return models
 
 
+def _get_verify_ssl(entry: ConfigEntry) -> bool:
+    """Return the SSL verification setting for an entry."""
+    return entry.options.get(
+        "Verify SSL Certificate",
+        entry.data.get("Verify SSL Certificate", True)
+    )
+
+
+def _get_scan_interval(entry: ConfigEntry) -> timedelta:
+    """Return the configured scan interval, clamped to the supported range."""
+    scan_interval_seconds = entry.options.get(
+        CONF_SCAN_INTERVAL_SECONDS,
+        DEFAULT_SCAN_INTERVAL_SECONDS,
+    )
+    try:
+        scan_interval_seconds = int(scan_interval_seconds)
+    except (TypeError, ValueError):
+        scan_interval_seconds = DEFAULT_SCAN_INTERVAL_SECONDS
+
+    scan_interval_seconds = max(
+        MIN_SCAN_INTERVAL_SECONDS,
+        min(MAX_SCAN_INTERVAL_SECONDS, scan_interval_seconds),
+    )
+    return timedelta(seconds=scan_interval_seconds)
+
+
 def _has_inverter_subentries(entry: ConfigEntry) -> bool:
     """Check if entry has any inverter subentries."""
     return any(
@@ -102,6 +470,96 @@ def _has_inverter_subentries(entry: ConfigEntry) -> bool:
     )
 
 
+@callback
+def _async_add_inverter_subentries(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    ess_list: list[dict],
+    first_ip: str = "",
+    disable_notifications: bool = True,
+) -> None:
+    """Create inverter subentries for systems in the ESS list that have none."""
+    existing_serials = {
+        sub.data.get(CONF_SERIAL_NUMBER)
+        for sub in entry.subentries.values()
+        if sub.subentry_type == SUBENTRY_TYPE_INVERTER
+    }
+
+    for idx, unit in enumerate(ess_list):
+        serial = unit.get("sysSn")
+        if not serial or serial in existing_serials:
+            continue
+
+        model = unit.get("minv", "Unknown")
+        # Assign migrated IP to the first inverter only
+        ip_for_inverter = first_ip if idx == 0 and first_ip else ""
+
+        _LOGGER.info("Discovered new inverter %s (%s)", serial, model)
+        subentry = ConfigSubentry(
+            data={
+                CONF_SERIAL_NUMBER: serial,
+                CONF_INVERTER_MODEL: model,
+                CONF_IP_ADDRESS: ip_for_inverter,
+                CONF_DISABLE_NOTIFICATIONS: disable_notifications,
+            },
+            subentry_type=SUBENTRY_TYPE_INVERTER,
+            title=f"{model} ({serial})",
+            unique_id=f"{SUBENTRY_TYPE_INVERTER}_{serial}",
+        )
+        hass.config_entries.async_add_subentry(entry, subentry)
+        existing_serials.add(serial)
+
+
+@callback
+def _async_add_ev_charger_subentries(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    coordinator: AlphaESSDataUpdateCoordinator,
+) -> None:
+    """Create EV charger subentries for any chargers present in coordinator data."""
+    existing_ev_serials = {
+        sub.data.get(CONF_SERIAL_NUMBER)
+        for sub in entry.subentries.values()
+        if sub.subentry_type == SUBENTRY_TYPE_EV_CHARGER
+    }
+    for serial, data in coordinator.data.items():
+        ev_sn = data.get("EV Charger S/N")
+        if ev_sn and ev_sn not in existing_ev_serials:
+            ev_model = data.get("EV Charger Model", "Unknown")
+            ev_subentry = ConfigSubentry(
+                data={
+                    CONF_SERIAL_NUMBER: ev_sn,
+                    CONF_EV_CHARGER_MODEL: ev_model,
+                    CONF_PARENT_INVERTER: serial,
+                },
+                subentry_type=SUBENTRY_TYPE_EV_CHARGER,
+                title=f"{ev_model} ({ev_sn})",
+                unique_id=f"{SUBENTRY_TYPE_EV_CHARGER}_{ev_sn}",
+            )
+            hass.config_entries.async_add_subentry(entry, ev_subentry)
+            existing_ev_serials.add(ev_sn)
+
+
+@callback
+def _async_discover_systems(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    coordinator: AlphaESSDataUpdateCoordinator,
+) -> None:
+    """Add subentries for inverters and EV chargers that appeared since setup.
+
+    The system list comes from the coordinator's last successful refresh,
+    so discovery makes no API calls of its own. New subentries are picked
+    up by the update listener, which fetches their data and adds their
+    entities without reloading the entry.
+    """
+    if coordinator.ess_list:
+        _async_add_inverter_subentries(hass, entry, coordinator.ess_list)
+
+    if coordinator.cloud_available:
+        _async_add_ev_charger_subentries(hass, entry, coordinator)
+
+
 def _migrate_entity_ids(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Rename entity IDs to include inverter serial prefix.
 
@@ -196,10 +654,7 @@ def _cleanup_stale_ev_entities(
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Alpha ESS from a config entry."""
 
-    verify_ssl = entry.options.get(
-        "Verify SSL Certificate",
-        entry.data.get("Verify SSL Certificate", True)
-    )
+    verify_ssl = _get_verify_ssl(entry)
 
     # Build per-inverter IP address mapping from subentries
     ip_address_map = _build_ip_address_map(entry)
@@ -224,27 +679,11 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             entry.data.get("Disable Notifications On Charge/Discharge Confirmation", True),
         )
 
-        for idx, unit in enumerate(ess_list):
-            serial = unit.get("sysSn")
-            if not serial:
-                continue
-
-            model = unit.get("minv", "Unknown")
-            # Assign migrated IP to the first inverter only
-            ip_for_inverter = migrated_ip if idx == 0 and migrated_ip else ""
-
-            subentry = ConfigSubentry(
-                data={
-                    CONF_SERIAL_NUMBER: serial,
-                    CONF_INVERTER_MODEL: model,
-                    CONF_IP_ADDRESS: ip_for_inverter,
-                    CONF_DISABLE_NOTIFICATIONS: migrated_disable_notif,
-                },
-                subentry_type=SUBENTRY_TYPE_INVERTER,
-                title=f"{model} ({serial})",
-                unique_id=f"{SUBENTRY_TYPE_INVERTER}_{serial}",
-            )
-            hass.config_entries.async_add_subentry(entry, subentry)
+        _async_add_inverter_subentries(
+            hass, entry, ess_list,
+            first_ip=migrated_ip,
+            disable_notifications=migrated_disable_notif,
+        )
 
         # Clear the temporary migrated IP from options (keep cleanup flag)
         if migrated_ip:
@@ -259,20 +698,6 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     inverter_models = _build_inverter_model_list(entry)
 
-    scan_interval_seconds = entry.options.get(
-        CONF_SCAN_INTERVAL_SECONDS,
-        DEFAULT_SCAN_INTERVAL_SECONDS,
-    )
-    try:
-        scan_interval_seconds = int(scan_interval_seconds)
-    except (TypeError, ValueError):
-        scan_interval_seconds = DEFAULT_SCAN_INTERVAL_SECONDS
-
-    scan_interval_seconds = max(
-        MIN_SCAN_INTERVAL_SECONDS,
-        min(MAX_SCAN_INTERVAL_SECONDS, scan_interval_seconds),
-    )
-
     await asyncio.sleep(1)
 
     _coordinator = AlphaESSDataUpdateCoordinator(
@@ -281,34 +706,21 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         ip_address_map=ip_address_map,
         inverter_models=inverter_models,
         entry=entry,
-        scan_interval=timedelta(seconds=scan_interval_seconds),
+        scan_interval=_get_scan_interval(entry),
+        local_first_serials=_build_local_first_serials(entry),
     )
+    # Changes saved during an outage before a restart are replayed on refresh
+    await _coordinator.offline_writes.async_load()
+    await _coordinator.energy_stats.async_load()
+    await _coordinator.battery_wear.async_load()
+    await _coordinator.pv_strings.async_load()
     await _coordinator.async_config_entry_first_refresh()
 
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = _coordinator
 
     # Auto-create EV charger subentries for any discovered chargers
-    existing_ev_serials = {
-        sub.data.get(CONF_SERIAL_NUMBER)
-        for sub in entry.subentries.values()
-        if sub.subentry_type == SUBENTRY_TYPE_EV_CHARGER
-    }
-    for serial, data in _coordinator.data.items():
-        ev_sn = data.get("EV Charger S/N")
-        if ev_sn and ev_sn not in existing_ev_serials:
-            ev_model = data.get("EV Charger Model", "Unknown")
-            ev_subentry = ConfigSubentry(
-                data={
-                    CONF_SERIAL_NUMBER: ev_sn,
-                    CONF_EV_CHARGER_MODEL: ev_model,
-                    CONF_PARENT_INVERTER: serial,
-                },
-                subentry_type=SUBENTRY_TYPE_EV_CHARGER,
-                title=f"{ev_model} ({ev_sn})",
-                unique_id=f"{SUBENTRY_TYPE_EV_CHARGER}_{ev_sn}",
-            )
-            hass.config_entries.async_add_subentry(entry, ev_subentry)
-            existing_ev_serials.add(ev_sn)
+    _async_add_ev_charger_subentries(hass, entry, _coordinator)
+    _coordinator.sync_subentries(entry, inverter_models)
 
     # One-time cleanup: remove stale EV entities no longer supported by data.
     # Only run when cloud data is available; in local-fallback mode EV keys are
@@ -350,6 +762,21 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     entry.async_on_unload(entry.add_update_listener(update_listener))
 
+    # Periodically look for newly bound inverters and EV chargers
+    @callback
+    def _async_discovery_tick(_now) -> None:
+        _async_discover_systems(hass, entry, _coordinator)
+
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass,
+            _async_discovery_tick,
+            DISCOVERY_INTERVAL,
+            name=f"{DOMAIN} system discovery",
+            cancel_on_shutdown=True,
+        )
+    )
+
     # Register services (only once per domain)
     if not hass.services.has_service(DOMAIN, 'setbatterycharge'):
         async def async_battery_charge_handler(call):
@@ -374,20 +801,206 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         hass.services.async_register(
             DOMAIN, 'setbatterydischarge', async_battery_discharge_handler, SERVICE_BATTERY_DISCHARGE_SCHEMA)
 
+    if not hass.services.has_service(DOMAIN, 'setbatterychargebulk'):
+        async def async_battery_charge_bulk_handler(call: ServiceCall) -> ServiceResponse:
+            return await _async_bulk_config(hass, call, "ChargeConfig", CHARGE_SERVICE_FIELDS)
+
+        async def async_battery_discharge_bulk_handler(call: ServiceCall) -> ServiceResponse:
+            return await _async_bulk_config(hass, call, "DisChargeConfig", DISCHARGE_SERVICE_FIELDS)
+
+        hass.services.async_register(
+            DOMAIN, 'setbatterychargebulk', async_battery_charge_bulk_handler,
+            SERVICE_BATTERY_CHARGE_BULK_SCHEMA, supports_response=SupportsResponse.OPTIONAL)
+
+        hass.services.async_register(
+            DOMAIN, 'setbatterydischargebulk', async_battery_discharge_bulk_handler,
+            SERVICE_BATTERY_DISCHARGE_BULK_SCHEMA, supports_response=SupportsResponse.OPTIONAL)
+
+    if not hass.services.has_service(DOMAIN, 'distributepower'):
+        async def async_distribute_power_handler(call: ServiceCall) -> ServiceResponse:
+            return await _async_distribute_power(hass, call)
+
+        hass.services.async_register(
+            DOMAIN, 'distributepower', async_distribute_power_handler,
+            SERVICE_DISTRIBUTE_POWER_SCHEMA, supports_response=SupportsResponse.OPTIONAL)
+
+    if not hass.services.has_service(DOMAIN, 'optimizeschedule'):
+        async def async_optimize_schedule_handler(call: ServiceCall) -> ServiceResponse:
+            serial = call.data['serial']
+            coordinator = next((c for c in _get_coordinators(hass) if serial in (c.data or {})), None)
+            if coordinator is None:
+                raise ServiceValidationError(f"Unknown serial {serial}")
+
+            prices = call.data.get('prices') or _curve_from_entity(
+                hass, call.data['price_entity'], call.data.get('price_attribute'))
+            pv = call.data.get('pv_forecast')
+            if not pv and 'pv_forecast_entity' in call.data:
+                pv = _curve_from_entity(
+                    hass, call.data['pv_forecast_entity'], call.data.get('pv_forecast_attribute'))
+
+            try:
+                return await coordinator.async_optimize_schedule(
+                    serial, prices,
+                    export_prices=call.data['export_price'],
+                    load=call.data.get('load_forecast'),
+                    pv=pv,
+                    max_power=call.data.get('max_power'),
+                    apply=call.data['apply'],
+                )
+            except ValueError as err:
+                raise ServiceValidationError(str(err)) from err
+
+        hass.services.async_register(
+            DOMAIN, 'optimizeschedule', async_optimize_schedule_handler,
+            SERVICE_OPTIMIZE_SCHEDULE_SCHEMA, supports_response=SupportsResponse.OPTIONAL)
+
+    if not hass.services.has_service(DOMAIN, 'simulateschedule'):
+        async def async_simulate_schedule_handler(call: ServiceCall) -> ServiceResponse:
+            serial = call.data['serial']
+            coordinator = next((c for c in _get_coordinators(hass) if serial in (c.data or {})), None)
+            if coordinator is None:
+                raise ServiceValidationError(f"Unknown serial {serial}")
+
+            current = coordinator.current_schedule(serial)
+            names = ['current']
+            configs = [current]
+            for index, fields in enumerate(call.data['schedules'], start=1):
+                names.append(fields.get('name', f'schedule_{index}'))
+                configs.append(_schedule_from_fields(current, fields))
+
+            try:
+                price_profile = None
+                if 'prices' in call.data:
+                    midnight = dt_util.start_of_local_day()
+                    price_profile = slot_values(call.data['prices'], midnight, dt_util.parse_datetime)
+                results = await coordinator.async_simulate(
+                    serial, configs, call.data['days'],
+                    price_profile=price_profile,
+                    export_price=call.data['export_price'],
+                    max_power=call.data.get('max_power'),
+                )
+            except ValueError as err:
+                raise ServiceValidationError(str(err)) from err
+
+            return {
+                'results': {
+                    name: {key: round(value, 3) for key, value in asdict(result).items()}
+                    for name, result in zip(names, results)
+                }
+            }
+
+        hass.services.async_register(
+            DOMAIN, 'simulateschedule', async_simulate_schedule_handler,
+            SERVICE_SIMULATE_SCHEDULE_SCHEMA, supports_response=SupportsResponse.ONLY)
+
+    if not hass.services.has_service(DOMAIN, 'backfillhistory'):
+        async def async_backfill_history_handler(call):
+            if "recorder" not in hass.config.components:
+                raise ServiceValidationError("The recorder integration is required to backfill history")
+
+            # Snapshot the serials, since a refresh may add one while a backfill runs
+            targets = [
+                (coordinator, serial)
+                for coordinator in _get_coordinators(hass)
+                for serial in list(coordinator.data or {})
+            ]
+            requested_serial = call.data.get('serial')
+            if requested_serial:
+                targets = [(c, serial) for c, serial in targets if serial == requested_serial]
+                if not targets:
+                    raise ServiceValidationError(f"Unknown serial {requested_serial}")
+
+            for coordinator, serial in targets:
+                await coordinator.history.async_backfill(serial, call.data['days'])
+
+        hass.services.async_register(
+            DOMAIN, 'backfillhistory', async_backfill_history_handler, SERVICE_BACKFILL_HISTORY_SCHEMA)
+
     return True
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator: AlphaESSDataUpdateCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_shutdown()
 
     return unload_ok
 
 
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
-    """Handle options update."""
-    await hass.config_entries.async_reload(entry.entry_id)
+    """Apply option and subentry changes in place instead of reloading.
+
+    The scan interval and SSL setting are pushed straight into the running
+    coordinator and client. Inverters whose IP address changed get their
+    local data re-fetched and only that subentry's entities rebuilt.
+    Newly added subentries get their data fetched and entities created,
+    removed inverters have their state dropped, and the parent of a removed
+    EV charger gets its entities rebuilt. Notification flags are read live by the entities and need no action.
+    """
+    coordinator: AlphaESSDataUpdateCoordinator | None = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+    if coordinator is None:
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+
+    scan_interval = _get_scan_interval(entry)
+    if coordinator.scan_interval != scan_interval:
+        _LOGGER.debug("Updating scan interval to %s", scan_interval)
+        coordinator.set_scan_interval(scan_interval)
+
+    coordinator.api.verify_ssl = _get_verify_ssl(entry)
+    coordinator.local_first_serials = _build_local_first_serials(entry)
+
+    rebuild_subentry_ids: list[str] = []
+
+    # Newly added subentries (discovery or bind flow) need data and entities
+    added, removed = coordinator.sync_subentries(entry, _build_inverter_model_list(entry))
+
+    # Removed inverters leave no state behind; a removed EV charger hands
+    # its entities back to the parent inverter
+    coordinator.remove_serials(
+        serial for serial in set(removed.values())
+        if coordinator.get_inverter_subentry_id(serial) is None
+    )
+    for serial in removed.values():
+        parent_id = coordinator.get_inverter_subentry_id(serial)
+        if parent_id and parent_id not in rebuild_subentry_ids:
+            rebuild_subentry_ids.append(parent_id)
+
+    for serial in coordinator.update_ip_address_map(_build_ip_address_map(entry)):
+        subentry_id = coordinator.get_inverter_subentry_id(serial)
+        if subentry_id is None or subentry_id in added:
+            continue
+
+        await coordinator.async_refresh_local_ip_data(serial)
+        if subentry_id not in rebuild_subentry_ids:
+            rebuild_subentry_ids.append(subentry_id)
+
+    if added:
+        new_serials = {
+            entry.subentries[subentry_id].data.get(CONF_SERIAL_NUMBER)
+            for subentry_id in added
+            if entry.subentries[subentry_id].subentry_type == SUBENTRY_TYPE_INVERTER
+        }
+        if any(serial not in coordinator.data for serial in new_serials):
+            await coordinator.async_refresh()
+
+        for subentry_id in added:
+            subentry = entry.subentries[subentry_id]
+            if subentry.subentry_type == SUBENTRY_TYPE_EV_CHARGER:
+                # The parent inverter hands its auto-discovered EV entities over
+                parent_id = coordinator.get_inverter_subentry_id(
+                    subentry.data.get(CONF_PARENT_INVERTER, "")
+                )
+                if parent_id and parent_id not in rebuild_subentry_ids:
+                    rebuild_subentry_ids.append(parent_id)
+
+        rebuild_subentry_ids.extend(added)
+
+    if rebuild_subentry_ids:
+        async_dispatcher_send(
+            hass, SIGNAL_SUBENTRY_UPDATED.format(entry.entry_id), rebuild_subentry_ids
+        )
 
 
 async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
@@ -0,0 +1,183 @@
+"""Rolling energy totals over the live power samples."""
+from __future__ import annotations
+
+from datetime import timedelta
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+ANALYTICS_STORAGE_VERSION = 1
+
+# Seconds between saves; buckets are coarse enough that losing one is fine
+ANALYTICS_SAVE_DELAY = 600
+
+# Window name -> (length, bucket count); the window moves a bucket at a time
+WINDOWS: dict[str, tuple[timedelta, int]] = {
+    "1h": (timedelta(hours=1), 60),
+    "24h": (timedelta(hours=24), 96),
+    "7d": (timedelta(days=7), 168),
+    "30d": (timedelta(days=30), 120),
+}
+
+# Energy flows summed per window (kWh)
+FLOWS = ("load", "pv", "import", "export", "throughput")
+
+
+class RollingSums:
+    """Sums of several values over a sliding window of fixed time buckets.
+
+    Adding a sample touches one bucket and the running total; buckets that
+    fall out of the window are subtracted as time moves past them, so the
+    cost does not depend on how many samples the window holds.
+    """
+
+    def __init__(self, window: timedelta, buckets: int, width: int) -> None:
+        self.width = window.total_seconds() / buckets
+        self.buckets = np.zeros((buckets, width))
+        self.total = np.zeros(width)
+        self.head: Optional[int] = None  # Absolute index of the newest bucket
+
+    def add(self, timestamp: float, values: np.ndarray) -> None:
+        """Add values to the bucket of ``timestamp``; late samples go to the newest."""
+        self.advance(timestamp)
+        slot = self.head % len(self.buckets)
+        self.buckets[slot] += values
+        self.total += values
+
+    def advance(self, timestamp: float) -> None:
+        """Drop the buckets that are older than the window at ``timestamp``."""
+        index = int(timestamp // self.width)
+        if self.head is None:
+            self.head = index
+            return
+        steps = min(index - self.head, len(self.buckets))
+        for step in range(1, steps + 1):
+            slot = (self.head + step) % len(self.buckets)
+            self.total -= self.buckets[slot]
+            self.buckets[slot] = 0
+        self.head = max(self.head, index)
+
+    def sums(self, timestamp: float) -> np.ndarray:
+        """Return the totals of the window ending at ``timestamp``."""
+        self.advance(timestamp)
+        # Subtracting buckets leaves rounding residue around zero
+        return np.where(self.total > 1e-9, self.total, 0.0)
+
+    def as_dict(self) -> dict:
+        """Return the buckets in storage format."""
+        return {"head": self.head, "buckets": self.buckets.tolist()}
+
+    def restore(self, stored: dict) -> None:
+        """Load buckets saved by ``as_dict`` if they have the same shape."""
+        buckets = np.asarray(stored.get("buckets", []), dtype=float)
+        if buckets.shape != self.buckets.shape or stored.get("head") is None:
+            return
+        self.buckets = buckets
+        self.total = buckets.sum(axis=0)
+        self.head = int(stored["head"])
+
+
+class EnergyWindows:
+    """Rolling energy flows of one inverter, integrated from power samples.
+
+    Each interval between two samples is integrated with the trapezoid
+    rule. An interval longer than ``max_gap`` seconds is not counted, so
+    an outage does not smear its average over hours nobody measured.
+    """
+
+    def __init__(self) -> None:
+        self.windows = {
+            name: RollingSums(length, buckets, len(FLOWS)) for name, (length, buckets) in WINDOWS.items()
+        }
+        self._last: Optional[tuple[float, np.ndarray]] = None
+
+    def add(self, timestamp: float, pv: float, load: float, grid: float, battery: float, max_gap: float) -> None:
+        """Add a sample (W; grid import and battery discharge positive)."""
+        flows = np.array([load, pv, max(grid, 0.0), max(-grid, 0.0), abs(battery)])
+        if self._last is not None:
+            previous, previous_flows = self._last
+            elapsed = timestamp - previous
+            if elapsed <= 0:
+                return
+            if elapsed <= max_gap:
+                energy = (previous_flows + flows) / 2 * elapsed / 3_600_000
+                for window in self.windows.values():
+                    window.add(timestamp, energy)
+        self._last = (timestamp, flows)
+
+    def stats(self, window: str, timestamp: float) -> Dict[str, float]:
+        """Return the flows of a window, plus the self-sufficiency and self-consumption (%)."""
+        sums = dict(zip(FLOWS, self.windows[window].sums(timestamp).tolist()))
+        load, pv = sums["load"], sums["pv"]
+        sums["self_sufficiency"] = (
+            min(max(1 - sums["import"] / load, 0.0), 1.0) * 100 if load > 0 else None
+        )
+        sums["self_consumption"] = (
+            min(max(1 - sums["export"] / pv, 0.0), 1.0) * 100 if pv > 0 else None
+        )
+        return sums
+
+
+class RollingEnergyStats:
+    """Rolling energy windows of every inverter, kept across restarts.
+
+    ``max_gap`` follows the scan interval, so slow polling still counts.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, max_gap: timedelta) -> None:
+        self.max_gap = max_gap.total_seconds()
+        self._store: Store = Store(hass, ANALYTICS_STORAGE_VERSION, f"{DOMAIN}.energy_windows_{entry_id}")
+        self._serials: dict[str, EnergyWindows] = {}
+        self._saved: dict[str, Any] = {}
+        self._last_save = 0.0
+
+    async def async_load(self) -> None:
+        """Load the windows saved before a restart."""
+        self._saved = (await self._store.async_load() or {}).get("serials", {})
+
+    def get(self, serial: str) -> EnergyWindows:
+        """Return the windows of an inverter, restoring saved buckets on first use."""
+        if serial not in self._serials:
+            windows = EnergyWindows()
+            for name, stored in self._saved.pop(serial, {}).items():
+                if name in windows.windows:
+                    windows.windows[name].restore(stored)
+            self._serials[serial] = windows
+        return self._serials[serial]
+
+    def add(self, serial: str, timestamp: float, pv: float, load: float, grid: float, battery: float) -> None:
+        """Add a power sample of an inverter and schedule a save."""
+        self.get(serial).add(timestamp, pv, load, grid, battery, self.max_gap)
+
+        # Rescheduling would keep pushing the save back, so schedule one at a time
+        now = time.monotonic()
+        if now - self._last_save >= ANALYTICS_SAVE_DELAY:
+            self._last_save = now
+            self._store.async_delay_save(self._data_to_save, ANALYTICS_SAVE_DELAY)
+
+    def stats(self, serial: str, window: str) -> Optional[Dict[str, float]]:
+        """Return the rolling stats of an inverter, or None before its first sample since startup."""
+        windows = self._serials.get(serial)
+        if windows is None:
+            return None
+        return windows.stats(window, time.time())
+
+    def remove(self, serial: str) -> None:
+        """Forget an inverter, e.g. after its subentry was removed."""
+        if serial in self._serials or serial in self._saved:
+            self._serials.pop(serial, None)
+            self._saved.pop(serial, None)
+            self._store.async_delay_save(self._data_to_save, ANALYTICS_SAVE_DELAY)
+
+    def _data_to_save(self) -> dict:
+        """Return every window in storage format."""
+        serials = dict(self._saved)
+        for serial, windows in self._serials.items():
+            serials[serial] = {name: window.as_dict() for name, window in windows.windows.items()}
+        return {"serials": serials}
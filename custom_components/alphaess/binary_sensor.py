@@ -1,5 +1,5 @@
 """Binary sensor platform for AlphaESS integration."""
-from typing import List
+from typing import Any, List
 import logging
 
 from homeassistant.components.binary_sensor import BinarySensorEntity
@@ -13,30 +13,72 @@ from .const import (
     CONF_PARENT_INVERTER,
 )
 from .coordinator import AlphaESSDataUpdateCoordinator
-from .sensorlist import EV_CHARGER_BINARY_SENSORS
-from .device import build_ev_charger_device_info
+from .enums import AlphaESSNames
+from .sensorlist import EV_CHARGER_BINARY_SENSORS, LOCAL_IP_HEALTH_BINARY_SENSOR, PV_STRING_MISMATCH_BINARY_SENSOR
+from .device import build_inverter_device_info, build_ev_charger_device_info
+from .entity_manager import SubentryEntityManager
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
 
 async def async_setup_entry(hass, entry, async_add_entities) -> None:
-    """Set up EV charger readiness binary sensors."""
+    """Set up EV charger readiness, local API health and PV string binary sensors."""
     coordinator: AlphaESSDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
 
     ev_binary_supported_states = {
         description.key: description for description in EV_CHARGER_BINARY_SENSORS
     }
 
-    for subentry in entry.subentries.values():
+    def _build_ev_entities(serial, ev_charger, data) -> List[BinarySensorEntity]:
+        ev_device_info = build_ev_charger_device_info(data)
+        return [
+            AlphaEVReadinessBinarySensor(
+                coordinator,
+                serial,
+                entry,
+                description,
+                ev_serial=ev_charger,
+                device_info=ev_device_info,
+            )
+            for description in ev_binary_supported_states.values()
+        ]
+
+    def _build_subentry_entities(subentry) -> List[BinarySensorEntity]:
         if subentry.subentry_type == SUBENTRY_TYPE_INVERTER:
             serial = subentry.data.get(CONF_SERIAL_NUMBER)
             if not serial or serial not in coordinator.data:
-                continue
+                return []
 
             data = coordinator.data[serial]
+            entities: List[BinarySensorEntity] = []
+
+            if coordinator.ip_address_map.get(serial):
+                entities.append(
+                    AlphaLocalApiHealthBinarySensor(
+                        coordinator,
+                        serial,
+                        entry,
+                        LOCAL_IP_HEALTH_BINARY_SENSOR,
+                        device_info=build_inverter_device_info(serial, data),
+                    )
+                )
+
+            # Strings can only be compared when at least two are reported
+            strings = [data.get(getattr(AlphaESSNames, f"PPV{index}")) for index in range(1, 5)]
+            if sum(value is not None for value in strings) >= 2:
+                entities.append(
+                    AlphaPvStringMismatchBinarySensor(
+                        coordinator,
+                        serial,
+                        entry,
+                        PV_STRING_MISMATCH_BINARY_SENSOR,
+                        device_info=build_inverter_device_info(serial, data),
+                    )
+                )
+
             ev_charger = data.get("EV Charger S/N")
             if not ev_charger:
-                continue
+                return entities
 
             ev_subentry_serials = {
                 sub.data.get(CONF_SERIAL_NUMBER)
@@ -44,51 +86,25 @@ async def async_setup_entry(hass, entry, async_add_entities) -> None:
                 if sub.subentry_type == SUBENTRY_TYPE_EV_CHARGER
             }
             if ev_charger in ev_subentry_serials:
-                continue
+                return entities
 
-            ev_device_info = build_ev_charger_device_info(data)
-            ev_entities: List[BinarySensorEntity] = []
-            for description in ev_binary_supported_states.values():
-                ev_entities.append(
-                    AlphaEVReadinessBinarySensor(
-                        coordinator,
-                        serial,
-                        entry,
-                        description,
-                        ev_serial=ev_charger,
-                        device_info=ev_device_info,
-                    )
-                )
-
-            if ev_entities:
-                async_add_entities(ev_entities, config_subentry_id=subentry.subentry_id)
+            return entities + _build_ev_entities(serial, ev_charger, data)
 
-        elif subentry.subentry_type == SUBENTRY_TYPE_EV_CHARGER:
+        if subentry.subentry_type == SUBENTRY_TYPE_EV_CHARGER:
             parent_serial = subentry.data.get(CONF_PARENT_INVERTER)
             if not parent_serial or parent_serial not in coordinator.data:
-                continue
+                return []
 
             data = coordinator.data[parent_serial]
             ev_charger = data.get("EV Charger S/N")
             if not ev_charger:
-                continue
+                return []
 
-            ev_device_info = build_ev_charger_device_info(data)
-            ev_entities: List[BinarySensorEntity] = []
-            for description in ev_binary_supported_states.values():
-                ev_entities.append(
-                    AlphaEVReadinessBinarySensor(
-                        coordinator,
-                        parent_serial,
-                        entry,
-                        description,
-                        ev_serial=ev_charger,
-                        device_info=ev_device_info,
-                    )
-                )
+            return _build_ev_entities(parent_serial, ev_charger, data)
 
-            if ev_entities:
-                async_add_entities(ev_entities, config_subentry_id=subentry.subentry_id)
+        return []
+
+    SubentryEntityManager(hass, entry, async_add_entities, _build_subentry_entities).async_setup()
 
 
 class AlphaEVReadinessBinarySensor(CoordinatorEntity, BinarySensorEntity):
@@ -150,3 +166,126 @@ class AlphaEVReadinessBinarySensor(CoordinatorEntity, BinarySensorEntity):
     @property
     def icon(self):
         return self._icon
+
+
+class AlphaLocalApiHealthBinarySensor(CoordinatorEntity, BinarySensorEntity):
+    """Reachability of an inverter's local API, with its backoff state."""
+
+    def __init__(self, coordinator, serial, config, description, device_info=None):
+        super().__init__(coordinator)
+        self._coordinator = coordinator
+        self._serial = serial
+        self._config = config
+        self._name = description.name
+        self._icon = description.icon
+        self._entity_category = description.entity_category
+        self._attr_device_class = description.device_class
+
+        if device_info:
+            self._attr_device_info = device_info
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return True if the last local API call succeeded."""
+        health = self._coordinator.local_ip_health.get(self._serial)
+        if health is None:
+            return None
+        return health.healthy
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return failure and backoff details."""
+        health = self._coordinator.local_ip_health.get(self._serial)
+        if health is None:
+            return None
+        return {
+            "ip_address": self._coordinator.ip_address_map.get(self._serial),
+            "consecutive_failures": health.consecutive_failures,
+            "last_success": health.last_success,
+            "last_error": health.last_error,
+            "retry_at": health.retry_at,
+        }
+
+    @property
+    def available(self) -> bool:
+        """Health is tracked locally, so it stays available without the cloud."""
+        return self._serial in self._coordinator.local_ip_health
+
+    @property
+    def unique_id(self):
+        return f"{self._config.entry_id}_{self._serial} - {self._name}"
+
+    @property
+    def name(self):
+        return f"{self._name}"
+
+    @property
+    def suggested_object_id(self):
+        return f"{self._serial} {self._name}"
+
+    @property
+    def entity_category(self):
+        return self._entity_category
+
+    @property
+    def icon(self):
+        return self._icon
+
+
+class AlphaPvStringMismatchBinarySensor(CoordinatorEntity, BinarySensorEntity):
+    """Flags PV strings that produce less than the others lead them to expect."""
+
+    def __init__(self, coordinator, serial, config, description, device_info=None):
+        super().__init__(coordinator)
+        self._coordinator = coordinator
+        self._serial = serial
+        self._config = config
+        self._name = description.name
+        self._icon = description.icon
+        self._entity_category = description.entity_category
+        self._attr_device_class = description.device_class
+
+        if device_info:
+            self._attr_device_info = device_info
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return True if any string is falling behind."""
+        detector = self._coordinator.pv_strings.get(self._serial)
+        if detector is None:
+            return None
+        return bool(detector.flagged.any())
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the flagged strings and each string's shortfall (%)."""
+        detector = self._coordinator.pv_strings.get(self._serial)
+        if detector is None:
+            return None
+        return {
+            "strings": [index + 1 for index, flagged in enumerate(detector.flagged) if flagged],
+            "deviation": {
+                f"PPV{index + 1}": round(float(deviation) * 100, 1)
+                for index, deviation in enumerate(detector.deviation)
+            },
+        }
+
+    @property
+    def unique_id(self):
+        return f"{self._config.entry_id}_{self._serial} - {self._name}"
+
+    @property
+    def name(self):
+        return f"{self._name}"
+
+    @property
+    def suggested_object_id(self):
+        return f"{self._serial} {self._name}"
+
+    @property
+    def entity_category(self):
+        return self._entity_category
+
+    @property
+    def icon(self):
+        return self._icon
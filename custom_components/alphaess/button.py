@@ -1,15 +1,15 @@
-import time as time_mod
 from typing import List
 import logging
 from homeassistant.components.button import ButtonEntity, ButtonDeviceClass
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN, ALPHA_POST_REQUEST_RESTRICTION, INVERTER_SETTING_BLACKLIST, CONF_SERIAL_NUMBER, \
+from .const import DOMAIN, INVERTER_SETTING_BLACKLIST, CONF_SERIAL_NUMBER, \
     SUBENTRY_TYPE_INVERTER, SUBENTRY_TYPE_EV_CHARGER, CONF_PARENT_INVERTER, CONF_DISABLE_NOTIFICATIONS
 from .coordinator import AlphaESSDataUpdateCoordinator
 from .sensorlist import SUPPORT_DISCHARGE_AND_CHARGE_BUTTON_DESCRIPTIONS, EV_DISCHARGE_AND_CHARGE_BUTTONS
 from .enums import AlphaESSNames
 from .device import build_inverter_device_info, build_ev_charger_device_info
+from .entity_manager import SubentryEntityManager
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
@@ -38,11 +38,11 @@ async def async_setup_entry(hass, entry, async_add_entities) -> None:
         description.key: description for description in EV_DISCHARGE_AND_CHARGE_BUTTONS
     }
 
-    for subentry in entry.subentries.values():
+    def _build_subentry_entities(subentry) -> List[ButtonEntity]:
         if subentry.subentry_type == SUBENTRY_TYPE_INVERTER:
             serial = subentry.data.get(CONF_SERIAL_NUMBER)
             if not serial or serial not in coordinator.data:
-                continue
+                return []
 
             data = coordinator.data[serial]
             model = data.get("Model")
@@ -82,21 +82,17 @@ async def async_setup_entry(hass, entry, async_add_entities) -> None:
                         )
                     )
 
-            if inverter_buttons:
-                async_add_entities(
-                    inverter_buttons,
-                    config_subentry_id=subentry.subentry_id,
-                )
+            return inverter_buttons
 
-        elif subentry.subentry_type == SUBENTRY_TYPE_EV_CHARGER:
+        if subentry.subentry_type == SUBENTRY_TYPE_EV_CHARGER:
             parent_serial = subentry.data.get(CONF_PARENT_INVERTER)
             if not parent_serial or parent_serial not in coordinator.data:
-                continue
+                return []
 
             data = coordinator.data[parent_serial]
             ev_charger = data.get("EV Charger S/N")
             if not ev_charger:
-                continue
+                return []
 
             ev_device_info = build_ev_charger_device_info(data)
             ev_buttons: List[ButtonEntity] = []
@@ -111,11 +107,11 @@ async def async_setup_entry(hass, entry, async_add_entities) -> None:
                     )
                 )
 
-            if ev_buttons:
-                async_add_entities(
-                    ev_buttons,
-                    config_subentry_id=subentry.subentry_id,
-                )
+            return ev_buttons
+
+        return []
+
+    SubentryEntityManager(hass, entry, async_add_entities, _build_subentry_entities).async_setup()
 
 
 class AlphaESSBatteryButton(CoordinatorEntity, ButtonEntity):
@@ -208,68 +204,44 @@ class AlphaESSBatteryButton(CoordinatorEntity, ButtonEntity):
                                                      title=f"{self._serial} EV Charger")
             return
 
-        last_discharge_update = self._coordinator.last_discharge_update
-        last_charge_update = self._coordinator.last_charge_update
-        rate_limit = ALPHA_POST_REQUEST_RESTRICTION.total_seconds()
-
-        async def handle_time_restriction(last_update_dict, update_fn, update_key, movement_direction):
-            now = time_mod.monotonic()
-            last_update = last_update_dict.get(self._serial)
-            if last_update is None or now - last_update >= rate_limit:
-                last_update_dict[self._serial] = now
-                await update_fn(update_key, self._serial, self._time)
-                _LOGGER.info("Notifications disabled = %s for %s", self._notifications_disabled, self._serial)
-                if not self._notifications_disabled:
-                    _LOGGER.info("Sending notification for %s %s", self._serial, movement_direction)
-                    await create_persistent_notification(self.hass,
-                                                         message=f"{movement_direction} command sent successfully for {self._serial}.",
-                                                         title=f"{self._serial} {movement_direction}")
-            else:
-                remaining = rate_limit - (now - last_update)
-                minutes, seconds = divmod(remaining, 60)
-
-                if not self._notifications_disabled:
-                    await create_persistent_notification(self.hass,
-                                                         message=f"Please wait {int(minutes)} minutes and {int(seconds)} seconds.",
-                                                         title=f"{self._serial} cannot call {movement_direction}")
-
-        now = time_mod.monotonic()
+        async def queue_command(sections, update, message, title):
+            # Writes are only queued here; the read-back confirms them later.
+            # Commands inside the API's post restriction wait for their window
+            wait = max(self._coordinator.commands.wait_time(self._serial, section) for section in sections)
+            await update()
+            if self._notifications_disabled:
+                return
+            if not self._coordinator.cloud_available:
+                message = (f"Cloud unavailable, command saved for {self._serial} and "
+                           "will be sent when it returns.")
+            elif wait > 0:
+                minutes, seconds = divmod(wait, 60)
+                message = (f"Command queued for {self._serial}, it will be sent in "
+                           f"{int(minutes)} minutes and {int(seconds)} seconds.")
+            await create_persistent_notification(self.hass, message=message, title=title)
 
         if self._key == AlphaESSNames.ButtonRechargeConfig:
-            if (last_charge_update.get(self._serial) is None or now - last_charge_update[
-                self._serial] >= rate_limit) and \
-                    (last_discharge_update.get(self._serial) is None or now - last_discharge_update[
-                        self._serial] >= rate_limit):
-                last_discharge_update[self._serial] = last_charge_update[self._serial] = now
-                await self._coordinator.reset_config(self._serial)
-                if not self._notifications_disabled:
-                    await create_persistent_notification(self.hass,
-                                                         message=f"Charge and discharge configuration reset for {self._serial}.",
-                                                         title=f"{self._serial} Reset")
-            else:
-                # Reset button is throttled - just show wait message
-                last_update = last_charge_update.get(self._serial) or last_discharge_update.get(self._serial)
-                if last_update:
-                    remaining = rate_limit - (now - last_update)
-                    minutes, seconds = divmod(remaining, 60)
-                    if not self._notifications_disabled:
-                        await create_persistent_notification(self.hass,
-                                                             message=f"Please wait {int(minutes)} minutes and {int(seconds)} seconds.",
-                                                             title=f"{self._serial} cannot reset yet")
+            await queue_command(("ChargeConfig", "DisChargeConfig"),
+                                lambda: self._coordinator.reset_config(self._serial),
+                                f"Charge and discharge configuration reset queued for {self._serial}.",
+                                f"{self._serial} Reset")
         elif self._movement_state == "Discharge":
-            await handle_time_restriction(last_discharge_update,
-                                          self._coordinator.update_discharge, "batUseCap",
-                                          self._movement_state)
+            await queue_command(("DisChargeConfig",),
+                                lambda: self._coordinator.update_discharge("batUseCap", self._serial, self._time),
+                                f"{self._movement_state} command queued for {self._serial}.",
+                                f"{self._serial} {self._movement_state}")
         elif self._movement_state == "Charge":
-            await handle_time_restriction(last_charge_update, self._coordinator.update_charge,
-                                          "batHighCap", self._movement_state)
+            await queue_command(("ChargeConfig",),
+                                lambda: self._coordinator.update_charge("batHighCap", self._serial, self._time),
+                                f"{self._movement_state} command queued for {self._serial}.",
+                                f"{self._serial} {self._movement_state}")
 
     @property
     def available(self) -> bool:
-        """Buttons require cloud API to function."""
+        """EV buttons require the cloud; battery commands are queued while it is down."""
         if not self.coordinator.last_update_success:
             return False
-        return self._coordinator.cloud_available
+        return self._ev_serial is None or self._coordinator.cloud_available
 
     @property
     def unique_id(self):
@@ -0,0 +1,154 @@
+"""Per-inverter command queue for AlphaESS cloud writes."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import logging
+import time
+from typing import Any, Awaitable, Callable
+
+import aiohttp
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+# Errors worth retrying; anything else fails the command straight away.
+# Writes go through the client's api_post, which raises these.
+TRANSIENT_ERRORS = (aiohttp.ClientError, TimeoutError)
+
+
+@dataclass
+class _QueuedCommand:
+    """A queued write; newer submissions for its channel fold into it."""
+
+    payload: Any
+    futures: list[asyncio.Future] = field(default_factory=list)
+
+
+class CommandQueue:
+    """Run writes per inverter in order, as fast as the API allows.
+
+    Each inverter has a set of channels (for example its charge config or
+    its EV charger current). A channel holds at most one queued command: a
+    newer submission supersedes it, merging payloads when asked to, and
+    every caller gets the result of the command that finally runs.
+    Channels can have a minimum spacing between writes. A command whose
+    channel is still throttled waits for the window to open instead of
+    being rejected, while commands on other channels go ahead.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry | None,
+        execute: Callable[[str, str, Any], Awaitable[Any]],
+        spacing: dict[str, float],
+        retries: int,
+        retry_delay: float,
+    ) -> None:
+        self.hass = hass
+        self.entry = entry
+        self._execute = execute
+        self._spacing = spacing
+        self._retries = retries
+        self._retry_delay = retry_delay
+        self._queued: dict[str, dict[str, _QueuedCommand]] = {}
+        self._last_run: dict[tuple[str, str], float] = {}
+        self._wakeup: dict[str, asyncio.Event] = {}
+        self._workers: dict[str, asyncio.Task] = {}
+
+    def wait_time(self, serial: str, channel: str) -> float:
+        """Return the seconds until a channel of a serial accepts a write."""
+        last_run = self._last_run.get((serial, channel))
+        if last_run is None:
+            return 0.0
+        return max(0.0, last_run + self._spacing.get(channel, 0.0) - time.monotonic())
+
+    def submit(self, serial: str, channel: str, payload: Any, merge: bool = False) -> asyncio.Future:
+        """Queue a command and return a future for its result.
+
+        With ``merge``, a dict payload is merged into a still-queued one for
+        the same channel instead of replacing it.
+        """
+        future = self.hass.loop.create_future()
+        serial_queue = self._queued.setdefault(serial, {})
+        queued = serial_queue.get(channel)
+        if queued is None:
+            serial_queue[channel] = _QueuedCommand(payload, [future])
+        else:
+            _LOGGER.debug("Superseding queued %s command for %s", channel, serial)
+            queued.payload = {**queued.payload, **payload} if merge else payload
+            queued.futures.append(future)
+
+        self._wakeup.setdefault(serial, asyncio.Event()).set()
+        if serial not in self._workers:
+            coro = self._async_run(serial)
+            name = f"AlphaESS command queue {serial}"
+            if self.entry is not None:
+                task = self.entry.async_create_background_task(self.hass, coro, name)
+            else:
+                task = self.hass.async_create_background_task(coro, name)
+            self._workers[serial] = task
+        return future
+
+    async def _async_run(self, serial: str) -> None:
+        """Work through a serial's queue until it is empty."""
+        serial_queue = self._queued[serial]
+        wakeup = self._wakeup[serial]
+        command: _QueuedCommand | None = None
+        try:
+            while serial_queue:
+                # Earliest-ready channel first; ties keep submission order
+                channel = min(serial_queue, key=lambda name: self.wait_time(serial, name))
+                wait = self.wait_time(serial, channel)
+                if wait > 0:
+                    wakeup.clear()
+                    try:
+                        async with asyncio.timeout(wait):
+                            await wakeup.wait()
+                    except TimeoutError:
+                        pass
+                    continue
+
+                command = serial_queue.pop(channel)
+                self._last_run[(serial, channel)] = time.monotonic()
+                try:
+                    result = await self._async_execute(serial, channel, command.payload)
+                except Exception as error:
+                    for future in command.futures:
+                        if not future.done():
+                            future.set_exception(error)
+                            # Callers may not await; don't warn about unretrieved errors
+                            future.exception()
+                else:
+                    for future in command.futures:
+                        if not future.done():
+                            future.set_result(result)
+        finally:
+            self._workers.pop(serial, None)
+            # Cancelled (e.g. on unload): nothing will run what is left
+            waiting = [future for queued in serial_queue.values() for future in queued.futures]
+            if command is not None:
+                waiting.extend(command.futures)
+            serial_queue.clear()
+            for future in waiting:
+                if not future.done():
+                    future.cancel()
+
+    async def _async_execute(self, serial: str, channel: str, payload: Any) -> Any:
+        """Execute a command, retrying transient failures with backoff."""
+        delay = self._retry_delay
+        for attempt in range(self._retries + 1):
+            try:
+                return await self._execute(serial, channel, payload)
+            except TRANSIENT_ERRORS as error:
+                if attempt == self._retries:
+                    raise
+                _LOGGER.debug(
+                    "Retrying %s command for %s in %ss after %s", channel, serial, delay, error
+                )
+                await asyncio.sleep(delay)
+                delay *= 2
+        return None
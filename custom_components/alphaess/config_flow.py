@@ -25,6 +25,7 @@ from .const import (
     CONF_DISABLE_NOTIFICATIONS,
     CONF_INVERTER_MODEL,
     CONF_IP_ADDRESS,
+    CONF_LOCAL_FIRST,
     CONF_SERIAL_NUMBER,
     DEFAULT_SCAN_INTERVAL_SECONDS,
     DOMAIN,
@@ -287,14 +288,10 @@ class AlphaESSInverterSubentryFlowHandler(ConfigSubentryFlow):
                     errors["base"] = "bind_failed"
                     await _notify(self.hass, f"Failed to bind inverter {self._sysSn}. Please check the verification code.", "AlphaESS Bind Failed")
                 else:
-                    await _notify(self.hass, f"Inverter {self._sysSn} has been successfully bound to your account. The integration will reload to discover the new system.", "AlphaESS Bind Successful")
-
-                    # Schedule reload so the new system is discovered
-                    entry = self._get_entry()
-                    self.hass.async_create_task(
-                        self.hass.config_entries.async_reload(entry.entry_id)
-                    )
+                    await _notify(self.hass, f"Inverter {self._sysSn} has been successfully bound to your account. Its entities will be added shortly.", "AlphaESS Bind Successful")
 
+                    # The update listener fetches data for the new subentry
+                    # and adds its entities without reloading the entry.
                     return self.async_create_entry(
                         title=f"Inverter ({self._sysSn})",
                         data={
@@ -373,6 +370,7 @@ class AlphaESSInverterSubentryFlowHandler(ConfigSubentryFlow):
                             **subentry.data,
                             CONF_IP_ADDRESS: ip,
                             CONF_DISABLE_NOTIFICATIONS: user_input.get(CONF_DISABLE_NOTIFICATIONS, True),
+                            CONF_LOCAL_FIRST: user_input.get(CONF_LOCAL_FIRST, False),
                         },
                     )
 
@@ -385,6 +383,10 @@ class AlphaESSInverterSubentryFlowHandler(ConfigSubentryFlow):
                 CONF_DISABLE_NOTIFICATIONS,
                 default=subentry.data.get(CONF_DISABLE_NOTIFICATIONS, True),
             ): bool,
+            vol.Optional(
+                CONF_LOCAL_FIRST,
+                default=subentry.data.get(CONF_LOCAL_FIRST, False),
+            ): bool,
             vol.Optional("confirm_unbind", default=False): bool,
         })
 
@@ -18,6 +18,60 @@ DEFAULT_SCAN_INTERVAL_SECONDS = int(SCAN_INTERVAL.total_seconds())
 MIN_SCAN_INTERVAL_SECONDS = 10
 MAX_SCAN_INTERVAL_SECONDS = 3600
 ALPHA_POST_REQUEST_RESTRICTION = timedelta(seconds=30)
+DISCOVERY_INTERVAL = timedelta(minutes=30)
+API_CALL_INTERVAL = timedelta(seconds=1)
+# Upper bounds for a whole refresh and for each call within it
+REFRESH_DEADLINE = timedelta(seconds=45)
+API_CALL_TIMEOUT = timedelta(seconds=10)
+LOCAL_CALL_TIMEOUT = timedelta(seconds=5)
+# First delay before reading a config write back, doubled per attempt
+CONFIG_READBACK_DELAY = timedelta(seconds=2)
+CONFIG_READBACK_ATTEMPTS = 4
+# How long a written value is shown before the cloud must confirm it
+PENDING_WRITE_TTL = timedelta(minutes=2)
+# Retries for queued writes that hit a network error, with doubling delay
+COMMAND_RETRIES = 3
+COMMAND_RETRY_DELAY = timedelta(seconds=5)
+# How long config changes made during a cloud outage stay worth sending
+OFFLINE_WRITE_TTL = timedelta(hours=2)
+# Inverters written to (and awaited) at once by the bulk config services
+BULK_WRITE_CONCURRENCY = 4
+# Recorded days the optimizer replays to compare its plan with the current config
+SCHEDULE_REPLAY_DAYS = 7
+
+# Solar surplus EV charging
+EV_SOLAR_VOLTAGE = 230
+EV_SOLAR_MIN_CURRENT = 6
+# Amps below the minimum the surplus must drop to before charging stops
+EV_SOLAR_STOP_HYSTERESIS = 2
+EV_SOLAR_MIN_ON_TIME = timedelta(minutes=5)
+EV_SOLAR_ADJUST_INTERVAL = timedelta(seconds=60)
+
+# Peak shaving
+PEAK_SHAVING_LIMIT = 5000
+# Per-phase limit; 0 only watches the total
+PEAK_SHAVING_PHASE_LIMIT = 0
+# Watts below the limit demand must stay within to keep shaving
+PEAK_SHAVING_HYSTERESIS = 300
+PEAK_SHAVING_WINDOW = timedelta(minutes=30)
+PEAK_SHAVING_EXTEND_MARGIN = timedelta(minutes=5)
+PEAK_SHAVING_MIN_WRITE_INTERVAL = timedelta(minutes=5)
+# Longest gap between power samples still integrated into energy
+# (at least three scan intervals)
+ENERGY_SAMPLE_MAX_GAP = timedelta(minutes=10)
+# OneDateEnergy is only fetched this often; the integrated daily energy
+# sensors cover the time in between and are reconciled on every fetch
+DAILY_ENERGY_INTERVAL = timedelta(minutes=15)
+
+# Phase imbalance (%) counted as time above threshold, and the average
+# phase power (W) below which imbalance is not measured
+PHASE_IMBALANCE_THRESHOLD = 25
+PHASE_IMBALANCE_MIN_POWER = 200
+# Delay after an expected cloud upload before polling for it
+UPLOAD_PHASE_MARGIN = timedelta(seconds=20)
+# Backoff window for unreachable local IPs, doubled per consecutive failure
+LOCAL_IP_BACKOFF_BASE = timedelta(seconds=30)
+LOCAL_IP_BACKOFF_MAX = timedelta(minutes=30)
 
 # Subentry types
 SUBENTRY_TYPE_INVERTER = "inverter"
@@ -30,11 +84,20 @@ CONF_PARENT_INVERTER = "parent_inverter_serial"
 CONF_INVERTER_MODEL = "inverter_model"
 CONF_EV_CHARGER_MODEL = "ev_charger_model"
 CONF_DISABLE_NOTIFICATIONS = "disable_notifications"
+CONF_LOCAL_FIRST = "local_first"
 CONF_SCAN_INTERVAL_SECONDS = "scan_interval_seconds"
 
+# Dispatcher signals (formatted with the config entry ID)
+SIGNAL_SUBENTRY_UPDATED = f"{DOMAIN}_subentry_updated_{{}}"
+SIGNAL_NEW_DATA_KEYS = f"{DOMAIN}_new_data_keys_{{}}"
+
 KNOWN_INVERTERS = ["Storion-S5", "SMILE5-INV", "VT1000", "SMILE-T10-HV-INV", "SMILE-G3-B5-INV", "SMILE-G3-T10-INV", "SMILE-S6-HV-INV"]  # List of known inverters
 
 KNOWN_CHARGERS = ["SMILE-EVCT11", "SMILE-EVCS7"]
+
+# EV charger model -> (phases, maximum current)
+EV_CHARGER_LIMITS = {"SMILE-EVCT11": (3, 16), "SMILE-EVCS7": (1, 32)}
+DEFAULT_EV_CHARGER_LIMITS = (1, 16)
 # Set blacklist for certain inverters from certain sensors
 INVERTER_SETTING_BLACKLIST = [
     "VT1000"]  # Blacklist sensors for setting discharge/charge amount and sending discharge and charge amount
@@ -1,28 +1,126 @@
 """Coordinator for AlphaEss integration."""
+import asyncio
+from dataclasses import asdict
+from functools import partial
 import logging
+import time
 from datetime import datetime, timedelta
-from typing import Any, Dict, Optional, Union
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Union
 
 import aiohttp
 from alphaess import alphaess
+from alphaess.alphaess import BASEURL
+import numpy as np
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import dt as dt_util
 
 from .const import (
+    ALPHA_POST_REQUEST_RESTRICTION,
+    API_CALL_INTERVAL,
+    API_CALL_TIMEOUT,
+    COMMAND_RETRIES,
+    COMMAND_RETRY_DELAY,
+    CONFIG_READBACK_ATTEMPTS,
+    CONFIG_READBACK_DELAY,
     CONF_IP_ADDRESS,
+    CONF_PARENT_INVERTER,
     CONF_SERIAL_NUMBER,
+    DEFAULT_EV_CHARGER_LIMITS,
     DOMAIN,
+    EV_CHARGER_LIMITS,
+    EV_SOLAR_ADJUST_INTERVAL,
+    EV_SOLAR_MIN_CURRENT,
+    EV_SOLAR_MIN_ON_TIME,
+    EV_SOLAR_STOP_HYSTERESIS,
+    EV_SOLAR_VOLTAGE,
+    LOCAL_CALL_TIMEOUT,
+    LOCAL_IP_BACKOFF_BASE,
+    LOCAL_IP_BACKOFF_MAX,
     LOWER_INVERTER_API_CALL_LIST,
+    MIN_SCAN_INTERVAL_SECONDS,
+    OFFLINE_WRITE_TTL,
+    DAILY_ENERGY_INTERVAL,
+    PHASE_IMBALANCE_MIN_POWER,
+    PHASE_IMBALANCE_THRESHOLD,
+    ENERGY_SAMPLE_MAX_GAP,
+    PEAK_SHAVING_EXTEND_MARGIN,
+    PEAK_SHAVING_HYSTERESIS,
+    PEAK_SHAVING_LIMIT,
+    PEAK_SHAVING_MIN_WRITE_INTERVAL,
+    PEAK_SHAVING_PHASE_LIMIT,
+    PEAK_SHAVING_WINDOW,
+    PENDING_WRITE_TTL,
+    REFRESH_DEADLINE,
     SCAN_INTERVAL,
+    SCHEDULE_REPLAY_DAYS,
+    SIGNAL_NEW_DATA_KEYS,
     SUBENTRY_TYPE_EV_CHARGER,
     SUBENTRY_TYPE_INVERTER,
+    UPLOAD_PHASE_MARGIN,
 )
 from .enums import AlphaESSNames
+from .commands import CommandQueue
+from .ev_solar import EvCommand, SolarSurplusController
+from .history import POWER_ROW_FIELDS, HistoryBackfill
+from .integrator import DailyEnergyIntegrator, flows
+from .local_health import LocalIpHealth
+from .offline import OfflineWriteQueue
+from .optimizer import (
+    MAX_WINDOWS,
+    SLOT_SECONDS,
+    BatteryLimits,
+    horizon_start,
+    optimize_schedule,
+    slot_profile,
+    slot_values,
+    window_times,
+)
+from .analytics import RollingEnergyStats
+from .overlay import MISSING, PendingWrites, values_match
+from .peak_shaving import PeakShaver
+from .phases import PhaseBalance
+from .pv_strings import PvStringStats
+from .rainflow import BatteryWearStats
+from .rate_limiter import ApiRateLimiter
+from .simulator import ScheduleConfig, SimulationResult, samples_from_rows, simulate
+from .scheduling import UploadPhaseTracker
+from .timeseries import PowerSeries
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
+# Keys populated from the inverter's local API (see parse_local_ip_data)
+LOCAL_IP_DATA_KEYS = (
+    AlphaESSNames.localIP,
+    AlphaESSNames.deviceStatus,
+    AlphaESSNames.cloudConnectionStatus,
+    AlphaESSNames.wifiStatus,
+    AlphaESSNames.connectedSSID,
+    AlphaESSNames.wifiDHCP,
+    AlphaESSNames.wifiIP,
+    AlphaESSNames.wifiMask,
+    AlphaESSNames.wifiGateway,
+    AlphaESSNames.deviceSerialNumber,
+    AlphaESSNames.registerKey,
+    AlphaESSNames.hardwareVersion,
+    AlphaESSNames.softwareVersion,
+    AlphaESSNames.apn,
+    AlphaESSNames.username,
+    AlphaESSNames.password,
+    AlphaESSNames.ethernetModule,
+    AlphaESSNames.fourGModule,
+)
+
+# Sections holding the charge and discharge settings
+CONFIG_SECTIONS = ("ChargeConfig", "DisChargeConfig")
+
+# Source tags recorded per data key
+SOURCE_CLOUD = "cloud"
+SOURCE_LOCAL = "local"
+
 
 class DataProcessor:
     """Helper class for data processing utilities."""
@@ -326,6 +424,7 @@ class AlphaESSDataUpdateCoordinator(DataUpdateCoordinator):
         inverter_models: list[str] | None = None,
         entry: ConfigEntry | None = None,
         scan_interval: timedelta | None = None,
+        local_first_serials: set[str] | None = None,
     ) -> None:
         """Initialize coordinator."""
         super().__init__(
@@ -336,26 +435,125 @@ class AlphaESSDataUpdateCoordinator(DataUpdateCoordinator):
         )
         self.api = client
         self.hass = hass
+        # Configured poll cadence; update_interval is re-phased around it
+        self.scan_interval = scan_interval or SCAN_INTERVAL
         self.data: dict[str, dict[str, float]] = {}
         self.entry = entry
 
         # Per-inverter IP address mapping
         self.ip_address_map = ip_address_map or {}
 
+        # Inverters whose local API is read on every refresh and wins over the cloud
+        self.local_first_serials: set[str] = local_first_serials or set()
+
+        # Latest parsed local API data per serial, and the source of every key
+        self._local_snapshots: dict[str, Dict[str, Any]] = {}
+        self.data_sources: dict[str, dict[str, str]] = {}
+
+        # The client's ipaddress is shared state, so local calls take turns
+        self._local_api_lock = asyncio.Lock()
+
+        # Per-serial reachability of the local API, used to skip dead IPs
+        self.local_ip_health: dict[str, LocalIpHealth] = {}
+
         # Track whether cloud API is reachable
         self.cloud_available = True
 
+        # Systems returned by the last successful getESSList, for discovery
+        self.ess_list: list[Dict[str, Any]] = []
+
+        # Shared limiter for on-demand cloud calls outside the regular poll
+        self.rate_limiter = ApiRateLimiter(API_CALL_INTERVAL.total_seconds())
+        self.history = HistoryBackfill(hass, client, self.rate_limiter)
+
+        # Intraday power series per serial, appended from OneDayPower
+        self.power_series: dict[str, PowerSeries] = {}
+
+        # Per-serial cloud upload phase, learned from OneDayPower timestamps
+        self._phase_trackers: dict[str, UploadPhaseTracker] = {}
+
+        # Per-serial, per-section (fingerprint, parsed fragment) cache
+        self._section_cache: dict[str, dict[str, tuple[int, Dict[str, Any]]]] = {}
+
+        # Last raw payload of each section, and the sections that missed the
+        # deadline on the latest refresh and are still showing old values
+        self._last_sections: dict[str, dict[str, Any]] = {}
+        self.stale_sections: dict[str, set[str]] = {}
+        self._running_refresh: asyncio.Future | None = None
+
         # Initialize helpers
         self.data_processor = DataProcessor()
         self.time_helper = TimeHelper()
         self.parser = InverterDataParser(self.data_processor)
 
         # Store inverter info as instance state (no more globals)
-        self.model_list = inverter_models or []
+        self._configure_throttle(inverter_models or [])
+
+        # Ordered, throttled writes per inverter
+        restriction = ALPHA_POST_REQUEST_RESTRICTION.total_seconds()
+        self.commands = CommandQueue(
+            hass,
+            entry,
+            self._async_execute_command,
+            spacing={"ChargeConfig": restriction, "DisChargeConfig": restriction},
+            retries=COMMAND_RETRIES,
+            retry_delay=COMMAND_RETRY_DELAY.total_seconds(),
+        )
+
+        # Written values shown until the cloud reports them
+        self.pending = PendingWrites(PENDING_WRITE_TTL)
+        # Latest read-back per (serial, config section), awaited by services
+        self._readbacks: dict[tuple[str, str], asyncio.Task] = {}
+
+        # Solar surplus EV charging per inverter serial, and its in-flight commands
+        self.ev_solar: dict[str, SolarSurplusController] = {}
+        self._ev_solar_tasks: dict[str, asyncio.Task] = {}
+
+        # Peak shaving state per inverter serial
+        self.peak_shavers: dict[str, PeakShaver] = {}
+
+        # Config changes made while the cloud is down, replayed when it returns
+        self.offline_writes = OfflineWriteQueue(
+            hass, entry.entry_id if entry else DOMAIN, OFFLINE_WRITE_TTL
+        )
+
+        # Rolling energy windows, integrated from each fresh LastPower sample
+        self.energy_stats = RollingEnergyStats(
+            hass, entry.entry_id if entry else DOMAIN, self._energy_max_gap()
+        )
+
+        # Cycle counts and lifetime battery energy, from the same samples
+        self.battery_wear = BatteryWearStats(
+            hass, entry.entry_id if entry else DOMAIN, self._energy_max_gap()
+        )
+
+        # Grid phase imbalance of three-phase inverters, from the same samples
+        self.phase_balance: dict[str, PhaseBalance] = {}
+
+        # PV string share baselines, from the same samples
+        self.pv_strings = PvStringStats(hass, entry.entry_id if entry else DOMAIN)
+
+        # Today's energy per serial integrated from the same samples, and
+        # when OneDateEnergy was last fetched (date, monotonic time)
+        self.daily_energy: dict[str, DailyEnergyIntegrator] = {}
+        self._daily_energy_fetched: dict[str, tuple[str, float]] = {}
+
+        # Keys with a value per serial, used to detect newly available data
+        self._known_keys: dict[str, frozenset] = {}
+
+        # Build subentry lookup for device info
+        self._inverter_subentry_map: dict[str, str] = {}
+        self._ev_charger_subentry_map: dict[str, str] = {}
+        self._ev_charger_parents: dict[str, str] = {}
+        if entry:
+            self.sync_subentries(entry, self.model_list)
+
+    def _configure_throttle(self, inverter_models: list[str]) -> None:
+        """Configure throttling based on inverter types."""
+        self.model_list = inverter_models
         self.inverter_count = len(self.model_list)
         self.LOCAL_INVERTER_COUNT = 0 if self.inverter_count <= 1 else self.inverter_count
 
-        # Configure throttling based on inverter types
         self.throttle_multiplier = 0.0
         self.has_throttle = True
         if (all(inverter not in self.model_list for inverter in LOWER_INVERTER_API_CALL_LIST)
@@ -363,20 +561,143 @@ class AlphaESSDataUpdateCoordinator(DataUpdateCoordinator):
             self.has_throttle = False
             self.throttle_multiplier = 1.25
 
-        # Per-serial throttle tracking for charge/discharge buttons (monotonic timestamps)
-        self.last_discharge_update: dict[str, float] = {}
-        self.last_charge_update: dict[str, float] = {}
+    def sync_subentries(
+        self, entry: ConfigEntry, inverter_models: list[str]
+    ) -> tuple[list[str], dict[str, str]]:
+        """Refresh subentry lookups from the config entry.
 
-        # Build subentry lookup for device info
-        self._inverter_subentry_map: dict[str, str] = {}
-        self._ev_charger_subentry_map: dict[str, str] = {}
-        if entry:
-            for subentry_id, subentry in entry.subentries.items():
-                serial = subentry.data.get(CONF_SERIAL_NUMBER, "")
-                if subentry.subentry_type == SUBENTRY_TYPE_INVERTER:
-                    self._inverter_subentry_map[serial] = subentry_id
-                elif subentry.subentry_type == SUBENTRY_TYPE_EV_CHARGER:
-                    self._ev_charger_subentry_map[serial] = subentry_id
+        Returns the IDs of subentries that were not known before, and the
+        IDs of removed subentries mapped to the inverter serial they
+        belonged to (their own, or an EV charger's parent inverter).
+        """
+        previous = {
+            subentry_id: serial for serial, subentry_id in self._inverter_subentry_map.items()
+        }
+        previous.update(self._ev_charger_parents)
+        known = set(self._inverter_subentry_map.values()) | set(self._ev_charger_subentry_map.values())
+
+        self._inverter_subentry_map = {}
+        self._ev_charger_subentry_map = {}
+        self._ev_charger_parents = {}
+        for subentry_id, subentry in entry.subentries.items():
+            serial = subentry.data.get(CONF_SERIAL_NUMBER, "")
+            if subentry.subentry_type == SUBENTRY_TYPE_INVERTER:
+                self._inverter_subentry_map[serial] = subentry_id
+            elif subentry.subentry_type == SUBENTRY_TYPE_EV_CHARGER:
+                self._ev_charger_subentry_map[serial] = subentry_id
+                self._ev_charger_parents[subentry_id] = subentry.data.get(CONF_PARENT_INVERTER, "")
+
+        if inverter_models != self.model_list:
+            self._configure_throttle(inverter_models)
+
+        added = [subentry_id for subentry_id in entry.subentries if subentry_id not in known]
+        removed = {
+            subentry_id: serial for subentry_id, serial in previous.items()
+            if subentry_id not in entry.subentries
+        }
+        return added, removed
+
+    def remove_serials(self, serials: Iterable[str]) -> None:
+        """Drop the state kept for inverters that no longer have a subentry."""
+        for serial in serials:
+            _LOGGER.debug(f"Dropping state of removed inverter {serial}")
+            for state in (
+                self.data, self.data_sources, self._local_snapshots, self.local_ip_health,
+                self.power_series, self._phase_trackers, self._section_cache,
+                self._last_sections, self.stale_sections, self.ev_solar, self.peak_shavers,
+                self.phase_balance, self.daily_energy, self._daily_energy_fetched, self._known_keys,
+            ):
+                state.pop(serial, None)
+            if task := self._ev_solar_tasks.pop(serial, None):
+                task.cancel()
+            self.energy_stats.remove(serial)
+            self.battery_wear.remove(serial)
+            self.pv_strings.remove(serial)
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all listeners, then announce any newly available data keys.
+
+        Pending writes the new snapshot confirms are dropped first.
+        """
+        if self.data:
+            self.pending.reconcile(self.data)
+        super().async_update_listeners()
+        self._async_track_new_keys()
+        if self.ev_solar:
+            self._async_run_ev_solar()
+        if any(shaver.enabled or shaver.active for shaver in self.peak_shavers.values()):
+            self._async_run_peak_shaving()
+
+    @callback
+    def _async_track_new_keys(self) -> None:
+        """Signal platforms when a serial gains keys it did not have before.
+
+        Platforms decide their entity set from the data snapshot, so an EV
+        connector or local API that comes online later needs its entities
+        added on the fly. The first snapshot only seeds the baseline.
+        """
+        if not self.data:
+            return
+
+        seeded = bool(self._known_keys)
+        appeared: list[str] = []
+        for serial, serial_data in self.data.items():
+            keys = frozenset(key for key, value in serial_data.items() if value is not None)
+            if serial in self.phase_balance:
+                # Phase sensors depend on three-phase operation seen, not on a key
+                keys |= {"phase_balance"}
+            previous = self._known_keys.get(serial)
+            self._known_keys[serial] = keys
+            if previous is None:
+                if seeded:
+                    appeared.append(serial)
+            elif not keys <= previous:
+                appeared.append(serial)
+
+        if appeared and self.entry is not None:
+            _LOGGER.debug("New data keys available for %s", appeared)
+            async_dispatcher_send(
+                self.hass, SIGNAL_NEW_DATA_KEYS.format(self.entry.entry_id), appeared
+            )
+
+    def set_scan_interval(self, scan_interval: timedelta) -> None:
+        """Change the configured poll cadence of the running coordinator."""
+        self.scan_interval = scan_interval
+        self.update_interval = self._phase_locked_interval()
+        self.energy_stats.max_gap = self._energy_max_gap().total_seconds()
+        self.battery_wear.max_gap = self.energy_stats.max_gap
+
+    def _energy_max_gap(self) -> timedelta:
+        """Return the longest sample gap integrated into energy at this scan interval."""
+        return max(ENERGY_SAMPLE_MAX_GAP, 3 * self.scan_interval)
+
+    def _phase_locked_interval(self) -> timedelta:
+        """Return the delay to the next poll, aligned to the cloud upload phase.
+
+        The next poll is nominally one scan interval away. If an inverter is
+        expected to upload within half an interval of that, the poll is moved
+        to just after the upload so fresh samples are read as soon as they
+        land instead of up to a full interval late. The average cadence stays
+        at the configured scan interval.
+        """
+        base = self.scan_interval.total_seconds()
+        margin = UPLOAD_PHASE_MARGIN.total_seconds()
+        now = time.time()
+        target = now + base
+
+        best: float | None = None
+        for tracker in self._phase_trackers.values():
+            upload = tracker.next_upload_after(target - base / 2 - margin)
+            if upload is None:
+                continue
+            poll = upload + margin
+            if abs(poll - target) <= base / 2 and (best is None or abs(poll - target) < abs(best - target)):
+                best = poll
+
+        if best is None:
+            return self.scan_interval
+        return timedelta(seconds=max(MIN_SCAN_INTERVAL_SECONDS, best - now))
 
     def get_inverter_subentry_id(self, serial: str) -> str | None:
         """Get the subentry ID for an inverter by its serial number."""
@@ -386,15 +707,427 @@ class AlphaESSDataUpdateCoordinator(DataUpdateCoordinator):
         """Get the subentry ID for an EV charger by its serial number."""
         return self._ev_charger_subentry_map.get(ev_serial)
 
+    def update_ip_address_map(self, ip_address_map: dict[str, str | None]) -> list[str]:
+        """Replace the per-inverter IP mapping and return serials whose IP changed."""
+        changed = [
+            serial
+            for serial in set(self.ip_address_map) | set(ip_address_map)
+            if self.ip_address_map.get(serial) != ip_address_map.get(serial)
+        ]
+        self.ip_address_map = ip_address_map
+        for serial in changed:
+            self.local_ip_health.pop(serial, None)
+        return changed
+
+    async def async_refresh_local_ip_data(self, serial: str) -> None:
+        """Drop stale local IP data for one inverter and fetch it again."""
+        serial_data = self.data.get(serial)
+        if serial_data is None:
+            return
+
+        for key in LOCAL_IP_DATA_KEYS:
+            serial_data.pop(key, None)
+            self.data_sources.get(serial, {}).pop(key, None)
+        self._local_snapshots.pop(serial, None)
+
+        ip = self.ip_address_map.get(serial)
+        if not ip:
+            return
+
+        try:
+            parsed = await self._async_fetch_local_ip(serial, ip)
+            if parsed:
+                self._merge_local_data(serial, parsed)
+        except Exception as error:
+            _LOGGER.debug(f"Could not fetch local IP data for {serial} from {ip}: {error}")
+
+    def get_data_source(self, serial: str, key: str) -> str | None:
+        """Return whether a key's current value came from the cloud or local API."""
+        return self.data_sources.get(serial, {}).get(key)
+
+    def is_stale(self, serial: str, key: str) -> bool:
+        """Return True if a key still shows a value from before the latest refresh."""
+        serial_cache = self._section_cache.get(serial, {})
+        for section in self.stale_sections.get(serial, ()):
+            cached = serial_cache.get(section)
+            if cached is not None and key in cached[1]:
+                return True
+        return False
+
+    async def _async_fetch_local_ip(self, serial: str, ip: str) -> Optional[Dict[str, Any]]:
+        """Fetch and parse the local API of one inverter.
+
+        Temporarily sets the API client's ipaddress for the call,
+        then resets it to None. Returns None without calling the IP while
+        it is backing off after failures.
+        """
+        health = self.local_ip_health.setdefault(
+            serial, LocalIpHealth(LOCAL_IP_BACKOFF_BASE, LOCAL_IP_BACKOFF_MAX)
+        )
+
+        async with self._local_api_lock:
+            if not health.should_try():
+                return None
+            try:
+                self.api.ipaddress = ip
+                async with asyncio.timeout(LOCAL_CALL_TIMEOUT.total_seconds()):
+                    local_ip_raw = await self.api.getIPData()
+            except Exception as error:
+                self._record_local_failure(serial, ip, health, str(error))
+                raise
+            finally:
+                self.api.ipaddress = None
+
+        # getIPData swallows request errors and returns None per endpoint
+        if not local_ip_raw or not any(local_ip_raw.values()):
+            self._record_local_failure(serial, ip, health, "no response")
+            return None
+
+        if health.consecutive_failures:
+            _LOGGER.info(f"Local API for {serial} at {ip} is reachable again")
+        health.record_success()
+        return await self.parser.parse_local_ip_data({"ip": ip, **local_ip_raw})
+
+    @staticmethod
+    def _record_local_failure(serial: str, ip: str, health: LocalIpHealth, error: str) -> None:
+        """Count a failed local call, warning only when the IP first goes down."""
+        health.record_failure(error)
+        if health.consecutive_failures == 1:
+            _LOGGER.warning(
+                f"Local API for {serial} at {ip} is unreachable ({error}); "
+                f"backing off before retrying"
+            )
+        else:
+            _LOGGER.debug(
+                f"Local API for {serial} at {ip} failed {health.consecutive_failures} "
+                f"times in a row ({error})"
+            )
+
+    def _merge_local_data(self, serial: str, parsed: Dict[str, Any]) -> bool:
+        """Merge local API values into a serial's snapshot, tagging them as local.
+
+        Returns True if any value changed.
+        """
+        self._local_snapshots[serial] = parsed
+        serial_data = self.data.setdefault(serial, {})
+        sources = self.data_sources.setdefault(serial, {})
+
+        changed = False
+        for key, value in parsed.items():
+            if key not in serial_data or serial_data[key] != value:
+                serial_data[key] = value
+                changed = True
+            sources[key] = SOURCE_LOCAL
+        return changed
+
+    def get_value(self, serial: str, key: str) -> Any:
+        """Return a key's value, preferring a pending write over the snapshot."""
+        value = self.pending.get(serial, key)
+        if value is MISSING:
+            return (self.data or {}).get(serial, {}).get(key)
+        return value
+
+    @callback
+    def async_set_pending(
+        self, serial: str, values: Dict[str, Any], ttl: timedelta | None = None
+    ) -> None:
+        """Show written values until the cloud confirms them or they expire."""
+        self.pending.set(serial, values, ttl)
+        self.async_update_listeners()
+
+    @callback
+    def async_discard_pending(self, serial: str, keys: list[str]) -> None:
+        """Drop pending values after a failed write."""
+        self.pending.discard(serial, keys)
+        self.async_update_listeners()
+
+    @staticmethod
+    def charge_config_values(
+        bat_high_cap: Any, grid_charge: int,
+        time_chaf1: str, time_chae1: str, time_chaf2: str, time_chae2: str,
+    ) -> Dict[str, Any]:
+        """Return the data keys a charge config write sets, as parse_charge_config names them."""
+        return {
+            AlphaESSNames.batHighCap: bat_high_cap,
+            "gridCharge": grid_charge,
+            AlphaESSNames.ChargeTime1: f"{time_chaf1} - {time_chae1}",
+            AlphaESSNames.ChargeTime2: f"{time_chaf2} - {time_chae2}",
+            "charge_timeChaf1": time_chaf1,
+            "charge_timeChae1": time_chae1,
+            "charge_timeChaf2": time_chaf2,
+            "charge_timeChae2": time_chae2,
+        }
+
+    @staticmethod
+    def discharge_config_values(
+        bat_use_cap: Any, ctr_dis: int,
+        time_disf1: str, time_dise1: str, time_disf2: str, time_dise2: str,
+    ) -> Dict[str, Any]:
+        """Return the data keys a discharge config write sets, as parse_discharge_config names them."""
+        return {
+            AlphaESSNames.batUseCap: bat_use_cap,
+            "ctrDis": ctr_dis,
+            AlphaESSNames.DischargeTime1: f"{time_disf1} - {time_dise1}",
+            AlphaESSNames.DischargeTime2: f"{time_disf2} - {time_dise2}",
+            "discharge_timeDisf1": time_disf1,
+            "discharge_timeDise1": time_dise1,
+            "discharge_timeDisf2": time_disf2,
+            "discharge_timeDise2": time_dise2,
+        }
+
+    @callback
+    def async_confirm_config(self, serial: str, section: str, expected: Dict[str, Any]) -> None:
+        """Read back one config section in the background until a write shows up."""
+        coro = self.async_refresh_config(serial, (section,), expected)
+        name = f"{DOMAIN} {section} read-back for {serial}"
+        if self.entry is not None:
+            task = self.entry.async_create_background_task(self.hass, coro, name)
+        else:
+            task = self.hass.async_create_background_task(coro, name)
+        self._readbacks[(serial, section)] = task
+        task.add_done_callback(partial(self._async_readback_done, (serial, section)))
+
+    @callback
+    def _async_readback_done(self, key: tuple[str, str], task: asyncio.Task) -> None:
+        """Forget a finished read-back unless a newer one replaced it."""
+        if self._readbacks.get(key) is task:
+            del self._readbacks[key]
+
+    async def async_shutdown(self) -> None:
+        """Cancel outstanding read-backs, then shut the coordinator down."""
+        for task in self._readbacks.values():
+            task.cancel()
+        self._readbacks.clear()
+        await super().async_shutdown()
+
+    async def async_apply_config(self, serial: str, section: str, changes: Dict[str, Any]) -> str:
+        """Queue a config change and wait until the cloud confirms it.
+
+        Returns ``confirmed`` or ``unconfirmed`` depending on the read-back,
+        or ``saved_offline`` if the cloud is down and the change was stored
+        for later. Errors from the write itself are raised.
+        """
+        if not self.cloud_available:
+            self.async_queue_config(serial, section, changes)
+            return "saved_offline"
+
+        await self.async_queue_config(serial, section, changes)
+        readback = self._readbacks.get((serial, section))
+        if readback is None:
+            return "unconfirmed"
+        # Shielded so a cancelled caller does not stop the entities' read-back
+        return "confirmed" if await asyncio.shield(readback) else "unconfirmed"
+
+    async def async_refresh_config(
+        self,
+        serial: str,
+        sections: tuple[str, ...] = CONFIG_SECTIONS,
+        expected: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Re-read only the config sections of one inverter.
+
+        This confirms a write with one or two API calls instead of a full
+        sweep of every inverter. With ``expected`` values, the read is
+        retried with a doubling delay until the cloud reports all of them.
+        Returns True once confirmed.
+        """
+        delay = CONFIG_READBACK_DELAY.total_seconds()
+        for attempt in range(1, CONFIG_READBACK_ATTEMPTS + 1):
+            # The cloud takes a moment to reflect a write, so always wait first
+            await asyncio.sleep(delay)
+            delay *= 2
+
+            await self._async_read_config(serial, sections)
+            if expected is None or self._config_matches(serial, expected):
+                self.async_update_listeners()
+                return True
+
+            _LOGGER.debug(
+                f"Config for {serial} not yet updated to {expected} "
+                f"(attempt {attempt}/{CONFIG_READBACK_ATTEMPTS})"
+            )
+
+        _LOGGER.warning(f"Cloud did not confirm config change for {serial}: {expected}")
+        self.async_update_listeners()
+        return False
+
+    async def _async_read_config(self, serial: str, sections: tuple[str, ...]) -> None:
+        """Fetch and parse config sections of one inverter into its data."""
+        serial_data = self.data.get(serial)
+        if serial_data is None:
+            return
+
+        handlers = {
+            "ChargeConfig": (self.api.getChargeConfigInfo, self.parser.parse_charge_config),
+            "DisChargeConfig": (self.api.getDisChargeConfigInfo, self.parser.parse_discharge_config),
+        }
+        last_sections = self._last_sections.setdefault(serial, {})
+
+        for section in sections:
+            fetch, parse = handlers[section]
+            try:
+                async with self.rate_limiter:
+                    async with asyncio.timeout(API_CALL_TIMEOUT.total_seconds()):
+                        raw = await fetch(serial)
+            except TimeoutError:
+                raw = None
+            # The client swallows request errors and returns None; keep the
+            # last good payload instead of overwriting it
+            if not raw:
+                _LOGGER.debug(f"Could not read {section} for {serial}")
+                continue
+
+            last_sections[section] = raw
+            parsed = await self._parse_section(serial, section, raw, lambda: parse(raw))
+            serial_data.update(parsed)
+            self.data_sources.setdefault(serial, {}).update(dict.fromkeys(parsed, SOURCE_CLOUD))
+            self.stale_sections.get(serial, set()).discard(section)
+
+        charge_config = last_sections.get("ChargeConfig")
+        discharge_config = last_sections.get("DisChargeConfig")
+        if charge_config or discharge_config:
+            serial_data[AlphaESSNames.ChargeRange] = self._format_charge_range(charge_config, discharge_config)
+
+    def _config_matches(self, serial: str, expected: Dict[str, Any]) -> bool:
+        """Return True if every expected value is what the cloud reports."""
+        serial_data = self.data.get(serial, {})
+        return all(values_match(serial_data.get(key), value) for key, value in expected.items())
+
     async def set_ev_charger_current(self, serial: str, value: int) -> None:
         """Set EV charger current setting."""
-        result = await self.api.setEvChargerCurrentsBySn(serial, value)
-        _LOGGER.info(
-            "Set EV charger current for %s to %sA - Result: %s",
-            serial, value, result,
-        )
+        self.async_set_pending(serial, {AlphaESSNames.evcurrentsetting: value})
+        try:
+            await self.commands.submit(serial, "ev_current", value)
+        except Exception:
+            self.async_discard_pending(serial, [AlphaESSNames.evcurrentsetting])
+            raise
         await self.async_request_refresh()
 
+    @callback
+    def async_set_ev_solar(self, serial: str, enabled: bool) -> None:
+        """Turn solar surplus charging of an inverter's EV charger on or off."""
+        if not enabled:
+            self.ev_solar.pop(serial, None)
+            return
+
+        model = self.data.get(serial, {}).get(AlphaESSNames.evchargermodel)
+        phases, max_current = EV_CHARGER_LIMITS.get(model, DEFAULT_EV_CHARGER_LIMITS)
+        self.ev_solar[serial] = SolarSurplusController(
+            phases=phases,
+            max_current=max_current,
+            min_current=EV_SOLAR_MIN_CURRENT,
+            voltage=EV_SOLAR_VOLTAGE,
+            stop_hysteresis=EV_SOLAR_STOP_HYSTERESIS,
+            min_on_time=EV_SOLAR_MIN_ON_TIME.total_seconds(),
+            adjust_interval=EV_SOLAR_ADJUST_INTERVAL.total_seconds(),
+        )
+        self._async_run_ev_solar()
+
+    @callback
+    def _async_run_ev_solar(self) -> None:
+        """Feed the latest power values to each solar surplus controller.
+
+        Runs on every listener update, so it reacts as soon as a cloud
+        refresh or a local poll lands.
+        """
+        if not self.cloud_available:
+            return
+
+        for serial, controller in self.ev_solar.items():
+            if serial in self._ev_solar_tasks:
+                continue
+            serial_data = self.data.get(serial, {})
+            grid = serial_data.get(AlphaESSNames.GridIOTotal)
+            battery = serial_data.get(AlphaESSNames.BatteryIO)
+            ev = serial_data.get(AlphaESSNames.pev)
+            if None in (grid, battery, ev) or self.is_stale(serial, AlphaESSNames.GridIOTotal):
+                continue
+
+            setpoint = self.get_value(serial, AlphaESSNames.evcurrentsetting)
+            command = controller.update(
+                time.monotonic(), float(grid), float(battery), float(ev),
+                self.get_ev_charger_status_raw(serial),
+                int(setpoint) if setpoint not in (None, "") else None,
+            )
+            if command is None:
+                continue
+
+            coro = self._async_send_ev_command(serial, serial_data.get(AlphaESSNames.evchargersn), command)
+            name = f"{DOMAIN} solar surplus charging {serial}"
+            if self.entry is not None:
+                task = self.entry.async_create_background_task(self.hass, coro, name)
+            else:
+                task = self.hass.async_create_background_task(coro, name)
+            self._ev_solar_tasks[serial] = task
+            task.add_done_callback(lambda _task, serial=serial: self._ev_solar_tasks.pop(serial, None))
+
+    async def _async_send_ev_command(self, serial: str, ev_serial: str | None, command: EvCommand) -> None:
+        """Send a solar surplus controller command to the EV charger."""
+        _LOGGER.debug(f"Solar surplus charging for {serial}: {command}")
+        try:
+            if command.current is not None:
+                await self.set_ev_charger_current(serial, command.current)
+            if command.direction is not None and ev_serial:
+                await self.control_ev(serial, ev_serial, command.direction)
+        except Exception as err:  # The next update simply tries again
+            _LOGGER.warning(f"Solar surplus charging command for {serial} failed: {err}")
+
+    def peak_shaver(self, serial: str) -> PeakShaver:
+        """Return the peak shaving state of an inverter, created on first use."""
+        if serial not in self.peak_shavers:
+            self.peak_shavers[serial] = PeakShaver(
+                limit=PEAK_SHAVING_LIMIT,
+                phase_limit=PEAK_SHAVING_PHASE_LIMIT,
+                hysteresis=PEAK_SHAVING_HYSTERESIS,
+                window=PEAK_SHAVING_WINDOW,
+                extend_margin=PEAK_SHAVING_EXTEND_MARGIN,
+                min_write_interval=PEAK_SHAVING_MIN_WRITE_INTERVAL,
+            )
+        return self.peak_shavers[serial]
+
+    @callback
+    def _async_run_peak_shaving(self) -> None:
+        """Open, extend or give back peak shaving discharge windows.
+
+        Runs on every listener update like solar surplus charging. Windows
+        are written through the config queue, which keeps the API spacing.
+        """
+        if not self.cloud_available:
+            return
+
+        now = dt_util.now()
+        for serial, shaver in self.peak_shavers.items():
+            serial_data = self.data.get(serial, {})
+            grid = serial_data.get(AlphaESSNames.GridIOTotal)
+            battery = serial_data.get(AlphaESSNames.BatteryIO)
+            if None in (grid, battery) or self.is_stale(serial, AlphaESSNames.GridIOTotal):
+                continue
+
+            phases = [
+                float(value) for key in (AlphaESSNames.GridIOL1, AlphaESSNames.GridIOL2, AlphaESSNames.GridIOL3)
+                if (value := serial_data.get(key)) is not None
+            ]
+            schedule = self.current_schedule(serial)
+            soc = serial_data.get(AlphaESSNames.BatterySOC)
+            window = shaver.update(
+                now, float(grid), float(battery), phases,
+                schedule.discharge_control, schedule.discharge_windows,
+                can_discharge=soc is not None and float(soc) > schedule.min_soc,
+            )
+            if window is None:
+                continue
+
+            start, end = window
+            _LOGGER.info(
+                f"Peak shaving {'active' if shaver.active else 'ended'} for {serial}, "
+                f"discharge window 2 set to {start} - {end}"
+            )
+            self.async_queue_config(serial, "DisChargeConfig", {
+                "discharge_timeDisf2": start,
+                "discharge_timeDise2": end,
+                AlphaESSNames.DischargeTime2: f"{start} - {end}",
+            })
+
     def get_ev_charger_status_raw(self, serial: str) -> int | None:
         """Return EV charger raw status if available."""
         serial_data = self.data.get(serial, {})
@@ -424,115 +1157,414 @@ class AlphaESSDataUpdateCoordinator(DataUpdateCoordinator):
 
     async def control_ev(self, serial: str, ev_serial: str, direction: str) -> None:
         """Control EV charger."""
-        parsed_direction = int(direction)
-        if not self.can_control_ev(serial, parsed_direction):
-            _LOGGER.warning(
-                "Skipping EV control command for %s (%s), direction=%s due to incompatible state=%s",
-                serial,
-                ev_serial,
-                direction,
-                self.get_ev_charger_status_raw(serial),
-            )
-            return
-
-        result = await self.api.remoteControlEvCharger(serial, ev_serial, direction)
-        _LOGGER.info(
-            f"Control EV Charger: {ev_serial} for serial: {serial} "
-            f"Direction: {direction} - Result: {result}"
-        )
+        await self.commands.submit(serial, "ev_control", (ev_serial, direction))
 
     async def reset_config(self, serial: str) -> None:
         """Reset charge and discharge configuration."""
         bat_use_cap = self.hass.data[DOMAIN][serial].get("batUseCap", 10)
         bat_high_cap = self.hass.data[DOMAIN][serial].get("batHighCap", 90)
 
-        results = await self._reset_charge_discharge_config(serial, bat_high_cap, bat_use_cap)
-        _LOGGER.info(
-            f"Reset Charge and Discharge configuration - "
-            f"Charge: {results['charge']}, Discharge: {results['discharge']}"
-        )
-        # Optimistically update so switches reflect the change immediately
-        if serial in self.data:
-            self.data[serial]["gridCharge"] = 1
-            self.data[serial]["ctrDis"] = 1
-            self.async_set_updated_data(self.data)
-
-    async def _reset_charge_discharge_config(
-            self, serial: str, bat_high_cap: int, bat_use_cap: int
-    ) -> Dict[str, Any]:
-        """Internal method to reset configurations."""
-        charge_result = await self.api.updateChargeConfigInfo(
-            serial, bat_high_cap, 1, "00:00", "00:00", "00:00", "00:00"
+        self.async_queue_config(
+            serial, "ChargeConfig",
+            self.charge_config_values(bat_high_cap, 1, "00:00", "00:00", "00:00", "00:00"),
         )
-        discharge_result = await self.api.updateDisChargeConfigInfo(
-            serial, bat_use_cap, 1, "00:00", "00:00", "00:00", "00:00"
+        self.async_queue_config(
+            serial, "DisChargeConfig",
+            self.discharge_config_values(bat_use_cap, 1, "00:00", "00:00", "00:00", "00:00"),
         )
-        return {"charge": charge_result, "discharge": discharge_result}
 
     async def update_discharge(self, name: str, serial: str, time_period: int) -> None:
         """Update discharge configuration for specified time period."""
         bat_use_cap = self.hass.data[DOMAIN][serial].get(name)
         start_time, end_time = await self.time_helper.calculate_time_window(time_period)
 
-        result = await self.api.updateDisChargeConfigInfo(
-            serial, bat_use_cap, 1, end_time, "00:00", start_time, "00:00"
-        )
-
-        _LOGGER.info(
-            f"Updated discharge config - Capacity: {bat_use_cap}, "
-            f"Period: {start_time} to {end_time}, Result: {result}"
+        self.async_queue_config(
+            serial, "DisChargeConfig",
+            self.discharge_config_values(bat_use_cap, 1, start_time, end_time, "00:00", "00:00"),
         )
-        # Optimistically update so the discharge switch reflects enabled immediately
-        if serial in self.data:
-            self.data[serial]["ctrDis"] = 1
-            self.async_set_updated_data(self.data)
 
     async def update_charge(self, name: str, serial: str, time_period: int) -> None:
         """Update charge configuration for specified time period."""
         bat_high_cap = self.hass.data[DOMAIN][serial].get(name)
         start_time, end_time = await self.time_helper.calculate_time_window(time_period)
 
-        result = await self.api.updateChargeConfigInfo(
-            serial, bat_high_cap, 1, end_time, "00:00", start_time, "00:00"
+        self.async_queue_config(
+            serial, "ChargeConfig",
+            self.charge_config_values(bat_high_cap, 1, start_time, end_time, "00:00", "00:00"),
+        )
+
+    async def async_optimize_schedule(
+        self,
+        serial: str,
+        prices: list,
+        export_prices: list | float = 0.0,
+        load: Optional[list] = None,
+        pv: Optional[list] = None,
+        max_power: Optional[float] = None,
+        apply: bool = True,
+    ) -> Dict[str, Any]:
+        """Plan the cheapest charge/discharge windows for the next 24 hours.
+
+        Curves are resampled onto quarter-hour slots starting now. Without a
+        load or PV forecast, the average recorded OneDayPower profile is
+        used. Battery limits come from the inverter's capacity, nominal
+        power and its current batHighCap/batUseCap. The solve runs in an
+        executor, and with ``apply`` the windows are written through the
+        config queue. Raises ValueError if the inputs are not usable.
+        """
+        serial_data = self.data.get(serial)
+        if serial_data is None:
+            raise ValueError(f"Unknown serial {serial}")
+
+        start = horizon_start(dt_util.now())
+        curves = {"prices": slot_values(prices, start, dt_util.parse_datetime)}
+        if not isinstance(export_prices, (int, float)):
+            export_prices = slot_values(export_prices, start, dt_util.parse_datetime)
+
+        series = self.power_series.get(serial)
+        for name, forecast, column in (("load", load, "load"), ("pv", pv, "ppv")):
+            if forecast:
+                curves[name] = slot_values(forecast, start, dt_util.parse_datetime)
+            elif series is not None and len(series):
+                curves[name] = slot_profile(series.timestamps, series.columns[column], start)
+            if curves.get(name) is None:
+                raise ValueError(f"No {name} forecast given and no recorded power history for {serial}")
+
+        limits = self.battery_limits(serial, max_power)
+        soc = float(serial_data.get(AlphaESSNames.BatterySOC) or limits.min_soc)
+
+        started = time.perf_counter()
+        schedule = await self.hass.async_add_executor_job(
+            partial(
+                optimize_schedule, curves["prices"], curves["load"], curves["pv"], limits, soc,
+                export_prices=export_prices,
+            )
         )
+        solve_ms = (time.perf_counter() - started) * 1000
+        _LOGGER.debug(f"Optimized schedule for {serial} in {solve_ms:.1f} ms")
+
+        charge = window_times(schedule.charge_windows, start)
+        discharge = window_times(schedule.discharge_windows, start)
+        result: Dict[str, Any] = {
+            "charge_windows": [{"start": begin, "end": end} for begin, end in charge],
+            "discharge_windows": [{"start": begin, "end": end} for begin, end in discharge],
+            "expected_cost": round(schedule.cost, 4),
+            "baseline_cost": round(schedule.baseline_cost, 4),
+            "savings": round(schedule.savings, 4),
+            "end_soc": schedule.end_soc,
+            "baseline_end_soc": round(schedule.baseline_end_soc, 1),
+            "solve_ms": round(solve_ms, 1),
+        }
 
-        _LOGGER.info(
-            f"Updated charge config - Capacity: {bat_high_cap}, "
-            f"Period: {start_time} to {end_time}, Result: {result}"
+        idle = [("00:00", "00:00")] * MAX_WINDOWS
+        planned = ScheduleConfig(
+            grid_charge=bool(charge),
+            charge_windows=(charge + idle)[:MAX_WINDOWS],
+            discharge_control=True,
+            discharge_windows=(discharge + idle)[:MAX_WINDOWS],
+            max_soc=limits.max_soc,
+            min_soc=limits.min_soc,
         )
-        # Optimistically update so the charge switch reflects enabled immediately
-        if serial in self.data:
-            self.data[serial]["gridCharge"] = 1
-            self.async_set_updated_data(self.data)
+
+        # Compare with the current config on recorded days, using today's prices
+        first_slot = (start.hour * 3600 + start.minute * 60) // SLOT_SECONDS
+        try:
+            current_replay, planned_replay = await self.async_simulate(
+                serial, [self.current_schedule(serial), planned], SCHEDULE_REPLAY_DAYS,
+                price_profile=np.roll(curves["prices"], first_slot),
+                export_price=float(np.mean(export_prices)),
+                max_power=max_power,
+            )
+        except ValueError as err:
+            _LOGGER.debug(f"Skipping schedule replay for {serial}: {err}")
+        else:
+            result["replay"] = {
+                "current": {key: round(value, 3) for key, value in asdict(current_replay).items()},
+                "planned": {key: round(value, 3) for key, value in asdict(planned_replay).items()},
+            }
+
+        if not apply:
+            return result
+
+        (cp1start, cp1end), (cp2start, cp2end) = planned.charge_windows
+        (dp1start, dp1end), (dp2start, dp2end) = planned.discharge_windows
+        statuses = await asyncio.gather(
+            self.async_apply_config(serial, "ChargeConfig", self.charge_config_values(
+                int(limits.max_soc), int(bool(charge)), cp1start, cp1end, cp2start, cp2end,
+            )),
+            self.async_apply_config(serial, "DisChargeConfig", self.discharge_config_values(
+                int(limits.min_soc), 1, dp1start, dp1end, dp2start, dp2end,
+            )),
+        )
+        result["applied"] = dict(zip(CONFIG_SECTIONS, statuses))
+        return result
+
+    def battery_limits(self, serial: str, max_power: Optional[float] = None) -> BatteryLimits:
+        """Return the battery limits of an inverter from its data and config.
+
+        Raises ValueError if the capacity or the inverter power is unknown.
+        """
+        serial_data = self.data.get(serial, {})
+        installed = serial_data.get(AlphaESSNames.cobat)
+        nominal_power = max_power or serial_data.get(AlphaESSNames.poinv)
+        if not installed or not nominal_power:
+            raise ValueError(f"Battery capacity or inverter power of {serial} is unknown")
+        return BatteryLimits(
+            capacity=float(installed) * float(serial_data.get(AlphaESSNames.usCapacity) or 100) / 100,
+            max_power=float(nominal_power),
+            min_soc=float(self._config_value(serial, AlphaESSNames.batUseCap, 10)),
+            max_soc=float(self._config_value(serial, AlphaESSNames.batHighCap, 100)),
+        )
+
+    def current_schedule(self, serial: str) -> ScheduleConfig:
+        """Return the charge/discharge config an inverter currently runs."""
+        return ScheduleConfig(
+            grid_charge=bool(int(self._config_value(serial, "gridCharge", 0))),
+            charge_windows=[
+                (self._config_value(serial, f"charge_timeChaf{period}", "00:00"),
+                 self._config_value(serial, f"charge_timeChae{period}", "00:00"))
+                for period in (1, 2)
+            ],
+            discharge_control=bool(int(self._config_value(serial, "ctrDis", 0))),
+            discharge_windows=[
+                (self._config_value(serial, f"discharge_timeDisf{period}", "00:00"),
+                 self._config_value(serial, f"discharge_timeDise{period}", "00:00"))
+                for period in (1, 2)
+            ],
+            max_soc=float(self._config_value(serial, AlphaESSNames.batHighCap, 100)),
+            min_soc=float(self._config_value(serial, AlphaESSNames.batUseCap, 10)),
+        )
+
+    async def async_simulate(
+        self,
+        serial: str,
+        configs: list[ScheduleConfig],
+        days: int,
+        price_profile: Optional[Any] = None,
+        export_price: float = 0.0,
+        max_power: Optional[float] = None,
+    ) -> list[SimulationResult]:
+        """Replay recorded power data of an inverter against several configs.
+
+        Uses the days cached by the history backfill, or the intraday series
+        when nothing was backfilled. The replay runs in an executor. Raises
+        ValueError when there is no recorded data or the battery is unknown.
+        """
+        limits = self.battery_limits(serial, max_power)
+        soc = float(self.data.get(serial, {}).get(AlphaESSNames.BatterySOC) or 50)
+        rows = await self.history.async_power_rows(serial, days)
+        series = self.power_series.get(serial)
+
+        def replay() -> list[SimulationResult]:
+            if rows:
+                local_seconds, pv, load = samples_from_rows(
+                    rows,
+                    POWER_ROW_FIELDS.index("uploadTime"),
+                    POWER_ROW_FIELDS.index("ppv"),
+                    POWER_ROW_FIELDS.index("load"),
+                )
+            elif series is not None and len(series):
+                utc_offset = dt_util.now().utcoffset().total_seconds()
+                local_seconds = np.asarray(series.timestamps) + utc_offset
+                pv, load = series.columns["ppv"], series.columns["load"]
+            else:
+                raise ValueError(f"No recorded power data for {serial}")
+            return simulate(local_seconds, load, pv, configs, limits, soc, price_profile, export_price)
+
+        started = time.perf_counter()
+        results = await self.hass.async_add_executor_job(replay)
+        _LOGGER.debug(
+            f"Replayed {len(configs)} schedules for {serial} in {(time.perf_counter() - started) * 1000:.1f} ms"
+        )
+        return results
+
+    @callback
+    def async_queue_config(self, serial: str, section: str, changes: Dict[str, Any]) -> asyncio.Future:
+        """Queue a charge or discharge config change for one inverter.
+
+        The change is shown through the pending-write overlay right away.
+        Changes still waiting for the throttle window are merged, and the
+        full config is built from the overlay when the write is sent, so
+        nothing written in between is lost.
+        """
+        changes = {key: value for key, value in changes.items() if value is not None}
+
+        if not self.cloud_available:
+            # Keep the intent on disk and send it once the cloud is back
+            _LOGGER.info(f"Cloud unavailable, saving {section} change for {serial} until it returns")
+            self.offline_writes.record(serial, section, changes)
+            self.async_set_pending(serial, changes, OFFLINE_WRITE_TTL)
+            future = self.hass.loop.create_future()
+            future.set_result(None)
+            return future
+
+        self.async_set_pending(serial, changes)
+        future = self.commands.submit(serial, section, changes, merge=True)
+
+        @callback
+        def _discard_on_failure(done: asyncio.Future) -> None:
+            if not done.cancelled() and done.exception() is not None:
+                self.async_discard_pending(serial, list(changes))
+
+        future.add_done_callback(_discard_on_failure)
+        return future
+
+    @callback
+    def _replay_offline_writes(self) -> None:
+        """Send the latest config intended per serial and section during an outage."""
+        for serial, section, changes in self.offline_writes.pop_valid():
+            _LOGGER.info(f"Cloud available again, sending {section} change for {serial}: {changes}")
+            self.async_queue_config(serial, section, changes)
+
+    def _config_value(self, serial: str, key: str, default: Any) -> Any:
+        """Return a config value including pending writes, or a default if unset."""
+        value = self.get_value(serial, key)
+        return default if value is None or value == "" else value
+
+    async def _async_execute_command(self, serial: str, channel: str, payload: Any) -> Any:
+        """Send one queued command to the cloud."""
+        if channel in CONFIG_SECTIONS:
+            # The write may have waited for its window; keep it shown meanwhile
+            self.pending.set(serial, payload)
+            if channel == "ChargeConfig":
+                endpoint = "updateChargeConfigInfo"
+                settings = {
+                    "batHighCap": self._config_value(serial, AlphaESSNames.batHighCap, 90),
+                    "gridCharge": self._config_value(serial, "gridCharge", 1),
+                    "timeChae1": self._config_value(serial, "charge_timeChae1", "00:00"),
+                    "timeChae2": self._config_value(serial, "charge_timeChae2", "00:00"),
+                    "timeChaf1": self._config_value(serial, "charge_timeChaf1", "00:00"),
+                    "timeChaf2": self._config_value(serial, "charge_timeChaf2", "00:00"),
+                }
+            else:
+                endpoint = "updateDisChargeConfigInfo"
+                settings = {
+                    "batUseCap": self._config_value(serial, AlphaESSNames.batUseCap, 10),
+                    "ctrDis": self._config_value(serial, "ctrDis", 1),
+                    "timeDise1": self._config_value(serial, "discharge_timeDise1", "00:00"),
+                    "timeDise2": self._config_value(serial, "discharge_timeDise2", "00:00"),
+                    "timeDisf1": self._config_value(serial, "discharge_timeDisf1", "00:00"),
+                    "timeDisf2": self._config_value(serial, "discharge_timeDisf2", "00:00"),
+                }
+
+            result = await self._async_post(endpoint, {"sysSn": serial, **settings})
+            _LOGGER.info(f"Updated {channel} for {serial} with {payload}")
+            self.async_confirm_config(serial, channel, payload)
+            return result
+
+        if channel == "ev_current":
+            result = await self._async_post(
+                "setEvChargerCurrentsBySn", {"sysSn": serial, "currentsetting": payload}
+            )
+            _LOGGER.info("Set EV charger current for %s to %sA", serial, payload)
+            return result
+
+        if channel == "ev_control":
+            ev_serial, direction = payload
+            if not self.can_control_ev(serial, int(direction)):
+                _LOGGER.warning(
+                    "Skipping EV control command for %s (%s), direction=%s due to incompatible state=%s",
+                    serial,
+                    ev_serial,
+                    direction,
+                    self.get_ev_charger_status_raw(serial),
+                )
+                return None
+
+            result = await self._async_post(
+                "remoteControlEvCharger",
+                {"sysSn": serial, "evchargerSn": ev_serial, "controlMode": direction},
+            )
+            _LOGGER.info(
+                f"Control EV Charger: {ev_serial} for serial: {serial} Direction: {direction}"
+            )
+            return result
+
+        raise ValueError(f"Unknown command channel {channel}")
+
+    async def _async_post(self, endpoint: str, settings: Dict[str, Any]) -> Any:
+        """Send a write through the shared rate limiter, with a timeout.
+
+        The client's update methods log and swallow every error and return
+        None, which is also what a successful write returns. Posting through
+        api_post lets request errors raise, so the command queue retries
+        them and callers see the failure.
+        """
+        async with self.rate_limiter:
+            async with asyncio.timeout(API_CALL_TIMEOUT.total_seconds()):
+                return await self.api.api_post(f"{BASEURL}/{endpoint}", settings)
 
     async def _async_update_data(self) -> Optional[Dict[str, Dict[str, Any]]]:
-        """Update data via library."""
+        """Update data via library.
+
+        A refresh requested while another is still running joins it instead
+        of starting a second sweep of the same endpoints.
+        """
+        running = self._running_refresh
+        if running is not None and not running.done():
+            _LOGGER.debug("Refresh already in progress, waiting for it to finish")
+            return await asyncio.shield(running)
+
+        self._running_refresh = future = self.hass.loop.create_future()
+        try:
+            return await self._async_refresh_all()
+        finally:
+            if not future.done():
+                future.set_result(self.data)
+            self._running_refresh = None
+
+    async def _async_refresh_all(self) -> Dict[str, Dict[str, Any]]:
+        """Fetch and parse every inverter within the refresh deadline."""
         if self.data is None:
             self.data = {}
 
+        started = time.monotonic()
+        deadline = started + self._refresh_budget()
+
         try:
-            throttle_factor = self.throttle_multiplier * self.LOCAL_INVERTER_COUNT
-            jsondata = await self.api.getdata(True, True, throttle_factor)
+            units = await self._async_call(deadline, self.api.getESSList)
 
-            if jsondata is None:
-                return self.data
+            # getESSList swallows request errors and returns None
+            if units is None:
+                raise TypeError("no system list returned")
 
-            for invertor in jsondata:
-                serial = invertor.get("sysSn")
-                if not serial:
+            # Inverters left incomplete by the last deadline are fetched first
+            units = sorted(
+                (unit for unit in units if unit.get("sysSn")),
+                key=lambda unit: not self.stale_sections.get(unit["sysSn"]),
+            )
+            self.ess_list = units
+
+            for invertor in units:
+                serial = invertor["sysSn"]
+                # Systems without a subentry are left to discovery
+                if self._inverter_subentry_map and serial not in self._inverter_subentry_map:
                     continue
+                await self._async_fetch_sections(invertor, deadline)
 
                 # Parse all data sections
                 inverter_data = await self._parse_inverter_data(invertor)
                 self.data[serial] = inverter_data
+                self.data_sources[serial] = dict.fromkeys(inverter_data, SOURCE_CLOUD)
+                if "LastPower" not in self.stale_sections.get(serial, ()):
+                    self._record_power_sample(serial, inverter_data)
+                if self._daily_energy_fetched.get(serial, ("", 0.0))[1] >= started:
+                    self._reconcile_daily_energy(serial, inverter_data)
+
+            stale = {serial: sections for serial, sections in self.stale_sections.items() if sections}
+            if stale:
+                _LOGGER.warning(f"Some sections were not refreshed, keeping previous values for {stale}")
 
             # Fetch local IP data per-inverter for those with configured IPs
-            await self._fetch_per_inverter_local_data()
+            await self._fetch_per_inverter_local_data(deadline)
 
             self.cloud_available = True
+            if self.offline_writes:
+                self._replay_offline_writes()
+            self.update_interval = self._phase_locked_interval()
             return self.data
 
-        except (aiohttp.ClientConnectorError, aiohttp.ClientResponseError, TypeError) as error:
+        except (aiohttp.ClientConnectorError, aiohttp.ClientResponseError, TimeoutError, TypeError) as error:
             _LOGGER.warning(f"Cloud API error: {error}")
             self.cloud_available = False
             return await self._fallback_to_local_data()
@@ -541,126 +1573,327 @@ class AlphaESSDataUpdateCoordinator(DataUpdateCoordinator):
             self.cloud_available = False
             return await self._fallback_to_local_data()
 
-    async def _fetch_per_inverter_local_data(self) -> None:
+    def _record_power_sample(self, serial: str, inverter_data: Dict[str, Any]) -> None:
+        """Feed a freshly fetched power reading to the energy integrators."""
+        values = [
+            inverter_data.get(key) for key in (
+                AlphaESSNames.Generation, AlphaESSNames.Load,
+                AlphaESSNames.GridIOTotal, AlphaESSNames.BatteryIO,
+            )
+        ]
+        if None in values:
+            return
+        try:
+            pv, load, grid, battery = (float(value) for value in values)
+            ev = float(inverter_data.get(AlphaESSNames.pev) or 0)
+            # A SOC of 0 is what the API reports when it has none
+            soc = float(inverter_data.get(AlphaESSNames.BatterySOC) or 0) or None
+        except (TypeError, ValueError):
+            return
+        now = dt_util.now()
+        self.energy_stats.add(serial, now.timestamp(), pv, load, grid, battery)
+        self.battery_wear.add(serial, now.timestamp(), soc, battery)
+        strings = [inverter_data.get(getattr(AlphaESSNames, f"PPV{index}")) for index in range(1, 5)]
+        if sum(value is not None for value in strings) >= 2:
+            self.pv_strings.add(serial, now.hour, strings)
+        phases = [inverter_data.get(key) for key in (
+            AlphaESSNames.GridIOL1, AlphaESSNames.GridIOL2, AlphaESSNames.GridIOL3,
+        )]
+        if None not in phases:
+            phases = [float(value) for value in phases]
+            # Single-phase sites report L2 and L3 as 0, so a balance is only
+            # kept once either has carried power
+            balance = self.phase_balance.get(serial)
+            if balance is None and any(phases[1:]):
+                balance = self.phase_balance[serial] = PhaseBalance(
+                    PHASE_IMBALANCE_THRESHOLD, PHASE_IMBALANCE_MIN_POWER
+                )
+            if balance is not None:
+                balance.add(now.timestamp(), phases, self.energy_stats.max_gap)
+        self.daily_energy.setdefault(serial, DailyEnergyIntegrator()).add(
+            now, flows(pv, load, grid, battery, ev), self.energy_stats.max_gap
+        )
+
+    def _reconcile_daily_energy(self, serial: str, inverter_data: Dict[str, Any]) -> None:
+        """Move the integrated daily energy onto the freshly fetched cloud totals."""
+        integrator = self.daily_energy.get(serial)
+        day = dt_util.parse_date(str(inverter_data.get(AlphaESSNames.DailyEnergyDate) or ""))
+        if integrator is None or day is None:
+            return
+
+        cloud = []
+        for key in (
+            AlphaESSNames.DailyPvGeneration, None, AlphaESSNames.DailyGridConsumption,
+            AlphaESSNames.DailyFeedIn, AlphaESSNames.DailyBatteryCharge,
+            AlphaESSNames.DailyBatteryDischarge, AlphaESSNames.DailyEvChargingEnergy,
+        ):
+            # OneDateEnergy has no load total
+            value = inverter_data.get(key) if key else None
+            try:
+                cloud.append(float(value) if value is not None else None)
+            except (TypeError, ValueError):
+                cloud.append(None)
+        integrator.reconcile(day, cloud)
+        _LOGGER.debug(f"Reconciled integrated daily energy for {serial}, drift {integrator.drift}")
+
+    def _refresh_budget(self) -> float:
+        """Return the time budget in seconds for one refresh."""
+        return max(
+            API_CALL_TIMEOUT.total_seconds(),
+            min(REFRESH_DEADLINE.total_seconds(), self.scan_interval.total_seconds() * 0.8),
+        )
+
+    async def _async_call(
+        self, deadline: float, method: Callable[..., Awaitable[Any]], *args: Any
+    ) -> Any:
+        """Call a cloud API method, bounded by the per-call timeout and the deadline."""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError(f"refresh deadline passed before {method.__name__}")
+
+        async with asyncio.timeout(min(API_CALL_TIMEOUT.total_seconds(), remaining)):
+            return await method(*args)
+
+    async def _async_fetch_sections(self, invertor: Dict[str, Any], deadline: float) -> None:
+        """Fetch every data section of one inverter into its ESS list entry.
+
+        This mirrors the client's getdata sweep, but each call gets its own
+        timeout. Sections that time out, come back empty (the client returns
+        None on request errors) or miss the deadline are marked stale and filled with their last received
+        payload, so the refresh publishes partial results instead of failing
+        as a whole.
+        """
+        serial = invertor["sysSn"]
+        today = time.strftime("%Y-%m-%d")
+        delay = self.throttle_multiplier * self.LOCAL_INVERTER_COUNT
+        last_sections = self._last_sections.setdefault(serial, {})
+        stale: set[str] = set()
+
+        async def fetch(section: str, method: Callable[..., Awaitable[Any]], *args: Any) -> None:
+            try:
+                result = await self._async_call(deadline, method, *args)
+            except (TimeoutError, aiohttp.ClientError) as error:
+                _LOGGER.debug(f"Could not fetch {section} for {serial}: {error!r}")
+                result = None
+            else:
+                # The client swallows request errors and returns None
+                if result is None:
+                    _LOGGER.debug(f"No {section} returned for {serial}")
+
+            if result is None:
+                stale.add(section)
+                if section in last_sections:
+                    invertor[section] = last_sections[section]
+                return
+
+            invertor[section] = last_sections[section] = result
+            if delay and deadline - time.monotonic() > delay:
+                await asyncio.sleep(delay)
+
+        await fetch("SumData", self.api.getSumDataForCustomer, serial)
+        fetched_day, fetched_at = self._daily_energy_fetched.get(serial, ("", 0.0))
+        if (
+            fetched_day == today
+            and "OneDateEnergy" in last_sections
+            and time.monotonic() - fetched_at < DAILY_ENERGY_INTERVAL.total_seconds()
+        ):
+            invertor["OneDateEnergy"] = last_sections["OneDateEnergy"]
+        else:
+            await fetch("OneDateEnergy", self.api.getOneDateEnergyBySn, serial, today)
+            if "OneDateEnergy" not in stale:
+                self._daily_energy_fetched[serial] = (today, time.monotonic())
+        await fetch("LastPower", self.api.getLastPowerData, serial)
+        await fetch("ChargeConfig", self.api.getChargeConfigInfo, serial)
+        await fetch("DisChargeConfig", self.api.getDisChargeConfigInfo, serial)
+        await fetch("OneDayPower", self.api.getOneDayPowerBySn, serial, today)
+        await fetch("EVData", self.api.getEvChargerConfigList, serial)
+
+        ev_data = invertor.get("EVData")
+        ev_serial = ev_data[0].get("evchargerSn") if isinstance(ev_data, list) and ev_data else None
+        if ev_serial:
+            await fetch("EVStatus", self.api.getEvChargerStatusBySn, serial, ev_serial)
+            await fetch("EVCurrent", self.api.getEvChargerCurrentsBySn, serial)
+
+        self.stale_sections[serial] = stale
+
+    async def _fetch_per_inverter_local_data(self, deadline: float | None = None) -> None:
         """Fetch local IP data for each inverter that has a configured IP.
 
-        Temporarily sets the API client's ipaddress for each call,
-        then resets it to None.
+        Local-first inverters are read from the LAN on every refresh, and
+        their local values win over the cloud for the keys both provide.
+        Once the refresh deadline has passed, the remaining inverters keep
+        their previous local values.
         """
         for serial, ip in self.ip_address_map.items():
             if not ip or serial not in self.data:
                 continue
 
+            snapshot = self._local_snapshots.get(serial)
+
             # Skip if cloud API already provided LocalIPData for this inverter
-            if self.data[serial].get("Local IP"):
+            if serial not in self.local_first_serials and self.data[serial].get("Local IP"):
+                continue
+
+            if deadline is not None and time.monotonic() >= deadline:
+                if snapshot:
+                    self._merge_local_data(serial, snapshot)
                 continue
 
             try:
-                self.api.ipaddress = ip
-                local_ip_raw = await self.api.getIPData()
-                if local_ip_raw:
-                    local_ip_data = {"ip": ip, **local_ip_raw}
-                    parsed = await self.parser.parse_local_ip_data(local_ip_data)
-                    self.data[serial].update(parsed)
+                parsed = await self._async_fetch_local_ip(serial, ip)
+                if parsed:
+                    self._merge_local_data(serial, parsed)
                     _LOGGER.debug(f"Fetched local IP data for {serial} from {ip}")
             except Exception as error:
                 _LOGGER.debug(f"Could not fetch local IP data for {serial} from {ip}: {error}")
-            finally:
-                self.api.ipaddress = None
 
-    async def _fallback_to_local_data(self) -> Optional[Dict[str, Dict[str, Any]]]:
+    async def _fallback_to_local_data(self) -> Dict[str, Dict[str, Any]]:
         """Attempt to fetch local IP data when cloud API is unavailable.
 
         Uses per-inverter IP addresses from subentry configuration.
         Cloud sensor keys are removed so those entities become unavailable.
-        Local IP sensor keys are kept with fresh data.
+        Local IP sensor keys are kept with fresh data. Every inverter keeps
+        its model, so the snapshot stays a dict even when no local fetch
+        succeeds and writes can still be queued against it.
         """
-        has_any_local_ip = any(ip for ip in self.ip_address_map.values() if ip)
+        any_success = False
 
-        if not has_any_local_ip:
-            _LOGGER.debug("No local IP configured for any inverter")
-            return None
+        for serial in set(self.data) | set(self.ip_address_map):
+            ip = self.ip_address_map.get(serial)
 
-        any_success = False
+            # Clear cloud data but keep model
+            if serial in self.data or ip:
+                self.data[serial] = {"Model": self.data.get(serial, {}).get("Model")}
+                self.data_sources[serial] = {}
 
-        for serial, ip in self.ip_address_map.items():
             if not ip:
-                # No IP for this inverter - clear cloud data but keep model
-                if serial in self.data:
-                    model = self.data[serial].get("Model")
-                    self.data[serial] = {"Model": model}
                 continue
 
             try:
-                self.api.ipaddress = ip
-                local_ip_raw = await self.api.getIPData()
-                if local_ip_raw:
-                    local_ip_data = {"ip": ip, **local_ip_raw}
-                    parsed = await self.parser.parse_local_ip_data(local_ip_data)
-                    model = self.data.get(serial, {}).get("Model")
-                    self.data[serial] = {"Model": model, **parsed}
+                parsed = await self._async_fetch_local_ip(serial, ip)
+                if parsed:
+                    self._merge_local_data(serial, parsed)
                     any_success = True
                     _LOGGER.info(f"Cloud unavailable - using local data for {serial} from {ip}")
-                else:
-                    model = self.data.get(serial, {}).get("Model")
-                    self.data[serial] = {"Model": model}
             except Exception as error:
                 _LOGGER.warning(f"Local IP fetch failed for {serial} ({ip}): {error}")
-                model = self.data.get(serial, {}).get("Model")
-                self.data[serial] = {"Model": model}
-            finally:
-                self.api.ipaddress = None
 
-        if not any_success:
+        if not any(ip for ip in self.ip_address_map.values() if ip):
+            _LOGGER.debug("No local IP configured for any inverter")
+        elif not any_success:
             _LOGGER.warning("Cloud API unavailable and all local IP fetches failed")
-            return None
 
         return self.data
 
+    async def _parse_section(
+        self,
+        serial: Optional[str],
+        section: str,
+        raw: Any,
+        parse: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> Dict[str, Any]:
+        """Parse a payload section, reusing the previous result if it is unchanged.
+
+        Sections are fingerprinted by the hash of their repr, which is far
+        cheaper than re-running the parser. The returned dict is shared with
+        the cache and must not be mutated.
+        """
+        if serial is None:
+            return await parse()
+
+        fingerprint = hash(repr(raw))
+        serial_cache = self._section_cache.setdefault(serial, {})
+        cached = serial_cache.get(section)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
+        parsed = await parse()
+        serial_cache[section] = (fingerprint, parsed)
+        return parsed
+
     async def _parse_inverter_data(self, invertor: Dict) -> Dict[str, Any]:
         """Parse all data for a single inverter."""
+        serial = invertor.get("sysSn")
+
         # Start with basic info
         data = await self.parser.parse_basic_info(invertor)
 
         # Add LocalIPData if available
         local_ip_data = invertor.get("LocalIPData", {})
         if local_ip_data:
-            data.update(await self.parser.parse_local_ip_data(local_ip_data))
+            data.update(await self._parse_section(
+                serial, "LocalIPData", local_ip_data,
+                lambda: self.parser.parse_local_ip_data(local_ip_data),
+            ))
 
         # Add EV data if available
         ev_data = invertor.get("EVData", {})
         if ev_data:
-            data.update(await self.parser.parse_ev_data(ev_data, invertor))
+            ev_raw = (ev_data, invertor.get("EVStatus"), invertor.get("EVCurrent"))
+            data.update(await self._parse_section(
+                serial, "EVData", ev_raw,
+                lambda: self.parser.parse_ev_data(ev_data, invertor),
+            ))
 
         # Add summary data
         sum_data = invertor.get("SumData", {})
         if sum_data:
-            data.update(await self.parser.parse_summary_data(sum_data))
+            data.update(await self._parse_section(
+                serial, "SumData", sum_data,
+                lambda: self.parser.parse_summary_data(sum_data),
+            ))
 
         # Add energy data
         energy_data = invertor.get("OneDateEnergy", {})
         if energy_data:
-            data.update(await self.parser.parse_energy_data(energy_data))
+            data.update(await self._parse_section(
+                serial, "OneDateEnergy", energy_data,
+                lambda: self.parser.parse_energy_data(energy_data),
+            ))
 
-        # Add power data
+        # Add power data (the daily series only feeds the SOC fallback)
+        one_day_power = invertor.get("OneDayPower", {})
         power_data = invertor.get("LastPower", {})
         if power_data:
-            one_day_power = invertor.get("OneDayPower", {})
-            data.update(await self.parser.parse_power_data(power_data, one_day_power))
+            first_cbat = one_day_power[0].get("cbat") if one_day_power else None
+            data.update(await self._parse_section(
+                serial, "LastPower", (power_data, first_cbat),
+                lambda: self.parser.parse_power_data(power_data, one_day_power),
+            ))
+
+        # Keep the full intraday series; only new samples are parsed
+        if serial and one_day_power:
+            series = self.power_series.setdefault(serial, PowerSeries())
+            added = series.extend(one_day_power)
+            if added:
+                self._phase_trackers.setdefault(serial, UploadPhaseTracker()).observe(
+                    series.timestamps[-added:]
+                )
 
         # Add configuration data
         charge_config = invertor.get("ChargeConfig", {})
         if charge_config:
-            data.update(await self.parser.parse_charge_config(charge_config))
+            data.update(await self._parse_section(
+                serial, "ChargeConfig", charge_config,
+                lambda: self.parser.parse_charge_config(charge_config),
+            ))
 
         discharge_config = invertor.get("DisChargeConfig", {})
         if discharge_config:
-            data.update(await self.parser.parse_discharge_config(discharge_config))
+            data.update(await self._parse_section(
+                serial, "DisChargeConfig", discharge_config,
+                lambda: self.parser.parse_discharge_config(discharge_config),
+            ))
 
         # Add Charging Range (combining charge and discharge data)
         if charge_config or discharge_config:
-            bat_high_cap = charge_config.get("batHighCap", 90) if charge_config else 90
-            bat_use_cap = discharge_config.get("batUseCap", 10) if discharge_config else 10
-            data[AlphaESSNames.ChargeRange] = f"{bat_use_cap}% - {bat_high_cap}%"
+            data[AlphaESSNames.ChargeRange] = self._format_charge_range(charge_config, discharge_config)
 
-        return data
\ No newline at end of file
+        return data
+
+    @staticmethod
+    def _format_charge_range(charge_config: Optional[Dict], discharge_config: Optional[Dict]) -> str:
+        """Format the battery range from the charge and discharge configs."""
+        bat_high_cap = charge_config.get("batHighCap", 90) if charge_config else 90
+        bat_use_cap = discharge_config.get("batUseCap", 10) if discharge_config else 10
+        return f"{bat_use_cap}% - {bat_high_cap}%"
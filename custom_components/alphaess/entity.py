@@ -3,6 +3,7 @@ from __future__ import annotations
 
 from collections.abc import Callable
 from dataclasses import dataclass
+from typing import Any
 
 from homeassistant.components.button import ButtonEntityDescription
 from homeassistant.components.binary_sensor import BinarySensorEntityDescription
@@ -21,6 +22,35 @@ class AlphaESSSensorDescription(SensorEntityDescription):
                   ] | None = lambda val: val
 
 
+@dataclass(frozen=True)
+class AlphaESSRollingSensorDescription(SensorEntityDescription):
+    """Class to describe an AlphaESS rolling energy sensor."""
+
+    metric: str = ""
+    window: str = ""
+
+
+@dataclass(frozen=True)
+class AlphaESSIntegratedSensorDescription(SensorEntityDescription):
+    """Class to describe an AlphaESS integrated daily energy sensor."""
+
+    channel: str = ""
+
+
+@dataclass(frozen=True)
+class AlphaESSWearSensorDescription(SensorEntityDescription):
+    """Class to describe an AlphaESS battery wear sensor."""
+
+    value: Callable[[Any], float | None] = lambda wear: None
+
+
+@dataclass(frozen=True)
+class AlphaESSPhaseSensorDescription(SensorEntityDescription):
+    """Class to describe an AlphaESS phase imbalance sensor."""
+
+    value: Callable[[Any, float], Any] = lambda balance, now: None
+
+
 @dataclass(frozen=True)
 class AlphaESSButtonDescription(ButtonEntityDescription):
     """Class to describe an AlphaESS Button."""
@@ -0,0 +1,123 @@
+"""Per-subentry entity management for AlphaESS platforms."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import logging
+
+from homeassistant.config_entries import ConfigEntry, ConfigSubentry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import (
+    CONF_PARENT_INVERTER,
+    CONF_SERIAL_NUMBER,
+    SIGNAL_NEW_DATA_KEYS,
+    SIGNAL_SUBENTRY_UPDATED,
+)
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+
+class SubentryEntityManager:
+    """Track the entities a platform created for each subentry.
+
+    Platforms describe their entities through a build callback that takes a
+    subentry and returns the entities it should have. The manager adds them
+    and rebuilds only the affected subentries when they are added or their
+    configuration changes, so neither requires a full config entry reload.
+    When the coordinator reports new data keys for an inverter, only the
+    entities that did not exist yet are added.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: ConfigEntry,
+        async_add_entities: AddEntitiesCallback,
+        build_entities: Callable[[ConfigSubentry], list[Entity]],
+    ) -> None:
+        self.hass = hass
+        self.entry = entry
+        self._async_add_entities = async_add_entities
+        self._build_entities = build_entities
+        self._entities: dict[str, list[Entity]] = {}
+
+    @callback
+    def async_setup(self) -> None:
+        """Add entities for all current subentries and listen for changes."""
+        for subentry in self.entry.subentries.values():
+            self._async_add_subentry(subentry)
+
+        self.entry.async_on_unload(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_SUBENTRY_UPDATED.format(self.entry.entry_id),
+                self._async_rebuild_subentries,
+            )
+        )
+        self.entry.async_on_unload(
+            async_dispatcher_connect(
+                self.hass,
+                SIGNAL_NEW_DATA_KEYS.format(self.entry.entry_id),
+                self._async_add_missing_entities,
+            )
+        )
+
+    @callback
+    def _async_add_subentry(self, subentry: ConfigSubentry) -> None:
+        """Build and register the entities for a single subentry."""
+        self._async_register(subentry, self._build_entities(subentry))
+
+    @callback
+    def _async_register(self, subentry: ConfigSubentry, entities: list[Entity]) -> None:
+        """Register entities for a subentry with the platform."""
+        if not entities:
+            return
+
+        self._entities.setdefault(subentry.subentry_id, []).extend(entities)
+        self._async_add_entities(entities, config_subentry_id=subentry.subentry_id)
+
+    async def _async_rebuild_subentries(self, subentry_ids: list[str]) -> None:
+        """Remove and recreate the entities belonging to the given subentries.
+
+        All removals finish before any entity is added again, so entities can
+        move between subentries (e.g. an EV charger that gains its own
+        subentry) without unique ID collisions.
+        """
+        for subentry_id in subentry_ids:
+            for entity in self._entities.pop(subentry_id, []):
+                await entity.async_remove()
+
+        for subentry_id in subentry_ids:
+            subentry = self.entry.subentries.get(subentry_id)
+            if subentry is None:
+                continue
+
+            _LOGGER.debug("Rebuilding entities for subentry %s", subentry_id)
+            self._async_add_subentry(subentry)
+
+    @callback
+    def _async_add_missing_entities(self, serials: list[str]) -> None:
+        """Add entities that new data keys made possible for the given inverters."""
+        for subentry in self.entry.subentries.values():
+            if (
+                subentry.data.get(CONF_SERIAL_NUMBER) not in serials
+                and subentry.data.get(CONF_PARENT_INVERTER) not in serials
+            ):
+                continue
+
+            existing = {
+                entity.unique_id for entity in self._entities.get(subentry.subentry_id, [])
+            }
+            missing = [
+                entity for entity in self._build_entities(subentry)
+                if entity.unique_id not in existing
+            ]
+            if missing:
+                _LOGGER.debug(
+                    "Adding %s new entities for subentry %s",
+                    len(missing), subentry.subentry_id,
+                )
+            self._async_register(subentry, missing)
@@ -83,6 +83,11 @@ class AlphaESSNames(str, Enum):
     canstopcharging = "Can Stop Charging"
     GridChargeEnabled = "Grid Charge Enabled"
     DischargeTimeControlEnabled = "Discharge Time Control Enabled"
+    SolarSurplusCharging = "Solar Surplus Charging"
+    PeakShaving = "Peak Shaving"
+    PeakShavingLimit = "Peak Shaving Import Limit"
+    PeakShavingPhaseLimit = "Peak Shaving Phase Limit"
+    pvStringMismatch = "PV String Mismatch"
     TodayGeneration = "Today's Generation"
     TodayIncome = "Today's Income"
     DailyPvGeneration = "Daily PV Generation"
@@ -116,3 +121,4 @@ class AlphaESSNames(str, Enum):
     password = "Password"
     ethernetModule = "Ethernet Module"
     fourGModule = "4G Module"
+    localApiReachable = "Local API Reachable"
@@ -0,0 +1,105 @@
+"""Closed-loop EV charging from solar surplus."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+import math
+from typing import Optional
+
+# EV charger states (EV_CHARGER_STATE_KEYS) the controller acts on
+EV_STATUS_PREPARING = 2
+EV_STATUS_CHARGING = 3
+EV_STATUS_SUSPENDED_EVSE = 4
+
+# A car that paused itself (suspended_ev) or is finishing is left alone
+STARTABLE_STATUSES = (EV_STATUS_PREPARING, EV_STATUS_SUSPENDED_EVSE)
+
+
+@dataclass
+class EvCommand:
+    """A change the controller wants: a current setpoint, then optionally start or stop."""
+
+    current: Optional[int] = None
+    direction: Optional[int] = None  # 1 = start, 0 = stop, as for control_ev
+
+
+class SolarSurplusController:
+    """Track solar surplus with the EV charger current.
+
+    The power available to the car is what it draws now plus what is
+    exported, minus any battery discharge, so the battery never feeds the
+    car. Battery charging is left to the battery. Charging starts once the
+    surplus covers the minimum current and only stops when it drops
+    ``stop_hysteresis`` amps below it, and not before ``min_on_time`` has
+    passed, during which the minimum current is held. Decisions are made
+    at most every ``adjust_interval`` seconds and only produce a command
+    when the setpoint or the charging state actually changes.
+    """
+
+    def __init__(
+        self,
+        phases: int,
+        max_current: int,
+        min_current: int,
+        voltage: float,
+        stop_hysteresis: int,
+        min_on_time: float,
+        adjust_interval: float,
+    ) -> None:
+        self.phases = phases
+        self.max_current = max_current
+        self.min_current = min_current
+        self.voltage = voltage
+        self.stop_hysteresis = stop_hysteresis
+        self.min_on_time = min_on_time
+        self.adjust_interval = adjust_interval
+        self.target: Optional[int] = None
+        self._started_at: Optional[float] = None
+        self._last_command: Optional[float] = None
+
+    def surplus_current(self, grid: float, battery: float, ev: float) -> int:
+        """Return the whole amps the surplus supports (W inputs, grid import and battery discharge positive)."""
+        available = ev - grid - max(battery, 0.0)
+        return math.floor(available / (self.voltage * self.phases))
+
+    def update(
+        self,
+        now: float,
+        grid: float,
+        battery: float,
+        ev: float,
+        status: Optional[int],
+        setpoint: Optional[int],
+    ) -> Optional[EvCommand]:
+        """Return the command to send for the latest power values, if any."""
+        if self._last_command is not None and now - self._last_command < self.adjust_interval:
+            return None
+
+        target = self.surplus_current(grid, battery, ev)
+        self.target = target
+        current = min(max(target, self.min_current), self.max_current)
+        command: Optional[EvCommand] = None
+
+        if status == EV_STATUS_CHARGING:
+            if self._started_at is None:
+                # Charging we did not start still gets the minimum on-time
+                self._started_at = now
+            if target < self.min_current - self.stop_hysteresis:
+                if now - self._started_at >= self.min_on_time:
+                    command = EvCommand(direction=0)
+                    self._started_at = None
+                elif setpoint != self.min_current:
+                    command = EvCommand(current=self.min_current)
+            elif setpoint != current:
+                command = EvCommand(current=current)
+        elif self._started_at is not None and now - self._started_at < self.min_on_time:
+            # A start was sent; give the charger time to report it before resending
+            pass
+        else:
+            self._started_at = None
+            if status in STARTABLE_STATUSES and target >= self.min_current:
+                command = EvCommand(current=current if setpoint != current else None, direction=1)
+                self._started_at = now
+
+        if command is not None:
+            self._last_command = now
+        return command
@@ -0,0 +1,45 @@
+"""Split a site-level charge or discharge target across inverters."""
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+
+def split_target(target: float, headroom: Sequence[float], capability: Sequence[float]) -> np.ndarray:
+    """Return each inverter's share of ``target`` (kWh).
+
+    Shares are proportional to headroom, the energy a battery can still
+    take or give before its SOC limit, and capped at capability, what the
+    inverter can move within the window. Whatever a capped inverter cannot
+    take is spread over the others the same way, so the site target is met
+    whenever the fleet as a whole can meet it.
+    """
+    headroom = np.clip(np.asarray(headroom, dtype=float), 0, None)
+    cap = np.minimum(headroom, np.clip(np.asarray(capability, dtype=float), 0, None))
+    shares = np.zeros(len(cap))
+    remaining = min(max(float(target), 0.0), float(cap.sum()))
+
+    # Each pass caps at least one inverter, so this ends within len(cap) passes
+    while remaining > 1e-9:
+        open_ = shares < cap - 1e-9
+        weights = np.where(open_, headroom, 0.0)
+        shares += np.minimum(remaining * weights / weights.sum(), cap - shares)
+        remaining = min(max(float(target), 0.0), float(cap.sum())) - float(shares.sum())
+    return shares
+
+
+def soc_target(stored: float, capacity: float, share: float, charge: bool) -> int:
+    """Return the SOC limit (%) that stops a battery after moving ``share`` kWh.
+
+    Rounded away from the current SOC so a share is never cut short.
+    """
+    energy = stored + share if charge else stored - share
+    percent = energy / capacity * 100
+    return int(min(max(np.ceil(percent) if charge else np.floor(percent), 0), 100))
+
+
+def window_hours(start: str, end: str) -> float:
+    """Return the length of an "HH:MM" window; an end before the start runs over midnight."""
+    minutes = [int(text.split(":")[0]) * 60 + int(text.split(":")[1]) for text in (start, end)]
+    return ((minutes[1] - minutes[0]) % 1440) / 60
@@ -0,0 +1,259 @@
+"""Historical backfill of AlphaESS data into Home Assistant statistics."""
+from __future__ import annotations
+
+import asyncio
+from datetime import date, datetime, timedelta
+import logging
+from typing import Any
+
+from alphaess import alphaess
+
+from homeassistant.components.recorder.models import (
+    StatisticData,
+    StatisticMeanType,
+    StatisticMetaData,
+)
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.const import PERCENTAGE, UnitOfEnergy, UnitOfPower
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import API_CALL_TIMEOUT, DOMAIN
+from .rate_limiter import ApiRateLimiter
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+HISTORY_STORAGE_VERSION = 1
+
+# Number of days fetched and imported per recorder batch
+STATISTICS_CHUNK_DAYS = 7
+
+# Statistic suffix -> (OneDateEnergy field, statistic name)
+ENERGY_STATISTICS = {
+    "pv_generation": ("epv", "PV Generation"),
+    "grid_consumption": ("eInput", "Grid Consumption"),
+    "feed_in": ("eOutput", "Feed-in"),
+    "grid_charge": ("eGridCharge", "Grid Charge"),
+    "battery_charge": ("eCharge", "Battery Charge"),
+    "battery_discharge": ("eDischarge", "Battery Discharge"),
+    "ev_charging": ("eChargingPile", "EV Charging Energy"),
+}
+
+# Statistic suffix -> (OneDayPower field, statistic name, unit, unit class)
+POWER_STATISTICS = {
+    "pv_power": ("ppv", "PV Power", UnitOfPower.WATT, "power"),
+    "load_power": ("load", "Load Power", UnitOfPower.WATT, "power"),
+    "feed_in_power": ("feedIn", "Feed-in Power", UnitOfPower.WATT, "power"),
+    "grid_import_power": ("gridCharge", "Grid Import Power", UnitOfPower.WATT, "power"),
+    "battery_soc": ("cbat", "Battery SOC", PERCENTAGE, None),
+}
+
+
+# Fields of each cached OneDayPower row, in order
+POWER_ROW_FIELDS = ["uploadTime"] + [field for field, *_ in POWER_STATISTICS.values()]
+
+
+def _statistic_id(serial: str, suffix: str) -> str:
+    """Return the external statistic ID for a serial and metric."""
+    return f"{DOMAIN}:{serial.lower()}_{suffix}"
+
+
+def _to_float(value: Any) -> float | None:
+    """Convert an API value to float, ignoring blanks."""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class HistoryBackfill:
+    """Fetch past days from the cloud and import them as external statistics.
+
+    Days before today never change, so their API responses are cached on
+    disk per serial; running the backfill again only calls the API for days
+    that were never fetched.
+    """
+
+    def __init__(self, hass: HomeAssistant, api: alphaess.alphaess, rate_limiter: ApiRateLimiter) -> None:
+        self.hass = hass
+        self.api = api
+        self.rate_limiter = rate_limiter
+        self._stores: dict[str, Store] = {}
+        self._cache: dict[str, dict[str, dict]] = {}
+
+    async def _async_get_cache(self, serial: str) -> dict[str, dict]:
+        """Load the on-disk day cache for a serial."""
+        if serial not in self._cache:
+            store = Store(self.hass, HISTORY_STORAGE_VERSION, f"{DOMAIN}.history_{serial.lower()}")
+            self._stores[serial] = store
+            stored = await store.async_load() or {}
+            self._cache[serial] = stored.get("days", {})
+        return self._cache[serial]
+
+    async def _async_fetch_day(self, serial: str, day: date) -> dict | None:
+        """Fetch one day of energy and power data from the cloud.
+
+        Returns None unless both calls returned data, so a day that failed
+        halfway is not cached and is fetched again by the next backfill.
+        """
+        query_date = day.isoformat()
+
+        try:
+            async with self.rate_limiter:
+                async with asyncio.timeout(API_CALL_TIMEOUT.total_seconds()):
+                    energy = await self.api.getOneDateEnergyBySn(serial, query_date)
+            async with self.rate_limiter:
+                async with asyncio.timeout(API_CALL_TIMEOUT.total_seconds()):
+                    power = await self.api.getOneDayPowerBySn(serial, query_date)
+        except TimeoutError:
+            _LOGGER.debug("Timed out fetching history for %s on %s", serial, query_date)
+            return None
+
+        # The client returns None on request errors
+        if not energy or not power:
+            _LOGGER.debug("Incomplete history for %s on %s, not caching it", serial, query_date)
+            return None
+
+        return {
+            "energy": {
+                field: energy.get(field) for field, _ in ENERGY_STATISTICS.values()
+            },
+            "power": [
+                [sample.get(field) for field in POWER_ROW_FIELDS]
+                for sample in power
+                if sample.get("uploadTime")
+            ],
+        }
+
+    async def async_backfill(self, serial: str, days: int) -> int:
+        """Import the last ``days`` full days for a serial.
+
+        Returns the number of days that had to be fetched from the API.
+        """
+        cache = await self._async_get_cache(serial)
+        today = dt_util.now().date()
+        start = today - timedelta(days=days)
+
+        # Sums are cumulative, so always rebuild from the oldest cached day
+        # to keep previously imported rows consistent.
+        if cache:
+            start = min(start, date.fromisoformat(min(cache)))
+
+        fetched = 0
+        running_sums = dict.fromkeys(ENERGY_STATISTICS, 0.0)
+        day = start
+        while day < today:
+            chunk_end = min(day + timedelta(days=STATISTICS_CHUNK_DAYS), today)
+            chunk: list[tuple[date, dict]] = []
+
+            while day < chunk_end:
+                key = day.isoformat()
+                if key not in cache:
+                    result = await self._async_fetch_day(serial, day)
+                    if result is not None:
+                        cache[key] = result
+                        fetched += 1
+                if key in cache:
+                    chunk.append((day, cache[key]))
+                day += timedelta(days=1)
+
+            self._async_import_chunk(serial, chunk, running_sums)
+
+        if fetched:
+            await self._stores[serial].async_save({"days": cache})
+
+        _LOGGER.info(
+            "Backfilled %s days of history for %s (%s fetched from the API)",
+            (today - start).days, serial, fetched,
+        )
+        return fetched
+
+    async def async_power_rows(self, serial: str, days: int) -> list[list[Any]]:
+        """Return cached OneDayPower rows of the last ``days`` full days, oldest first.
+
+        Only days fetched by an earlier backfill are included; this makes no
+        API calls. Row fields are listed in POWER_ROW_FIELDS.
+        """
+        cache = await self._async_get_cache(serial)
+        first = (dt_util.now().date() - timedelta(days=days)).isoformat()
+        return [row for key in sorted(cache) if key >= first for row in cache[key]["power"]]
+
+    def _async_import_chunk(
+        self,
+        serial: str,
+        chunk: list[tuple[date, dict]],
+        running_sums: dict[str, float],
+    ) -> None:
+        """Queue one chunk of days for import into the recorder."""
+        if not chunk:
+            return
+
+        for suffix, (field, name) in ENERGY_STATISTICS.items():
+            rows: list[StatisticData] = []
+            for day, day_data in chunk:
+                value = _to_float(day_data["energy"].get(field))
+                if value is None:
+                    continue
+                running_sums[suffix] += value
+                rows.append(
+                    StatisticData(
+                        start=dt_util.start_of_local_day(day),
+                        state=value,
+                        sum=running_sums[suffix],
+                    )
+                )
+
+            if rows:
+                async_add_external_statistics(
+                    self.hass,
+                    StatisticMetaData(
+                        mean_type=StatisticMeanType.NONE,
+                        has_sum=True,
+                        name=f"{serial} {name}",
+                        source=DOMAIN,
+                        statistic_id=_statistic_id(serial, suffix),
+                        unit_class="energy",
+                        unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+                    ),
+                    rows,
+                )
+
+        for index, (suffix, (_, name, unit, unit_class)) in enumerate(POWER_STATISTICS.items(), start=1):
+            hours: dict[datetime, list[float]] = {}
+            for _, day_data in chunk:
+                for sample in day_data["power"]:
+                    value = _to_float(sample[index])
+                    parsed = dt_util.parse_datetime(sample[0])
+                    if value is None or parsed is None:
+                        continue
+                    hour = parsed.replace(
+                        minute=0, second=0, microsecond=0, tzinfo=dt_util.get_default_time_zone()
+                    )
+                    hours.setdefault(hour, []).append(value)
+
+            rows = [
+                StatisticData(
+                    start=hour,
+                    mean=sum(values) / len(values),
+                    min=min(values),
+                    max=max(values),
+                )
+                for hour, values in sorted(hours.items())
+            ]
+            if rows:
+                async_add_external_statistics(
+                    self.hass,
+                    StatisticMetaData(
+                        mean_type=StatisticMeanType.ARITHMETIC,
+                        has_sum=False,
+                        name=f"{serial} {name}",
+                        source=DOMAIN,
+                        statistic_id=_statistic_id(serial, suffix),
+                        unit_class=unit_class,
+                        unit_of_measurement=unit,
+                    ),
+                    rows,
+                )
@@ -0,0 +1,84 @@
+"""Daily energy integrated from live power samples."""
+from __future__ import annotations
+
+from datetime import date, datetime, time
+from typing import Optional, Sequence
+
+import numpy as np
+
+# Energy channels, in the order flows() returns them
+CHANNELS = ("pv", "load", "import", "export", "charge", "discharge", "ev")
+
+
+def flows(pv: float, load: float, grid: float, battery: float, ev: float) -> np.ndarray:
+    """Return the channel powers (W) of a sample; grid import and battery discharge are positive."""
+    return np.array([
+        pv, load, max(grid, 0.0), max(-grid, 0.0), max(-battery, 0.0), max(battery, 0.0), ev,
+    ])
+
+
+class DailyEnergyIntegrator:
+    """Today's energy per channel (kWh), integrated sample by sample.
+
+    Intervals are integrated with the trapezoid rule; one that spans local
+    midnight is split there, with the power at midnight interpolated, so
+    each day gets its own share. Intervals longer than ``max_gap`` seconds
+    are not counted. ``reconcile`` moves the totals onto the cloud's daily
+    figures whenever those arrive, so integration error never builds up
+    over more than one reconcile interval.
+    """
+
+    def __init__(self) -> None:
+        self.day: Optional[date] = None
+        self.totals = np.zeros(len(CHANNELS))
+        # Integrated minus cloud (kWh) at the last reconcile, per channel
+        self.drift: dict[str, float] = {}
+        self._last: Optional[tuple[datetime, np.ndarray]] = None
+
+    def add(self, moment: datetime, power: np.ndarray, max_gap: float) -> None:
+        """Add a sample taken at ``moment`` (timezone-aware, local)."""
+        if self._last is not None:
+            previous, previous_power = self._last
+            elapsed = (moment - previous).total_seconds()
+            if elapsed <= 0:
+                return
+            if elapsed <= max_gap and previous.date() != moment.date():
+                midnight = datetime.combine(moment.date(), time(), tzinfo=moment.tzinfo)
+                split = (midnight - previous).total_seconds()
+                at_midnight = previous_power + (power - previous_power) * split / elapsed
+                self.totals += _trapezoid(previous_power, at_midnight, split)
+                self._roll(moment.date())
+                self.totals += _trapezoid(at_midnight, power, elapsed - split)
+            elif elapsed <= max_gap:
+                self.totals += _trapezoid(previous_power, power, elapsed)
+
+        if self.day != moment.date():
+            self._roll(moment.date())
+        self._last = (moment, power)
+
+    def reconcile(self, day: date, cloud: Sequence[Optional[float]]) -> None:
+        """Replace today's totals with the cloud's, where it reports a channel."""
+        if day != self.day:
+            return
+        for index, value in enumerate(cloud):
+            if value is None:
+                continue
+            self.drift[CHANNELS[index]] = round(float(self.totals[index]) - float(value), 3)
+            self.totals[index] = float(value)
+
+    def value(self, channel: str) -> Optional[float]:
+        """Return today's energy of a channel, or None before the first sample."""
+        if self.day is None:
+            return None
+        return float(self.totals[CHANNELS.index(channel)])
+
+    def _roll(self, day: date) -> None:
+        """Start a new day from zero."""
+        self.day = day
+        self.totals = np.zeros(len(CHANNELS))
+        self.drift = {}
+
+
+def _trapezoid(start: np.ndarray, end: np.ndarray, seconds: float) -> np.ndarray:
+    """Return the energy (kWh) of a linear power ramp over ``seconds``."""
+    return (start + end) / 2 * seconds / 3_600_000
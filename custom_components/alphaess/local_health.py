@@ -0,0 +1,57 @@
+"""Reachability tracking for inverter local APIs."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+import time
+from typing import Optional
+
+from homeassistant.util import dt as dt_util
+
+
+class LocalIpHealth:
+    """Track consecutive failures of one local IP and back off while it is down.
+
+    Each failure doubles the time before the IP is tried again, from
+    ``base_backoff`` up to ``max_backoff``, so a dead or mistyped address
+    costs one timeout per backoff window instead of one per refresh. A
+    single success resets the state.
+    """
+
+    def __init__(self, base_backoff: timedelta, max_backoff: timedelta) -> None:
+        self.base_backoff = base_backoff.total_seconds()
+        self.max_backoff = max_backoff.total_seconds()
+        self.consecutive_failures = 0
+        self.last_success: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self._retry_at = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        """Return True if the last attempt succeeded."""
+        return self.consecutive_failures == 0 and self.last_success is not None
+
+    @property
+    def retry_at(self) -> Optional[datetime]:
+        """Return when a backed-off IP will next be tried."""
+        remaining = self._retry_at - time.monotonic()
+        if remaining <= 0:
+            return None
+        return dt_util.utcnow() + timedelta(seconds=remaining)
+
+    def should_try(self) -> bool:
+        """Return True if the IP is not inside a backoff window."""
+        return time.monotonic() >= self._retry_at
+
+    def record_success(self) -> None:
+        """Reset the failure state after a successful call."""
+        self.consecutive_failures = 0
+        self.last_success = dt_util.utcnow()
+        self.last_error = None
+        self._retry_at = 0.0
+
+    def record_failure(self, error: str) -> None:
+        """Count a failed call and schedule the next attempt."""
+        self.consecutive_failures += 1
+        self.last_error = error
+        backoff = min(self.base_backoff * 2 ** (self.consecutive_failures - 1), self.max_backoff)
+        self._retry_at = time.monotonic() + backoff
@@ -10,8 +10,9 @@ from .const import (
 )
 from .coordinator import AlphaESSDataUpdateCoordinator
 from .enums import AlphaESSNames
-from .sensorlist import DISCHARGE_AND_CHARGE_NUMBERS, EV_CHARGER_NUMBERS
+from .sensorlist import DISCHARGE_AND_CHARGE_NUMBERS, EV_CHARGER_NUMBERS, PEAK_SHAVING_NUMBERS
 from .device import build_inverter_device_info, build_ev_charger_device_info
+from .entity_manager import SubentryEntityManager
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
@@ -27,11 +28,11 @@ async def async_setup_entry(hass, entry, async_add_entities) -> None:
         description.key: description for description in EV_CHARGER_NUMBERS
     }
 
-    for subentry in entry.subentries.values():
+    def _build_subentry_entities(subentry) -> List[NumberEntity]:
         if subentry.subentry_type == SUBENTRY_TYPE_INVERTER:
             serial = subentry.data.get(CONF_SERIAL_NUMBER)
             if not serial or serial not in coordinator.data:
-                continue
+                return []
 
             data = coordinator.data[serial]
             model = data.get("Model")
@@ -48,6 +49,13 @@ async def async_setup_entry(hass, entry, async_add_entities) -> None:
                             device_info=inverter_device_info,
                         )
                     )
+                for description in PEAK_SHAVING_NUMBERS:
+                    number_entities.append(
+                        AlphaPeakShavingNumber(
+                            coordinator, serial, entry, description,
+                            device_info=inverter_device_info,
+                        )
+                    )
 
             # Auto-discovered EV charger numbers (no dedicated EV subentry)
             ev_charger = data.get("EV Charger S/N")
@@ -68,21 +76,17 @@ async def async_setup_entry(hass, entry, async_add_entities) -> None:
                         )
                     )
 
-            if number_entities:
-                async_add_entities(
-                    number_entities,
-                    config_subentry_id=subentry.subentry_id,
-                )
+            return number_entities
 
-        elif subentry.subentry_type == SUBENTRY_TYPE_EV_CHARGER:
+        if subentry.subentry_type == SUBENTRY_TYPE_EV_CHARGER:
             parent_serial = subentry.data.get(CONF_PARENT_INVERTER)
             if not parent_serial or parent_serial not in coordinator.data:
-                continue
+                return []
 
             data = coordinator.data[parent_serial]
             ev_charger = data.get("EV Charger S/N")
             if not ev_charger:
-                continue
+                return []
 
             ev_device_info = build_ev_charger_device_info(data)
             ev_entities: List[NumberEntity] = []
@@ -96,11 +100,11 @@ async def async_setup_entry(hass, entry, async_add_entities) -> None:
                     )
                 )
 
-            if ev_entities:
-                async_add_entities(
-                    ev_entities,
-                    config_subentry_id=subentry.subentry_id,
-                )
+            return ev_entities
+
+        return []
+
+    SubentryEntityManager(hass, entry, async_add_entities, _build_subentry_entities).async_setup()
 
 
 class AlphaNumber(CoordinatorEntity, RestoreNumber):
@@ -155,42 +159,20 @@ class AlphaNumber(CoordinatorEntity, RestoreNumber):
         await self.save_value(value)
         self.async_write_ha_state()
 
-        # Push to API
-        data = self._coordinator.data.get(self._serial, {})
-
+        # Queue for the API; writes within the throttle window are merged
         if self.key is AlphaESSNames.batHighCap:
-            grid_charge = data.get("gridCharge", 1)
-            result = await self._coordinator.api.updateChargeConfigInfo(
-                self._serial,
-                value,
-                grid_charge,
-                data.get("charge_timeChae1") or "00:00",
-                data.get("charge_timeChae2") or "00:00",
-                data.get("charge_timeChaf1") or "00:00",
-                data.get("charge_timeChaf2") or "00:00",
+            self._coordinator.async_queue_config(
+                self._serial, "ChargeConfig", {AlphaESSNames.batHighCap: value}
             )
-            _LOGGER.info("Updated batHighCap for %s to %s - Result: %s", self._serial, value, result)
         elif self.key is AlphaESSNames.batUseCap:
-            ctr_dis = data.get("ctrDis", 1)
-            result = await self._coordinator.api.updateDisChargeConfigInfo(
-                self._serial,
-                value,
-                ctr_dis,
-                data.get("discharge_timeDise1") or "00:00",
-                data.get("discharge_timeDise2") or "00:00",
-                data.get("discharge_timeDisf1") or "00:00",
-                data.get("discharge_timeDisf2") or "00:00",
+            self._coordinator.async_queue_config(
+                self._serial, "DisChargeConfig", {AlphaESSNames.batUseCap: value}
             )
-            _LOGGER.info("Updated batUseCap for %s to %s - Result: %s", self._serial, value, result)
-
-        await self._coordinator.async_request_refresh()
 
     @property
     def available(self) -> bool:
-        """Number controls require cloud API to function."""
-        if not self.coordinator.last_update_success:
-            return False
-        return self._coordinator.cloud_available
+        """Changes made while the cloud is down are queued until it returns."""
+        return self.coordinator.last_update_success
 
     @property
     def native_value(self):
@@ -291,3 +273,74 @@ class AlphaEVNumber(CoordinatorEntity, NumberEntity):
     @property
     def icon(self):
         return self._icon
+
+
+class AlphaPeakShavingNumber(CoordinatorEntity, RestoreNumber):
+    """Peak shaving import limit number entity."""
+
+    def __init__(self, coordinator, serial, config, description, device_info=None):
+        super().__init__(coordinator)
+        self._coordinator = coordinator
+        self._serial = serial
+        self._config = config
+        self.key = description.key
+        self._name = description.name
+        self._icon = description.icon
+        self._entity_category = description.entity_category
+        self._native_unit_of_measurement = description.native_unit_of_measurement
+        self._attr_native_min_value = description.native_min_value
+        self._attr_native_max_value = description.native_max_value
+        self._attr_native_step = description.native_step
+        self._attr_mode = description.mode
+
+        if device_info:
+            self._attr_device_info = device_info
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        last_state = await self.async_get_last_number_data()
+        if last_state is not None and last_state.native_value is not None:
+            self._apply(last_state.native_value)
+
+    def _apply(self, value: float) -> None:
+        shaver = self._coordinator.peak_shaver(self._serial)
+        if self.key is AlphaESSNames.PeakShavingLimit:
+            shaver.limit = float(value)
+        else:
+            shaver.phase_limit = float(value)
+
+    async def async_set_native_value(self, value: float) -> None:
+        self._apply(value)
+        self.async_write_ha_state()
+
+    @property
+    def native_value(self) -> float:
+        shaver = self._coordinator.peak_shaver(self._serial)
+        if self.key is AlphaESSNames.PeakShavingLimit:
+            return shaver.limit
+        return shaver.phase_limit
+
+    @property
+    def name(self):
+        return f"{self._name}"
+
+    @property
+    def suggested_object_id(self):
+        """Return suggested object id."""
+        return f"{self._serial} {self._name}"
+
+    @property
+    def native_unit_of_measurement(self):
+        return self._native_unit_of_measurement
+
+    @property
+    def unique_id(self):
+        return f"{self._config.entry_id}_{self._serial} - {self._name}"
+
+    @property
+    def entity_category(self):
+        return self._entity_category
+
+    @property
+    def icon(self):
+        return self._icon
@@ -0,0 +1,71 @@
+"""Persistent queue of config writes made while the cloud is unreachable."""
+from __future__ import annotations
+
+from datetime import timedelta
+import logging
+import time
+from typing import Any, Dict
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+OFFLINE_STORAGE_VERSION = 1
+
+# Delay before writing the queue to disk, so bursts of changes save once
+OFFLINE_SAVE_DELAY = 5
+
+
+class OfflineWriteQueue:
+    """Latest intended config per serial and section, kept across restarts.
+
+    Changes made during an outage are merged into one entry per serial and
+    section, so replaying them sends each section once no matter how many
+    edits were made. Entries carry a wall-clock expiry because a charge
+    window set hours ago may no longer be wanted.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, ttl: timedelta) -> None:
+        self.ttl = ttl.total_seconds()
+        self._store: Store = Store(hass, OFFLINE_STORAGE_VERSION, f"{DOMAIN}.offline_writes_{entry_id}")
+        self._writes: dict[str, dict[str, dict[str, Any]]] = {}
+
+    def __bool__(self) -> bool:
+        return any(self._writes.values())
+
+    async def async_load(self) -> None:
+        """Load writes saved before a restart."""
+        stored = await self._store.async_load() or {}
+        self._writes = stored.get("writes", {})
+
+    def record(self, serial: str, section: str, changes: Dict[str, Any]) -> None:
+        """Merge changes into the pending write for a serial and section."""
+        entry = self._writes.setdefault(serial, {}).setdefault(section, {"changes": {}})
+        entry["changes"].update(changes)
+        entry["expires"] = time.time() + self.ttl
+        self._store.async_delay_save(self._data_to_save, OFFLINE_SAVE_DELAY)
+
+    def pop_valid(self) -> list[tuple[str, str, Dict[str, Any]]]:
+        """Remove every write and return the ones that have not expired."""
+        now = time.time()
+        valid = []
+        for serial, sections in self._writes.items():
+            for section, entry in sections.items():
+                if entry["expires"] < now:
+                    _LOGGER.warning(
+                        "Dropping %s change for %s made while offline, it expired: %s",
+                        section, serial, entry["changes"],
+                    )
+                    continue
+                valid.append((serial, section, entry["changes"]))
+
+        self._writes = {}
+        self._store.async_delay_save(self._data_to_save, OFFLINE_SAVE_DELAY)
+        return valid
+
+    def _data_to_save(self) -> dict:
+        """Return the queue in storage format."""
+        return {"writes": self._writes}
@@ -0,0 +1,320 @@
+"""Tariff-aware charge/discharge window optimizer.
+
+Everything here is plain NumPy without Home Assistant imports, so a solve can
+run in an executor thread.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Iterable, Optional, Sequence
+
+import numpy as np
+
+# The optimizer plans one day ahead in quarter-hour slots
+SLOTS = 96
+SLOT_HOURS = 0.25
+SLOT_SECONDS = int(SLOT_HOURS * 3600)
+
+# Battery behaviour per slot, matching what the inverter config can express
+MODE_IDLE = 0  # PV surplus charges the battery, it does not discharge
+MODE_CHARGE = 1  # Grid charging window: charge at full rate up to batHighCap
+MODE_DISCHARGE = 2  # Discharge window: the battery covers the load down to batUseCap
+MODES = (MODE_IDLE, MODE_CHARGE, MODE_DISCHARGE)
+
+# Windows per kind that ChargeConfig/DisChargeConfig can hold
+MAX_WINDOWS = 2
+
+# Keys tried, in order, for the start time and value of timestamped entries
+START_KEYS = ("start", "start_time", "startsAt", "period_start", "from")
+VALUE_KEYS = ("value", "price", "per_kwh", "total", "pv_estimate")
+
+
+@dataclass
+class BatteryLimits:
+    """Battery parameters the schedule has to respect."""
+
+    capacity: float  # Usable capacity (kWh)
+    max_power: float  # Charge and discharge rate (kW)
+    min_soc: float = 10.0  # batUseCap (%)
+    max_soc: float = 100.0  # batHighCap (%)
+    efficiency: float = 0.95  # One-way charge or discharge efficiency
+
+
+@dataclass
+class Schedule:
+    """Result of a solve; windows are (start_slot, end_slot) pairs, end exclusive."""
+
+    charge_windows: list[tuple[int, int]]
+    discharge_windows: list[tuple[int, int]]
+    modes: np.ndarray
+    soc: np.ndarray  # SOC (%) at the start of each slot plus the final one
+    cost: float
+    baseline_cost: float
+    end_soc: float
+    baseline_end_soc: float
+    savings: float  # Baseline minus plan cost, both net of the energy left at the end
+
+
+def battery_step(
+    energy: np.ndarray,
+    mode: np.ndarray | int,
+    net_kwh: np.ndarray | float,
+    limits: BatteryLimits,
+    slot_hours: float = SLOT_HOURS,
+) -> np.ndarray:
+    """Return the change of stored energy (kWh) over one slot.
+
+    ``energy``, ``mode`` and ``net_kwh`` (load minus PV in the slot) broadcast
+    against each other, so one call steps a whole set of states or schedules.
+    """
+    capacity = limits.capacity
+    max_in = limits.max_power * slot_hours * limits.efficiency
+    max_out = limits.max_power * slot_hours
+    floor = capacity * limits.min_soc / 100
+    ceiling = capacity * limits.max_soc / 100
+
+    surplus = np.maximum(-net_kwh, 0.0)
+    deficit = np.maximum(net_kwh, 0.0)
+
+    # PV surplus charges the battery in every mode, up to full
+    solar = np.minimum(np.minimum(surplus * limits.efficiency, max_in), capacity - energy)
+    grid = np.maximum(np.minimum(max_in, ceiling - energy), solar)
+    discharge = -np.minimum(np.minimum(deficit / limits.efficiency, max_out), np.maximum(energy - floor, 0.0))
+
+    return np.where(
+        mode == MODE_CHARGE, grid,
+        np.where((mode == MODE_DISCHARGE) & (deficit > 0), discharge, solar),
+    )
+
+
+def grid_energy(net_kwh: Any, stored: Any, efficiency: float) -> Any:
+    """Return the grid energy (kWh, import positive) for a change of stored energy."""
+    return net_kwh + np.where(stored > 0, stored / efficiency, stored * efficiency)
+
+
+def grid_cost(grid_kwh: Any, price: Any, export_price: Any) -> Any:
+    """Price imports at the tariff and exports at the feed-in price."""
+    return np.where(grid_kwh > 0, grid_kwh * price, grid_kwh * export_price)
+
+
+def optimize_schedule(
+    prices: Sequence[float],
+    load: Sequence[float],
+    pv: Sequence[float],
+    limits: BatteryLimits,
+    soc: float,
+    export_prices: Sequence[float] | float = 0.0,
+    terminal_price: Optional[float] = None,
+    soc_resolution: float = 1.0,
+) -> Schedule:
+    """Find the cheapest schedule of at most two charge and two discharge windows.
+
+    Prices are per kWh and load/PV are average kW, one value per slot. The
+    dynamic program runs backwards over the slots on a grid of SOC states,
+    extended with the number of windows of each kind started so far and the
+    previous mode, which is what limits the result to what the inverter
+    config can hold. Every state is handled in one NumPy operation per mode.
+    Energy left in the battery at the end is worth ``terminal_price`` (by
+    default the mean import price), so the plan does not drain it for free.
+    """
+    prices = np.asarray(prices, dtype=float)
+    export_prices = np.broadcast_to(np.asarray(export_prices, dtype=float), prices.shape)
+    net = (np.asarray(load, dtype=float) - np.asarray(pv, dtype=float)) * SLOT_HOURS
+    slots = len(prices)
+    if terminal_price is None:
+        terminal_price = float(prices.mean())
+
+    states = int(round(100 / soc_resolution)) + 1
+    energy = np.linspace(0.0, limits.capacity, states)
+    step = limits.capacity / (states - 1)
+
+    # Per slot and mode: next SOC index and cost, the same for every window count
+    next_index = np.empty((slots, len(MODES), states), dtype=np.intp)
+    cost = np.empty((slots, len(MODES), states))
+    for mode in MODES:
+        delta = battery_step(energy[None, :], mode, net[:, None], limits)
+        index = np.clip(np.rint((energy + delta) / step), 0, states - 1).astype(np.intp)
+        stored = energy[index] - energy
+        next_index[:, mode] = index
+        cost[:, mode] = grid_cost(
+            grid_energy(net[:, None], stored, limits.efficiency),
+            prices[:, None], export_prices[:, None],
+        )
+
+    # Value function over (soc, charge windows, discharge windows, previous mode)
+    windows = MAX_WINDOWS + 1
+    value = np.broadcast_to(
+        (-energy * limits.efficiency * terminal_price)[:, None, None, None],
+        (states, windows, windows, len(MODES)),
+    )
+    exhausted = np.full((states, 1, windows), np.inf)
+    policy = np.empty((slots, states, windows, windows, len(MODES)), dtype=np.int8)
+
+    for slot in range(slots - 1, -1, -1):
+        options = []
+        for mode in MODES:
+            # Value after taking this mode, indexed by the window counts after it
+            after = value[next_index[slot, mode], :, :, mode] + cost[slot, mode][:, None, None]
+            if mode == MODE_IDLE:
+                option = np.broadcast_to(after[..., None], value.shape)
+            else:
+                # Entering the mode from another one starts a new window
+                axis = 1 if mode == MODE_CHARGE else 2
+                shape = exhausted if axis == 1 else exhausted.transpose(0, 2, 1)
+                started = np.concatenate((np.delete(after, 0, axis=axis), shape), axis=axis)
+                option = np.repeat(started[..., None], len(MODES), axis=3)
+                option[..., mode] = after
+            options.append(option)
+
+        options = np.stack(options)
+        policy[slot] = options.argmin(axis=0)
+        value = options.min(axis=0)
+
+    # Walk the policy forward from the current state
+    modes = np.empty(slots, dtype=np.int8)
+    path = np.empty(slots + 1, dtype=np.intp)
+    index = int(np.clip(round(soc / soc_resolution), 0, states - 1))
+    charges = discharges = 0
+    previous = MODE_IDLE
+    path[0] = index
+    for slot in range(slots):
+        mode = int(policy[slot, index, charges, discharges, previous])
+        charges += mode == MODE_CHARGE and previous != MODE_CHARGE
+        discharges += mode == MODE_DISCHARGE and previous != MODE_DISCHARGE
+        index = int(next_index[slot, mode, index])
+        modes[slot] = previous = mode
+        path[slot + 1] = index
+
+    slot_range = np.arange(slots)
+    optimized_cost = float(cost[slot_range, modes, path[:-1]].sum())
+    baseline_energy, baseline_cost = _simulate_self_consumption(
+        energy[path[0]], net, prices, export_prices, limits,
+    )
+    # Stored energy is worth terminal_price, as in the value function
+    end_value = (energy[path[-1]] - baseline_energy) * limits.efficiency * terminal_price
+
+    return Schedule(
+        charge_windows=_runs(modes, MODE_CHARGE),
+        discharge_windows=_runs(modes, MODE_DISCHARGE),
+        modes=modes,
+        soc=path * soc_resolution,
+        cost=optimized_cost,
+        baseline_cost=baseline_cost,
+        end_soc=float(path[-1] * soc_resolution),
+        baseline_end_soc=float(baseline_energy / limits.capacity * 100),
+        savings=float(baseline_cost - optimized_cost + end_value),
+    )
+
+
+def _simulate_self_consumption(
+    energy: float,
+    net: np.ndarray,
+    prices: np.ndarray,
+    export_prices: np.ndarray,
+    limits: BatteryLimits,
+) -> tuple[float, float]:
+    """Return end energy and grid cost with the battery discharging whenever needed."""
+    total = 0.0
+    for slot, net_kwh in enumerate(net):
+        stored = float(battery_step(energy, MODE_DISCHARGE, net_kwh, limits))
+        energy += stored
+        total += float(grid_cost(grid_energy(net_kwh, stored, limits.efficiency), prices[slot], export_prices[slot]))
+    return energy, total
+
+
+def _runs(modes: np.ndarray, mode: int) -> list[tuple[int, int]]:
+    """Return the (start, end) slots of consecutive runs of a mode."""
+    active = np.concatenate(([False], modes == mode, [False]))
+    edges = np.flatnonzero(np.diff(active.astype(np.int8)))
+    return [(int(start), int(end)) for start, end in zip(edges[::2], edges[1::2])]
+
+
+def window_times(windows: Iterable[tuple[int, int]], horizon_start: datetime) -> list[tuple[str, str]]:
+    """Convert slot windows into the inverter's "HH:MM" start and end times.
+
+    The inverter repeats the config daily, so a window spanning the whole
+    horizon is shortened by a slot to keep its start and end apart.
+    """
+    times = []
+    for start, end in windows:
+        if end - start >= SLOTS:
+            end = start + SLOTS - 1
+        times.append(tuple(
+            (horizon_start + timedelta(seconds=slot * SLOT_SECONDS)).strftime("%H:%M")
+            for slot in (start, end)
+        ))
+    return times
+
+
+def horizon_start(now: datetime) -> datetime:
+    """Return the start of the slot containing ``now``."""
+    return now.replace(minute=now.minute - now.minute % 15, second=0, microsecond=0)
+
+
+def slot_values(raw: Any, start: datetime, parse_datetime) -> np.ndarray:
+    """Resample a price or forecast curve onto the horizon's slots.
+
+    ``raw`` is either a list of numbers covering a day from local midnight
+    (24, 48 or 96 values), or a list of dicts with a start time and a
+    value. Slots past the last timestamped entry reuse the value from a day
+    earlier, so a curve published for today still covers tonight.
+    """
+    if not raw:
+        raise ValueError("The curve is empty")
+
+    midnight = start.replace(hour=0, minute=0)
+    offsets = np.arange(SLOTS) * SLOT_SECONDS + (start - midnight).total_seconds()
+
+    if not isinstance(raw[0], dict):
+        values = np.asarray(raw, dtype=float)
+        if len(values) not in (24, 48, 96):
+            raise ValueError(f"Expected 24, 48 or 96 values, got {len(values)}")
+        per_slot = np.repeat(values, SLOTS // len(values))
+        return per_slot[(offsets // SLOT_SECONDS).astype(int) % SLOTS]
+
+    points = []
+    for entry in raw:
+        moment = next((entry[key] for key in START_KEYS if entry.get(key) is not None), None)
+        value = next((entry[key] for key in VALUE_KEYS if entry.get(key) is not None), None)
+        if moment is None or value is None:
+            continue
+        if not isinstance(moment, datetime):
+            moment = parse_datetime(str(moment))
+        if moment is not None:
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=start.tzinfo)
+            points.append(((moment - midnight).total_seconds(), float(value)))
+    if not points:
+        raise ValueError("No entries with a start time and a value")
+
+    points.sort()
+    times = np.array([point[0] for point in points])
+    values = np.array([point[1] for point in points])
+    spacing = np.median(np.diff(times)) if len(times) > 1 else SLOT_SECONDS
+    offsets = np.where(offsets >= times[-1] + spacing, offsets - 86400, offsets)
+    index = np.clip(np.searchsorted(times, offsets, side="right") - 1, 0, len(values) - 1)
+    return values[index]
+
+
+def slot_profile(timestamps: Sequence[float], values: Sequence[float], start: datetime) -> Optional[np.ndarray]:
+    """Average recorded values (W) by time of day into a kW profile for the horizon.
+
+    Slots without any recorded sample take the mean of the others. Returns
+    None when there is nothing usable.
+    """
+    timestamps = np.asarray(timestamps, dtype=float)
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return None
+
+    utc_offset = start.utcoffset().total_seconds() if start.utcoffset() else 0.0
+    slot_of_day = (((timestamps[valid] + utc_offset) % 86400) // SLOT_SECONDS).astype(int)
+    sums = np.bincount(slot_of_day, weights=values[valid], minlength=SLOTS)
+    counts = np.bincount(slot_of_day, minlength=SLOTS)
+    profile = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+    profile = np.where(np.isnan(profile), np.nanmean(profile), profile) / 1000
+
+    first = int((start.hour * 3600 + start.minute * 60) // SLOT_SECONDS)
+    return np.roll(profile, -first)
@@ -0,0 +1,73 @@
+"""Pending-write overlay for optimistic state on top of coordinator data."""
+from __future__ import annotations
+
+from datetime import timedelta
+import logging
+import time
+from typing import Any, Dict, Iterable
+
+_LOGGER: logging.Logger = logging.getLogger(__package__)
+
+# Returned by PendingWrites.get when no pending value applies
+MISSING = object()
+
+
+def values_match(actual: Any, expected: Any) -> bool:
+    """Compare an API value with a written one, numerically where possible."""
+    try:
+        return float(actual) == float(expected)
+    except (TypeError, ValueError):
+        return str(actual) == str(expected)
+
+
+class PendingWrites:
+    """Values written to the cloud but not yet reported back by it.
+
+    Entities resolve a key from the overlay first and the coordinator
+    snapshot second, so a refresh that still carries the old value does not
+    make the UI flick back. A pending value is dropped as soon as a snapshot
+    confirms it, or once its TTL expires if the write never lands.
+    """
+
+    def __init__(self, ttl: timedelta) -> None:
+        self.ttl = ttl.total_seconds()
+        self._pending: dict[str, dict[str, tuple[Any, float]]] = {}
+
+    def set(self, serial: str, values: Dict[str, Any], ttl: timedelta | None = None) -> None:
+        """Record values just written for a serial, optionally with a custom TTL."""
+        expires = time.monotonic() + (ttl.total_seconds() if ttl is not None else self.ttl)
+        serial_pending = self._pending.setdefault(serial, {})
+        for key, value in values.items():
+            serial_pending[key] = (value, expires)
+
+    def get(self, serial: str, key: str) -> Any:
+        """Return the pending value of a key, or MISSING."""
+        entry = self._pending.get(serial, {}).get(key)
+        if entry is None:
+            return MISSING
+        value, expires = entry
+        if time.monotonic() >= expires:
+            del self._pending[serial][key]
+            return MISSING
+        return value
+
+    def discard(self, serial: str, keys: Iterable[str]) -> None:
+        """Drop pending values, e.g. after a write failed."""
+        serial_pending = self._pending.get(serial)
+        if serial_pending is None:
+            return
+        for key in keys:
+            serial_pending.pop(key, None)
+
+    def reconcile(self, data: Dict[str, Dict[str, Any]]) -> None:
+        """Drop values the snapshot now confirms, and expired ones."""
+        now = time.monotonic()
+        for serial, serial_pending in self._pending.items():
+            serial_data = data.get(serial, {})
+            for key, (value, expires) in list(serial_pending.items()):
+                if key in serial_data and values_match(serial_data[key], value):
+                    _LOGGER.debug("Cloud confirmed %s=%s for %s", key, value, serial)
+                    del serial_pending[key]
+                elif now >= expires:
+                    _LOGGER.debug("Pending %s=%s for %s expired unconfirmed", key, value, serial)
+                    del serial_pending[key]
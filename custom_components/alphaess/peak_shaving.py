@@ -0,0 +1,139 @@
+"""Peak shaving by opening a discharge window while grid import is too high."""
+from __future__ import annotations
+
+from datetime import datetime, timedelta
+from typing import Optional, Sequence
+
+import numpy as np
+
+from .simulator import window_mask
+
+# Discharge windows are written with quarter-hour boundaries
+WINDOW_STEP = timedelta(minutes=15)
+
+
+def _floor(moment: datetime) -> datetime:
+    """Round a time down to a window boundary."""
+    return moment.replace(minute=moment.minute - moment.minute % 15, second=0, microsecond=0)
+
+
+def _ceil(moment: datetime) -> datetime:
+    """Round a time up to a window boundary."""
+    floored = _floor(moment)
+    return floored if floored == moment else floored + WINDOW_STEP
+
+
+class PeakShaver:
+    """Decide when to borrow discharge window 2 to cap grid import.
+
+    With discharge time control on, the battery only discharges inside the
+    configured windows. When import goes over ``limit`` (or a phase over
+    ``phase_limit``) outside those windows, window 2 is pointed at the next
+    ``window`` from now, and its previous value is kept. Demand is judged
+    as grid import plus battery discharge, so the shaving itself does not
+    look like the peak is over. Near the end of the window it is extended
+    if demand is still within ``hysteresis`` of the limit, otherwise it
+    runs out and the previous window is written back. Opening is sent at
+    once; extending and restoring wait ``min_write_interval`` after the
+    last write, so a peak costs as few config writes as possible.
+    """
+
+    def __init__(
+        self,
+        limit: float,
+        phase_limit: float,
+        hysteresis: float,
+        window: timedelta,
+        extend_margin: timedelta,
+        min_write_interval: timedelta,
+    ) -> None:
+        self.enabled = False
+        self.limit = limit
+        self.phase_limit = phase_limit
+        self.hysteresis = hysteresis
+        self.window = window
+        self.extend_margin = extend_margin.total_seconds()
+        self.min_write_interval = min_write_interval.total_seconds()
+        self.window_start: Optional[str] = None
+        self.active_until: Optional[float] = None
+        self.saved_window: Optional[tuple[str, str]] = None
+        self._last_write: Optional[float] = None
+
+    @property
+    def active(self) -> bool:
+        """Return True while window 2 is borrowed."""
+        return self.active_until is not None
+
+    def exceeds(self, grid: float, battery: float, phases: Sequence[float], margin: float = 0.0) -> bool:
+        """Return True if demand is above a limit, less ``margin``."""
+        discharge = max(battery, 0.0)
+        if grid + discharge > self.limit - margin:
+            return True
+        if self.phase_limit and phases:
+            share = discharge / len(phases)
+            return any(phase + share > self.phase_limit - margin for phase in phases)
+        return False
+
+    def update(
+        self,
+        now: datetime,
+        grid: float,
+        battery: float,
+        phases: Sequence[float],
+        discharge_control: bool,
+        windows: Sequence[tuple[str, str]],
+        can_discharge: bool,
+    ) -> Optional[tuple[str, str]]:
+        """Return the discharge window 2 to write now, if it has to change."""
+        timestamp = now.timestamp()
+
+        if not self.active:
+            if not (self.enabled and discharge_control and can_discharge):
+                return None
+            if not self.exceeds(grid, battery, phases):
+                return None
+            seconds = np.array([now.hour * 3600 + now.minute * 60 + now.second])
+            if window_mask(seconds, windows)[0]:
+                # Already inside a discharge window
+                return None
+
+            self.saved_window = tuple(windows[1])
+            start, end = _floor(now), _ceil(now + self.window)
+            self.window_start = start.strftime("%H:%M")
+            return self._write(timestamp, end)
+
+        if self._last_write is not None and timestamp - self._last_write < self.min_write_interval:
+            return None
+
+        if (
+            self.enabled
+            and can_discharge
+            and timestamp >= self.active_until - self.extend_margin
+            and self.exceeds(grid, battery, phases, self.hysteresis)
+        ):
+            end = _ceil(now + self.window)
+            if end.timestamp() > self.active_until:
+                return self._write(timestamp, end)
+            return None
+
+        if not self.enabled or timestamp >= self.active_until:
+            restore = self.saved_window
+            self.active_until = self.saved_window = self.window_start = None
+            self._last_write = timestamp
+            return restore
+
+        return None
+
+    def restore_state(self, active_until: Optional[float], saved_window: Optional[Sequence[str]], window_start: Optional[str]) -> None:
+        """Resume a borrowed window after a restart so it is given back."""
+        if active_until is None or not saved_window:
+            return
+        self.active_until = active_until
+        self.saved_window = tuple(saved_window)
+        self.window_start = window_start
+
+    def _write(self, timestamp: float, end: datetime) -> tuple[str, str]:
+        """Record a window written until ``end`` and return it."""
+        self.active_until = end.timestamp()
+        self._last_write = timestamp
+        return self.window_start, end.strftime("%H:%M")
@@ -0,0 +1,83 @@
+"""Phase imbalance of three-phase grid connections."""
+from __future__ import annotations
+
+from datetime import timedelta
+from typing import Optional, Sequence
+
+import numpy as np
+
+from .analytics import RollingSums
+
+PHASES = ("L1", "L2", "L3")
+
+# Window name -> (length, bucket count)
+IMBALANCE_WINDOWS: dict[str, tuple[timedelta, int]] = {
+    "1h": (timedelta(hours=1), 60),
+    "24h": (timedelta(hours=24), 96),
+}
+
+
+def imbalance(powers: Sequence[float]) -> float:
+    """Return the largest deviation of a phase from the phase average, in % of the average.
+
+    Phase powers are taken by magnitude, since an exporting phase loads
+    the connection like an importing one.
+    """
+    magnitude = np.abs(np.asarray(powers, dtype=float))
+    mean = magnitude.mean()
+    if mean == 0:
+        return 0.0
+    return float(np.abs(magnitude - mean).max() / mean * 100)
+
+
+class PhaseBalance:
+    """Latest and rolling phase imbalance of one inverter's grid connection.
+
+    Each sample holds until the next one, up to ``max_gap`` seconds; the
+    windows sum imbalance times duration, the duration and the time spent
+    above ``threshold``, so averages are time weighted. Samples where the
+    phases average under ``min_power`` are skipped, as imbalance is
+    meaningless on an idle connection.
+    """
+
+    def __init__(self, threshold: float, min_power: float) -> None:
+        self.threshold = threshold
+        self.min_power = min_power
+        self.current: Optional[float] = None
+        self.peak_phase: Optional[str] = None
+        self.peak_power: Optional[float] = None
+        self.windows = {
+            name: RollingSums(length, buckets, 3) for name, (length, buckets) in IMBALANCE_WINDOWS.items()
+        }
+        self._last: Optional[tuple[float, Optional[float]]] = None
+
+    def add(self, timestamp: float, powers: Sequence[float], max_gap: float) -> None:
+        """Add a sample of the three phase powers (W, import positive)."""
+        if self._last is not None:
+            previous, previous_imbalance = self._last
+            elapsed = timestamp - previous
+            if elapsed <= 0:
+                return
+            if previous_imbalance is not None and elapsed <= max_gap:
+                above = elapsed if previous_imbalance > self.threshold else 0.0
+                values = np.array([previous_imbalance * elapsed, elapsed, above])
+                for window in self.windows.values():
+                    window.add(timestamp, values)
+
+        peak = int(np.argmax(powers))
+        self.peak_phase = PHASES[peak]
+        self.peak_power = float(powers[peak])
+        if np.abs(np.asarray(powers, dtype=float)).mean() < self.min_power:
+            self.current = None
+        else:
+            self.current = imbalance(powers)
+        self._last = (timestamp, self.current)
+
+    def average(self, window: str, timestamp: float) -> Optional[float]:
+        """Return the time-weighted average imbalance (%) over a window."""
+        weighted, duration, _ = self.windows[window].sums(timestamp)
+        return float(weighted / duration) if duration else None
+
+    def minutes_above(self, window: str, timestamp: float) -> float:
+        """Return the minutes within a window spent above the threshold."""
+        return float(self.windows[window].sums(timestamp)[2] / 60)
@@ -0,0 +1,155 @@
+"""PV string mismatch detection from live string powers."""
+from __future__ import annotations
+
+import time
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+PV_STRINGS_STORAGE_VERSION = 1
+
+# Seconds between saves
+PV_STRINGS_SAVE_DELAY = 600
+
+# Strings reported by LastPower (ppv1..ppv4)
+STRING_COUNT = 4
+
+# Baselines are kept per local hour, since orientation and shading change
+# each string's share over the day
+HOUR_BUCKETS = 24
+
+# Total PV below this (W) is too noisy to compare strings
+MIN_TOTAL_POWER = 300
+
+# Samples an hour needs before its baseline is trusted
+MIN_BASELINE_SAMPLES = 30
+
+# Learning rate of the baselines once warmed up, and of the recent deviation
+BASELINE_RATE = 0.002
+DEVIATION_RATE = 0.1
+
+# Shortfall against the best string that raises a flag; it clears at half
+MISMATCH_THRESHOLD = 0.2
+
+# Strings with a smaller share than this are unused or too small to judge
+MIN_STRING_SHARE = 0.05
+
+
+class StringMismatchDetector:
+    """Compare each PV string's output with what the other strings imply.
+
+    For every local hour the detector learns each string's share of the
+    summed string power. Dividing a string's power by its usual share
+    gives the total it implies; a string implying less than the best one
+    is falling behind the others. With only a ratio between strings a
+    rise of one cannot be told from a drop of the rest, so only shortfalls
+    count. The deviation is smoothed, so one cloud passing over a string
+    does not raise a flag, and a flagged string stops updating its
+    baseline so the fault is not learned as normal. State is a fixed set
+    of arrays and each sample costs the same.
+    """
+
+    def __init__(self) -> None:
+        self.baseline = np.zeros((HOUR_BUCKETS, STRING_COUNT))
+        self.samples = np.zeros(HOUR_BUCKETS)
+        self.deviation = np.zeros(STRING_COUNT)
+        self.flagged = np.zeros(STRING_COUNT, dtype=bool)
+
+    def add(self, hour: int, powers: Sequence[Optional[float]]) -> None:
+        """Add the string powers (W) measured at a local hour."""
+        power = np.array([np.nan if value is None else float(value) for value in powers[:STRING_COUNT]])
+        power = np.pad(power, (0, STRING_COUNT - len(power)), constant_values=np.nan)
+        total = np.nansum(power)
+        if total < MIN_TOTAL_POWER:
+            return
+
+        share = power / total
+        reported = ~np.isnan(share)
+        baseline = self.baseline[hour]
+        judged = reported & (baseline >= MIN_STRING_SHARE)
+        if self.samples[hour] >= MIN_BASELINE_SAMPLES and judged.sum() >= 2:
+            implied = np.where(judged, share / np.where(judged, baseline, 1), np.nan)
+            deviation = implied / np.nanmax(implied) - 1
+            self.deviation += np.where(judged, (np.nan_to_num(deviation) - self.deviation) * DEVIATION_RATE, 0.0)
+            self.flagged = judged & np.where(
+                self.flagged, self.deviation < -MISMATCH_THRESHOLD / 2, self.deviation < -MISMATCH_THRESHOLD
+            )
+
+        rate = max(1 / (self.samples[hour] + 1), BASELINE_RATE)
+        learn = reported & ~self.flagged
+        baseline[learn] += (share[learn] - baseline[learn]) * rate
+        self.samples[hour] += 1
+
+    def as_dict(self) -> dict:
+        """Return the detector in storage format."""
+        return {
+            "baseline": self.baseline.tolist(),
+            "samples": self.samples.tolist(),
+            "deviation": self.deviation.tolist(),
+        }
+
+    def restore(self, stored: dict) -> None:
+        """Load a detector saved by ``as_dict`` if it has the same shape."""
+        baseline = np.asarray(stored.get("baseline", []), dtype=float)
+        samples = np.asarray(stored.get("samples", []), dtype=float)
+        deviation = np.asarray(stored.get("deviation", []), dtype=float)
+        if (
+            baseline.shape != self.baseline.shape
+            or samples.shape != self.samples.shape
+            or deviation.shape != self.deviation.shape
+        ):
+            return
+        self.baseline, self.samples, self.deviation = baseline, samples, deviation
+        self.flagged = deviation < -MISMATCH_THRESHOLD
+
+
+class PvStringStats:
+    """String mismatch detectors of every inverter, kept across restarts."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store: Store = Store(hass, PV_STRINGS_STORAGE_VERSION, f"{DOMAIN}.pv_strings_{entry_id}")
+        self._serials: dict[str, StringMismatchDetector] = {}
+        self._saved: dict[str, Any] = {}
+        self._last_save = 0.0
+
+    async def async_load(self) -> None:
+        """Load the baselines saved before a restart."""
+        self._saved = (await self._store.async_load() or {}).get("serials", {})
+
+    def get(self, serial: str) -> Optional[StringMismatchDetector]:
+        """Return the detector of an inverter, if it has one."""
+        if serial not in self._serials and serial in self._saved:
+            detector = StringMismatchDetector()
+            detector.restore(self._saved.pop(serial))
+            self._serials[serial] = detector
+        return self._serials.get(serial)
+
+    def add(self, serial: str, hour: int, powers: Sequence[Optional[float]]) -> None:
+        """Add string powers of an inverter and schedule a save."""
+        detector = self.get(serial) or self._serials.setdefault(serial, StringMismatchDetector())
+        detector.add(hour, powers)
+
+        # Rescheduling would keep pushing the save back, so schedule one at a time
+        now = time.monotonic()
+        if now - self._last_save >= PV_STRINGS_SAVE_DELAY:
+            self._last_save = now
+            self._store.async_delay_save(self._data_to_save, PV_STRINGS_SAVE_DELAY)
+
+    def remove(self, serial: str) -> None:
+        """Forget an inverter, e.g. after its subentry was removed."""
+        if serial in self._serials or serial in self._saved:
+            self._serials.pop(serial, None)
+            self._saved.pop(serial, None)
+            self._store.async_delay_save(self._data_to_save, PV_STRINGS_SAVE_DELAY)
+
+    def _data_to_save(self) -> dict:
+        """Return every detector in storage format."""
+        serials = dict(self._saved)
+        for serial, detector in self._serials.items():
+            serials[serial] = detector.as_dict()
+        return {"serials": serials}
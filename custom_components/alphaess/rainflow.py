@@ -0,0 +1,202 @@
+"""Battery cycle counting and lifetime throughput, kept across restarts."""
+from __future__ import annotations
+
+from datetime import timedelta
+import time
+from typing import Any, Optional
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+WEAR_STORAGE_VERSION = 1
+
+# Seconds between saves
+WEAR_SAVE_DELAY = 600
+
+# SOC is rounded to this (%); a move of one step is noise, not a reversal
+RAINFLOW_HYSTERESIS = 1.0
+
+# Depth of discharge histogram: bins of this many percent
+DOD_BIN_WIDTH = 10
+
+# Longest residue kept; beyond it the oldest reversal is counted as a half cycle
+MAX_RESIDUE = 64
+
+
+class RainflowCounter:
+    """Streaming four-point rainflow counting over a SOC series.
+
+    Only the reversals that have not closed a cycle yet (the residue) are
+    kept, capped at MAX_RESIDUE, so memory is constant however long the
+    series runs. Closed cycles go straight into a depth histogram.
+    """
+
+    def __init__(self) -> None:
+        # Reversals so far; the last one is still moving with the SOC
+        self.residue: list[float] = []
+        # Cycle count per depth bin (half cycles count 0.5)
+        self.histogram: list[float] = [0.0] * (100 // DOD_BIN_WIDTH)
+        # Sum of depth (%) times count of every closed cycle
+        self.depth_total = 0.0
+
+    @property
+    def equivalent_full_cycles(self) -> float:
+        """Return the closed cycles weighted by depth, as full 0-100% cycles."""
+        return self.depth_total / 100
+
+    def add(self, soc: float) -> None:
+        """Add a SOC reading (%)."""
+        # Rounding lets cycles between the same levels close despite jitter
+        soc = round(soc / RAINFLOW_HYSTERESIS) * RAINFLOW_HYSTERESIS
+        residue = self.residue
+        if not residue:
+            residue.append(soc)
+            return
+        if len(residue) == 1:
+            if abs(soc - residue[0]) > RAINFLOW_HYSTERESIS:
+                residue.append(soc)
+            return
+
+        rising = residue[-1] > residue[-2]
+        if (soc > residue[-1]) == rising and soc != residue[-1]:
+            # Still moving the same way
+            residue[-1] = soc
+            return
+        if abs(soc - residue[-1]) <= RAINFLOW_HYSTERESIS:
+            return
+
+        # The last point was a reversal; close the cycles it completes
+        self._close_cycles()
+        residue.append(soc)
+        if len(residue) > MAX_RESIDUE:
+            self._count(abs(residue[1] - residue[0]), 0.5)
+            del residue[0]
+
+    def _close_cycles(self) -> None:
+        """Apply the four-point rule to the confirmed reversals."""
+        residue = self.residue
+        while len(residue) >= 4:
+            a, b, c, d = residue[-4:]
+            inner = abs(b - c)
+            if inner <= abs(a - b) and inner <= abs(c - d):
+                self._count(inner, 1.0)
+                del residue[-3:-1]
+            else:
+                break
+
+    def _count(self, depth: float, count: float) -> None:
+        """Record a cycle of ``depth`` percent."""
+        index = min(int(depth // DOD_BIN_WIDTH), len(self.histogram) - 1)
+        self.histogram[index] += count
+        self.depth_total += depth * count
+
+    def as_dict(self) -> dict:
+        """Return the counter in storage format."""
+        return {"residue": self.residue, "histogram": self.histogram, "depth_total": self.depth_total}
+
+    def restore(self, stored: dict) -> None:
+        """Load a counter saved by ``as_dict``."""
+        histogram = stored.get("histogram", [])
+        if len(histogram) == len(self.histogram):
+            self.histogram = [float(value) for value in histogram]
+            self.depth_total = float(stored.get("depth_total", 0.0))
+            self.residue = [float(value) for value in stored.get("residue", [])][-MAX_RESIDUE:]
+
+
+class BatteryWear:
+    """Cycle counting and lifetime charge/discharge energy of one battery."""
+
+    def __init__(self) -> None:
+        self.cycles = RainflowCounter()
+        self.charged = 0.0  # kWh
+        self.discharged = 0.0  # kWh
+        self._last: Optional[tuple[float, float]] = None
+
+    def add(self, timestamp: float, soc: Optional[float], battery: Optional[float], max_gap: float) -> None:
+        """Add a sample: SOC (%) and battery power (W, discharge positive)."""
+        if soc is not None:
+            self.cycles.add(soc)
+        if battery is None:
+            return
+        if self._last is not None:
+            previous, previous_power = self._last
+            elapsed = timestamp - previous
+            if elapsed <= 0:
+                return
+            if elapsed <= max_gap:
+                # Trapezoid over each side of zero, so a sign change is split correctly
+                self.discharged += _positive_area(previous_power, battery, elapsed)
+                self.charged += _positive_area(-previous_power, -battery, elapsed)
+        self._last = (timestamp, battery)
+
+    def as_dict(self) -> dict:
+        """Return the wear state in storage format."""
+        return {**self.cycles.as_dict(), "charged": self.charged, "discharged": self.discharged}
+
+    def restore(self, stored: dict) -> None:
+        """Load wear state saved by ``as_dict``."""
+        self.cycles.restore(stored)
+        self.charged = float(stored.get("charged", 0.0))
+        self.discharged = float(stored.get("discharged", 0.0))
+
+
+def _positive_area(start: float, end: float, seconds: float) -> float:
+    """Return the energy (kWh) of the positive part of a linear power ramp."""
+    if start >= 0 and end >= 0:
+        return (start + end) / 2 * seconds / 3_600_000
+    if start <= 0 and end <= 0:
+        return 0.0
+    # Only the part before or after the zero crossing counts
+    high = max(start, end)
+    share = high / (high - min(start, end))
+    return high / 2 * seconds * share / 3_600_000
+
+
+class BatteryWearStats:
+    """Battery wear of every inverter, kept across restarts."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str, max_gap: timedelta) -> None:
+        self.max_gap = max_gap.total_seconds()
+        self._store: Store = Store(hass, WEAR_STORAGE_VERSION, f"{DOMAIN}.battery_wear_{entry_id}")
+        self._serials: dict[str, BatteryWear] = {}
+        self._saved: dict[str, Any] = {}
+        self._last_save = 0.0
+
+    async def async_load(self) -> None:
+        """Load the wear state saved before a restart."""
+        self._saved = (await self._store.async_load() or {}).get("serials", {})
+
+    def get(self, serial: str) -> Optional[BatteryWear]:
+        """Return the wear state of an inverter, if it has any."""
+        if serial not in self._serials and serial in self._saved:
+            wear = BatteryWear()
+            wear.restore(self._saved.pop(serial))
+            self._serials[serial] = wear
+        return self._serials.get(serial)
+
+    def add(self, serial: str, timestamp: float, soc: Optional[float], battery: Optional[float]) -> None:
+        """Add a sample of an inverter and schedule a save."""
+        wear = self.get(serial) or self._serials.setdefault(serial, BatteryWear())
+        wear.add(timestamp, soc, battery, self.max_gap)
+
+        # Rescheduling would keep pushing the save back, so schedule one at a time
+        now = time.monotonic()
+        if now - self._last_save >= WEAR_SAVE_DELAY:
+            self._last_save = now
+            self._store.async_delay_save(self._data_to_save, WEAR_SAVE_DELAY)
+
+    def remove(self, serial: str) -> None:
+        """Forget an inverter, e.g. after its subentry was removed."""
+        if serial in self._serials or serial in self._saved:
+            self._serials.pop(serial, None)
+            self._saved.pop(serial, None)
+            self._store.async_delay_save(self._data_to_save, WEAR_SAVE_DELAY)
+
+    def _data_to_save(self) -> dict:
+        """Return every inverter's wear state in storage format."""
+        serials = dict(self._saved)
+        for serial, wear in self._serials.items():
+            serials[serial] = wear.as_dict()
+        return {"serials": serials}
@@ -0,0 +1,29 @@
+"""Rate limiting for AlphaESS cloud API calls."""
+from __future__ import annotations
+
+import asyncio
+import time
+
+
+class ApiRateLimiter:
+    """Space out cloud API calls so bursts stay within the OpenAPI limits.
+
+    Use as an async context manager around each API call. Calls are released
+    in order, at most one per ``min_interval`` seconds.
+    """
+
+    def __init__(self, min_interval: float) -> None:
+        self.min_interval = min_interval
+        self._lock = asyncio.Lock()
+        self._next_slot = 0.0
+
+    async def __aenter__(self) -> ApiRateLimiter:
+        async with self._lock:
+            delay = self._next_slot - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_slot = time.monotonic() + self.min_interval
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        return None
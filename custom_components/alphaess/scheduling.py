@@ -0,0 +1,49 @@
+"""Upload phase tracking for aligning polls with the AlphaESS cloud."""
+from __future__ import annotations
+
+from collections import deque
+import math
+from statistics import median
+from typing import Iterable, Optional
+
+# Number of sample intervals needed before the period is trusted
+MIN_PHASE_INTERVALS = 3
+
+
+class UploadPhaseTracker:
+    """Learn the cadence and phase at which an inverter's samples reach the cloud.
+
+    Fed with server-side sample timestamps, it estimates the upload period as
+    the median spacing of recent samples and predicts when the next one is
+    due, so polls can be scheduled just after it instead of at a fixed,
+    unrelated offset.
+    """
+
+    def __init__(self, history: int = 16) -> None:
+        self._intervals: deque[float] = deque(maxlen=history)
+        self.last_upload: Optional[float] = None
+
+    def observe(self, timestamps: Iterable[float]) -> None:
+        """Record sample timestamps in chronological order."""
+        for timestamp in timestamps:
+            if self.last_upload is not None:
+                if timestamp <= self.last_upload:
+                    continue
+                self._intervals.append(timestamp - self.last_upload)
+            self.last_upload = timestamp
+
+    @property
+    def period(self) -> Optional[float]:
+        """Return the learned upload period in seconds, once it is reliable."""
+        if len(self._intervals) < MIN_PHASE_INTERVALS:
+            return None
+        return median(self._intervals)
+
+    def next_upload_after(self, timestamp: float) -> Optional[float]:
+        """Return the first expected upload strictly after a timestamp."""
+        period = self.period
+        if period is None or self.last_upload is None:
+            return None
+
+        cycles = max(0, math.floor((timestamp - self.last_upload) / period) + 1)
+        return self.last_upload + cycles * period
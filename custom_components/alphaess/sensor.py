@@ -1,22 +1,26 @@
 """Alpha ESS Sensor definitions."""
 import logging
-from typing import List
+from typing import Any, List
 
 from homeassistant.components.sensor import (
     SensorEntity, SensorDeviceClass
 )
 from homeassistant.const import CURRENCY_DOLLAR
 from homeassistant.helpers.typing import StateType
+from homeassistant.util import dt as dt_util
 
 from .enums import AlphaESSNames
-from .sensorlist import FULL_SENSOR_DESCRIPTIONS, LIMITED_SENSOR_DESCRIPTIONS, EV_CHARGING_DETAILS, LOCAL_IP_SYSTEM_SENSORS
+from .sensorlist import FULL_SENSOR_DESCRIPTIONS, LIMITED_SENSOR_DESCRIPTIONS, EV_CHARGING_DETAILS, LOCAL_IP_SYSTEM_SENSORS, \
+    ROLLING_ENERGY_SENSORS, INTEGRATED_ENERGY_SENSORS, BATTERY_WEAR_SENSORS, PHASE_IMBALANCE_SENSORS
 
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from .rainflow import DOD_BIN_WIDTH
 from .const import DOMAIN, LIMITED_INVERTER_SENSOR_LIST, EV_CHARGER_STATE_KEYS, TCP_STATUS_KEYS, ETHERNET_STATUS_KEYS, \
     FOUR_G_STATUS_KEYS, WIFI_STATUS_KEYS, CONF_SERIAL_NUMBER, SUBENTRY_TYPE_INVERTER, SUBENTRY_TYPE_EV_CHARGER, \
     CONF_PARENT_INVERTER
 from .coordinator import AlphaESSDataUpdateCoordinator
 from .device import build_inverter_device_info, build_ev_charger_device_info
+from .entity_manager import SubentryEntityManager
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
@@ -97,8 +101,8 @@ EV_CONNECTOR_POWER_KEYS = {
 
 
 
-def _add_ev_entities(coordinator, entry, serial, data, currency, ev_charging_supported_states, subentry_id, async_add_entities):
-    """Create and register EV charger sensor entities."""
+def _build_ev_entities(coordinator, entry, serial, data, currency, ev_charging_supported_states) -> List["AlphaESSSensor"]:
+    """Create EV charger sensor entities."""
     ev_charger = data.get("EV Charger S/N")
     ev_model = data.get("EV Charger Model")
     ev_device_info = build_ev_charger_device_info(data)
@@ -114,7 +118,7 @@ def _add_ev_entities(coordinator, entry, serial, data, currency, ev_charging_sup
             )
         )
 
-    async_add_entities(ev_entities, config_subentry_id=subentry_id)
+    return ev_entities
 
 
 async def async_setup_entry(hass, entry, async_add_entities) -> None:
@@ -139,135 +143,145 @@ async def async_setup_entry(hass, entry, async_add_entities) -> None:
 
     _LOGGER.info(f"Initializing Inverters")
 
-    # Create entities per inverter subentry
-    for subentry in entry.subentries.values():
-        if subentry.subentry_type == SUBENTRY_TYPE_INVERTER:
-            serial = subentry.data.get(CONF_SERIAL_NUMBER)
-            if not serial or serial not in coordinator.data:
-                continue
+    def _build_inverter_entities(subentry) -> List[AlphaESSSensor]:
+        serial = subentry.data.get(CONF_SERIAL_NUMBER)
+        if not serial or serial not in coordinator.data:
+            return []
 
-            data = coordinator.data[serial]
-            model = data.get("Model")
-            currency = _normalize_currency_unit(
-                data.get(AlphaESSNames.CurrencyCode) or data.get("Currency"),
-                hass.config.currency,
-            )
+        data = coordinator.data[serial]
+        model = data.get("Model")
+        currency = _normalize_currency_unit(
+            data.get(AlphaESSNames.CurrencyCode) or data.get("Currency"),
+            hass.config.currency,
+        )
 
-            _LOGGER.info(f"New Inverter: Serial: {serial}, Model: {model}")
-
-            has_local_ip_data = 'Local IP' in data
-            inverter_device_info = build_inverter_device_info(serial, data)
-
-            inverter_entities: List[AlphaESSSensor] = []
-
-            if model in LIMITED_INVERTER_SENSOR_LIST:
-                for description in limited_key_supported_states:
-                    if (
-                        description == AlphaESSNames.pev
-                        and data.get(AlphaESSNames.ElectricVehiclePowerOne) is None
-                    ):
-                        continue
-                    if (
-                        description in EV_CONNECTOR_POWER_KEYS
-                        and data.get(description) is None
-                    ):
-                        continue
-                    inverter_entities.append(
-                        AlphaESSSensor(
-                            coordinator, entry, serial,
-                            limited_key_supported_states[description],
-                            currency, device_info=inverter_device_info,
-                        )
-                    )
-            else:
-                for description in full_key_supported_states:
-                    if (
-                        description == AlphaESSNames.pev
-                        and data.get(AlphaESSNames.ElectricVehiclePowerOne) is None
-                    ):
-                        continue
-                    if (
-                        description in EV_CONNECTOR_POWER_KEYS
-                        and data.get(description) is None
-                    ):
-                        continue
-                    inverter_entities.append(
-                        AlphaESSSensor(
-                            coordinator, entry, serial,
-                            full_key_supported_states[description],
-                            currency, device_info=inverter_device_info,
-                        )
-                    )
+        _LOGGER.info(f"New Inverter: Serial: {serial}, Model: {model}")
 
-            if has_local_ip_data and data.get('Local IP') != '0' and data.get('Device Status') is not None:
-                _LOGGER.info(f"New local IP system sensor for {serial}")
-                for description in LOCAL_IP_SYSTEM_SENSORS:
-                    inverter_entities.append(
-                        AlphaESSSensor(
-                            coordinator, entry, serial,
-                            local_ip_supported_states[description.key],
-                            currency, device_info=inverter_device_info,
-                        )
-                    )
+        has_local_ip_data = 'Local IP' in data
+        inverter_device_info = build_inverter_device_info(serial, data)
 
-            async_add_entities(
-                inverter_entities,
-                config_subentry_id=subentry.subentry_id,
-            )
+        inverter_entities: List[AlphaESSSensor] = []
 
-        elif subentry.subentry_type == SUBENTRY_TYPE_EV_CHARGER:
-            parent_serial = subentry.data.get(CONF_PARENT_INVERTER)
-            if not parent_serial or parent_serial not in coordinator.data:
-                continue
+        if model in LIMITED_INVERTER_SENSOR_LIST:
+            supported_states = limited_key_supported_states
+        else:
+            supported_states = full_key_supported_states
 
-            data = coordinator.data[parent_serial]
-            ev_charger = data.get("EV Charger S/N")
-            if not ev_charger:
+        for description in supported_states:
+            if (
+                description == AlphaESSNames.pev
+                and data.get(AlphaESSNames.ElectricVehiclePowerOne) is None
+            ):
                 continue
+            if (
+                description in EV_CONNECTOR_POWER_KEYS
+                and data.get(description) is None
+            ):
+                continue
+            inverter_entities.append(
+                AlphaESSSensor(
+                    coordinator, entry, serial,
+                    supported_states[description],
+                    currency, device_info=inverter_device_info,
+                )
+            )
+
+        for description in ROLLING_ENERGY_SENSORS:
+            inverter_entities.append(
+                AlphaESSRollingSensor(
+                    coordinator, entry, serial, description,
+                    device_info=inverter_device_info,
+                )
+            )
 
-            currency = _normalize_currency_unit(
-                data.get(AlphaESSNames.CurrencyCode) or data.get("Currency"),
-                hass.config.currency,
+        for description in INTEGRATED_ENERGY_SENSORS:
+            if description.channel == "ev" and data.get(AlphaESSNames.evchargersn) is None:
+                continue
+            inverter_entities.append(
+                AlphaESSIntegratedEnergySensor(
+                    coordinator, entry, serial, description,
+                    device_info=inverter_device_info,
+                )
             )
 
-            ev_model = data.get("EV Charger Model")
-            _LOGGER.info(f"New EV Charger: Serial: {ev_charger}, Model: {ev_model}")
+        if data.get(AlphaESSNames.cobat):
+            for description in BATTERY_WEAR_SENSORS:
+                inverter_entities.append(
+                    AlphaESSWearSensor(
+                        coordinator, entry, serial, description,
+                        device_info=inverter_device_info,
+                    )
+                )
+
+        # Set once L2 or L3 carried power; a three-phase site that starts at
+        # night gets these through the new data keys signal later
+        if serial in coordinator.phase_balance:
+            for description in PHASE_IMBALANCE_SENSORS:
+                inverter_entities.append(
+                    AlphaESSPhaseSensor(
+                        coordinator, entry, serial, description,
+                        device_info=inverter_device_info,
+                    )
+                )
+
+        if has_local_ip_data and data.get('Local IP') != '0' and data.get('Device Status') is not None:
+            _LOGGER.info(f"New local IP system sensor for {serial}")
+            for description in LOCAL_IP_SYSTEM_SENSORS:
+                inverter_entities.append(
+                    AlphaESSSensor(
+                        coordinator, entry, serial,
+                        local_ip_supported_states[description.key],
+                        currency, device_info=inverter_device_info,
+                    )
+                )
 
-            _add_ev_entities(
-                coordinator, entry, parent_serial, data, currency,
-                ev_charging_supported_states, subentry.subentry_id, async_add_entities,
+        # Inverters with an EV charger that has no dedicated EV subentry
+        # (auto-discovered EV chargers without explicit subentries)
+        ev_charger = data.get("EV Charger S/N")
+        ev_subentry_serials = {
+            sub.data.get(CONF_SERIAL_NUMBER)
+            for sub in entry.subentries.values()
+            if sub.subentry_type == SUBENTRY_TYPE_EV_CHARGER
+        }
+        if ev_charger and ev_charger not in ev_subentry_serials:
+            inverter_entities.extend(
+                _build_ev_entities(
+                    coordinator, entry, serial, data, currency,
+                    ev_charging_supported_states,
+                )
             )
 
-    # Handle inverters with EV chargers that don't have a dedicated EV subentry
-    # (auto-discovered EV chargers without explicit subentries)
-    ev_subentry_serials = {
-        sub.data.get(CONF_SERIAL_NUMBER)
-        for sub in entry.subentries.values()
-        if sub.subentry_type == SUBENTRY_TYPE_EV_CHARGER
-    }
+        return inverter_entities
 
-    for subentry in entry.subentries.values():
-        if subentry.subentry_type != SUBENTRY_TYPE_INVERTER:
-            continue
-        serial = subentry.data.get(CONF_SERIAL_NUMBER)
-        if not serial or serial not in coordinator.data:
-            continue
+    def _build_ev_charger_entities(subentry) -> List[AlphaESSSensor]:
+        parent_serial = subentry.data.get(CONF_PARENT_INVERTER)
+        if not parent_serial or parent_serial not in coordinator.data:
+            return []
 
-        data = coordinator.data[serial]
+        data = coordinator.data[parent_serial]
         ev_charger = data.get("EV Charger S/N")
-        if not ev_charger or ev_charger in ev_subentry_serials:
-            continue
+        if not ev_charger:
+            return []
 
         currency = _normalize_currency_unit(
             data.get(AlphaESSNames.CurrencyCode) or data.get("Currency"),
             hass.config.currency,
         )
 
-        _add_ev_entities(
-            coordinator, entry, serial, data, currency,
-            ev_charging_supported_states, subentry.subentry_id, async_add_entities,
+        return _build_ev_entities(
+            coordinator, entry, parent_serial, data, currency,
+            ev_charging_supported_states,
         )
 
+    def _build_subentry_entities(subentry) -> List[AlphaESSSensor]:
+        if subentry.subentry_type == SUBENTRY_TYPE_INVERTER:
+            return _build_inverter_entities(subentry)
+        if subentry.subentry_type == SUBENTRY_TYPE_EV_CHARGER:
+            return _build_ev_charger_entities(subentry)
+        return []
+
+    SubentryEntityManager(hass, entry, async_add_entities, _build_subentry_entities).async_setup()
+
 
 class AlphaESSSensor(CoordinatorEntity, SensorEntity):
     """Alpha ESS Base Sensor."""
@@ -366,10 +380,22 @@ class AlphaESSSensor(CoordinatorEntity, SensorEntity):
 
         if self._key in [AlphaESSNames.ChargeTime1, AlphaESSNames.ChargeTime2,
                          AlphaESSNames.DischargeTime1, AlphaESSNames.DischargeTime2]:
-            return self._coordinator.data.get(self._serial, {}).get(self._key)
+            return self._coordinator.get_value(self._serial, self._key)
 
         # Normal sensor handling - use the key instead of name for consistency
-        return self._coordinator.data.get(self._serial, {}).get(self._key)
+        return self._coordinator.get_value(self._serial, self._key)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return whether the value is stale, and its source on local-first inverters."""
+        attributes = {}
+        if self._serial in self._coordinator.local_first_serials:
+            source = self._coordinator.get_data_source(self._serial, self._key)
+            if source is not None:
+                attributes["data_source"] = source
+        if self._coordinator.is_stale(self._serial, self._key):
+            attributes["stale"] = True
+        return attributes or None
 
     @property
     def native_unit_of_measurement(self):
@@ -463,3 +489,125 @@ class AlphaESSSensor(CoordinatorEntity, SensorEntity):
             return get_time_range("charge")
 
         return None
+
+
+class AlphaESSComputedSensor(CoordinatorEntity, SensorEntity):
+    """Alpha ESS sensor computed by the integration from live power samples.
+
+    Units, classes and icons come from the entity description; subclasses
+    only read their value from the coordinator.
+    """
+
+    def __init__(self, coordinator, config, serial, description, device_info=None):
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._config = config
+        self._serial = serial
+        self._coordinator = coordinator
+        self._name = description.name
+
+        if device_info:
+            self._attr_device_info = device_info
+
+    @property
+    def unique_id(self):
+        """Return a unique ID to use for this entity."""
+        return f"{self._config.entry_id}_{self._serial} - {self._name}"
+
+    @property
+    def name(self):
+        """Return the name of the sensor."""
+        return f"{self._name}"
+
+    @property
+    def suggested_object_id(self):
+        """Return suggested object id."""
+        return f"{self._serial} {self._name}"
+
+
+class AlphaESSRollingSensor(AlphaESSComputedSensor):
+    """Alpha ESS rolling window energy sensor."""
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the metric over the window ending now."""
+        stats = self._coordinator.energy_stats.stats(self._serial, self.entity_description.window)
+        if stats is None:
+            return None
+        return stats[self.entity_description.metric]
+
+
+class AlphaESSIntegratedEnergySensor(AlphaESSComputedSensor):
+    """Alpha ESS daily energy sensor, integrated sample by sample."""
+
+    @property
+    def native_value(self) -> StateType:
+        """Return today's integrated energy."""
+        integrator = self._coordinator.daily_energy.get(self._serial)
+        if integrator is None:
+            return None
+        return integrator.value(self.entity_description.channel)
+
+    @property
+    def last_reset(self):
+        """Return local midnight of the day being integrated."""
+        integrator = self._coordinator.daily_energy.get(self._serial)
+        if integrator is None or integrator.day is None:
+            return None
+        return dt_util.start_of_local_day(integrator.day)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return how far integration had drifted from the cloud total at the last reconcile."""
+        integrator = self._coordinator.daily_energy.get(self._serial)
+        channel = self.entity_description.channel
+        if integrator is None or channel not in integrator.drift:
+            return None
+        return {"drift": integrator.drift[channel]}
+
+
+class AlphaESSWearSensor(AlphaESSComputedSensor):
+    """Alpha ESS battery wear sensor, from cycle counting and integrated battery power."""
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the wear metric."""
+        wear = self._coordinator.battery_wear.get(self._serial)
+        if wear is None:
+            return None
+        return self.entity_description.value(wear)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the depth of discharge histogram with the cycle count."""
+        wear = self._coordinator.battery_wear.get(self._serial)
+        if wear is None or self.entity_description.key != "equivalent_full_cycles":
+            return None
+        return {
+            "depth_histogram": {
+                f"{index * DOD_BIN_WIDTH}-{(index + 1) * DOD_BIN_WIDTH}%": count
+                for index, count in enumerate(wear.cycles.histogram)
+            },
+            "open_reversals": len(wear.cycles.residue),
+        }
+
+
+class AlphaESSPhaseSensor(AlphaESSComputedSensor):
+    """Alpha ESS grid phase imbalance sensor, from the per-phase meter readings."""
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the imbalance metric."""
+        balance = self._coordinator.phase_balance.get(self._serial)
+        if balance is None:
+            return None
+        return self.entity_description.value(balance, dt_util.utcnow().timestamp())
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the power of the peak phase."""
+        balance = self._coordinator.phase_balance.get(self._serial)
+        if balance is None or self.entity_description.key != "peak_phase":
+            return None
+        return {"peak_power": balance.peak_power}
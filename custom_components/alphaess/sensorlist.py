@@ -1,15 +1,21 @@
 from typing import List
 
+from homeassistant.components.binary_sensor import BinarySensorDeviceClass
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorStateClass,
 )
-from homeassistant.const import UnitOfEnergy, PERCENTAGE, UnitOfPower, CURRENCY_DOLLAR, EntityCategory, UnitOfMass
+from homeassistant.const import UnitOfEnergy, PERCENTAGE, UnitOfPower, CURRENCY_DOLLAR, EntityCategory, UnitOfMass, \
+    UnitOfTime
 
 from homeassistant.components.number import NumberMode
 
 from .entity import (
     AlphaESSSensorDescription,
+    AlphaESSRollingSensorDescription,
+    AlphaESSIntegratedSensorDescription,
+    AlphaESSWearSensorDescription,
+    AlphaESSPhaseSensorDescription,
     AlphaESSButtonDescription,
     AlphaESSBinarySensorDescription,
     AlphaESSNumberDescription,
@@ -813,6 +819,133 @@ LIMITED_SENSOR_DESCRIPTIONS: List[AlphaESSSensorDescription] = [
     ),
 ] + _COMMON_DAILY_SENSORS
 
+# Rolling window sensors: (metric, name, icon, unit); one per window below
+_ROLLING_METRICS = [
+    ("self_sufficiency", "Self Sufficiency", "mdi:home-percent", PERCENTAGE),
+    ("self_consumption", "Self Consumption", "mdi:home-lightning-bolt", PERCENTAGE),
+    ("import", "Grid Import", "mdi:transmission-tower-import", UnitOfEnergy.KILO_WATT_HOUR),
+    ("export", "Grid Export", "mdi:transmission-tower-export", UnitOfEnergy.KILO_WATT_HOUR),
+    ("throughput", "Battery Throughput", "mdi:battery-sync", UnitOfEnergy.KILO_WATT_HOUR),
+]
+
+ROLLING_ENERGY_SENSORS: List[AlphaESSRollingSensorDescription] = [
+    AlphaESSRollingSensorDescription(
+        key=f"{metric}_{window}",
+        name=f"{name} {window}",
+        icon=icon,
+        native_unit_of_measurement=unit,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        # Only the daily window is enabled by default
+        entity_registry_enabled_default=window == "24h",
+        metric=metric,
+        window=window,
+    )
+    for metric, name, icon, unit in _ROLLING_METRICS
+    for window in ("1h", "24h", "7d", "30d")
+]
+
+# Daily energy integrated from power samples: (channel, name, icon)
+_INTEGRATED_CHANNELS = [
+    ("pv", "Live Daily PV Generation", "mdi:solar-power-variant"),
+    ("load", "Live Daily Load", "mdi:home-lightning-bolt"),
+    ("import", "Live Daily Grid Consumption", "mdi:transmission-tower-import"),
+    ("export", "Live Daily Feed-in", "mdi:transmission-tower-export"),
+    ("charge", "Live Daily Battery Charge", "mdi:battery-plus"),
+    ("discharge", "Live Daily Battery Discharge", "mdi:battery-minus"),
+    ("ev", "Live Daily EV Charging Energy", "mdi:car-electric"),
+]
+
+INTEGRATED_ENERGY_SENSORS: List[AlphaESSIntegratedSensorDescription] = [
+    AlphaESSIntegratedSensorDescription(
+        key=f"integrated_{channel}",
+        name=name,
+        icon=icon,
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL,
+        suggested_display_precision=2,
+        channel=channel,
+    )
+    for channel, name, icon in _INTEGRATED_CHANNELS
+]
+
+BATTERY_WEAR_SENSORS: List[AlphaESSWearSensorDescription] = [
+    AlphaESSWearSensorDescription(
+        key="equivalent_full_cycles",
+        name="Battery Equivalent Full Cycles",
+        icon="mdi:battery-sync",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=2,
+        value=lambda wear: wear.cycles.equivalent_full_cycles,
+    ),
+    AlphaESSWearSensorDescription(
+        key="lifetime_charge",
+        name="Battery Lifetime Charge",
+        icon="mdi:battery-plus",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=1,
+        value=lambda wear: wear.charged,
+    ),
+    AlphaESSWearSensorDescription(
+        key="lifetime_discharge",
+        name="Battery Lifetime Discharge",
+        icon="mdi:battery-minus",
+        native_unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        device_class=SensorDeviceClass.ENERGY,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=1,
+        value=lambda wear: wear.discharged,
+    ),
+]
+
+PHASE_IMBALANCE_SENSORS: List[AlphaESSPhaseSensorDescription] = [
+    AlphaESSPhaseSensorDescription(
+        key="phase_imbalance",
+        name="Grid Phase Imbalance",
+        icon="mdi:scale-unbalanced",
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value=lambda balance, now: balance.current,
+    ),
+    AlphaESSPhaseSensorDescription(
+        key="peak_phase",
+        name="Grid Peak Phase",
+        icon="mdi:sine-wave",
+        device_class=SensorDeviceClass.ENUM,
+        options=["L1", "L2", "L3"],
+        value=lambda balance, now: balance.peak_phase,
+    ),
+    *[
+        AlphaESSPhaseSensorDescription(
+            key=f"phase_imbalance_{window}",
+            name=f"Grid Phase Imbalance {window}",
+            icon="mdi:scale-unbalanced",
+            native_unit_of_measurement=PERCENTAGE,
+            state_class=SensorStateClass.MEASUREMENT,
+            suggested_display_precision=1,
+            value=lambda balance, now, window=window: balance.average(window, now),
+        )
+        for window in ("1h", "24h")
+    ],
+    *[
+        AlphaESSPhaseSensorDescription(
+            key=f"phase_imbalance_time_{window}",
+            name=f"Grid Phase Imbalance Time {window}",
+            icon="mdi:timer-alert-outline",
+            native_unit_of_measurement=UnitOfTime.MINUTES,
+            device_class=SensorDeviceClass.DURATION,
+            state_class=SensorStateClass.MEASUREMENT,
+            suggested_display_precision=0,
+            value=lambda balance, now, window=window: balance.minutes_above(window, now),
+        )
+        for window in ("1h", "24h")
+    ],
+]
+
 SUPPORT_DISCHARGE_AND_CHARGE_BUTTON_DESCRIPTIONS: List[AlphaESSButtonDescription] = [
     AlphaESSButtonDescription(
         key=AlphaESSNames.ButtonDischargeFifteen,
@@ -876,6 +1009,31 @@ DISCHARGE_AND_CHARGE_NUMBERS: List[AlphaESSNumberDescription] = [
     )
 ]
 
+PEAK_SHAVING_NUMBERS: List[AlphaESSNumberDescription] = [
+    AlphaESSNumberDescription(
+        key=AlphaESSNames.PeakShavingLimit,
+        name="Peak Shaving Import Limit",
+        entity_category=EntityCategory.CONFIG,
+        icon="mdi:transmission-tower-import",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        native_min_value=0,
+        native_max_value=50000,
+        native_step=100,
+        mode=NumberMode.BOX,
+    ),
+    AlphaESSNumberDescription(
+        key=AlphaESSNames.PeakShavingPhaseLimit,
+        name="Peak Shaving Phase Limit",
+        entity_category=EntityCategory.CONFIG,
+        icon="mdi:sine-wave",
+        native_unit_of_measurement=UnitOfPower.WATT,
+        native_min_value=0,
+        native_max_value=20000,
+        native_step=100,
+        mode=NumberMode.BOX,
+    ),
+]
+
 CHARGE_DISCHARGE_TIMES: List[AlphaESSTimeDescription] = [
     AlphaESSTimeDescription(
         key=AlphaESSNames.ChargeStartTime1,
@@ -969,6 +1127,22 @@ EV_CHARGER_BINARY_SENSORS: List[AlphaESSBinarySensorDescription] = [
     ),
 ]
 
+LOCAL_IP_HEALTH_BINARY_SENSOR = AlphaESSBinarySensorDescription(
+    key=AlphaESSNames.localApiReachable,
+    name="Local API Reachable",
+    icon="mdi:lan-connect",
+    device_class=BinarySensorDeviceClass.CONNECTIVITY,
+    entity_category=EntityCategory.DIAGNOSTIC,
+)
+
+PV_STRING_MISMATCH_BINARY_SENSOR = AlphaESSBinarySensorDescription(
+    key=AlphaESSNames.pvStringMismatch,
+    name="PV String Mismatch",
+    icon="mdi:solar-panel",
+    device_class=BinarySensorDeviceClass.PROBLEM,
+    entity_category=EntityCategory.DIAGNOSTIC,
+)
+
 LOCAL_IP_SYSTEM_SENSORS: List[AlphaESSSensorDescription] = [
     AlphaESSSensorDescription(
         key=AlphaESSNames.localIP,
@@ -1102,6 +1276,24 @@ EV_CHARGER_NUMBERS: List[AlphaESSNumberDescription] = [
     ),
 ]
 
+EV_CHARGER_SWITCHES: List[AlphaESSSwitchDescription] = [
+    AlphaESSSwitchDescription(
+        key=AlphaESSNames.SolarSurplusCharging,
+        name="Solar Surplus Charging",
+        icon="mdi:solar-power",
+        entity_category=EntityCategory.CONFIG,
+    ),
+]
+
+PEAK_SHAVING_SWITCHES: List[AlphaESSSwitchDescription] = [
+    AlphaESSSwitchDescription(
+        key=AlphaESSNames.PeakShaving,
+        name="Peak Shaving",
+        icon="mdi:chart-bell-curve-cumulative",
+        entity_category=EntityCategory.CONFIG,
+    ),
+]
+
 CHARGE_DISCHARGE_SWITCHES: List[AlphaESSSwitchDescription] = [
     AlphaESSSwitchDescription(
         key=AlphaESSNames.GridChargeEnabled,
@@ -0,0 +1,171 @@
+"""Replay recorded power data against charge/discharge configs.
+
+Like the optimizer, this is plain NumPy so a replay can run in an executor.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Any, Optional, Sequence
+
+import numpy as np
+
+from .optimizer import (
+    MODE_CHARGE,
+    MODE_DISCHARGE,
+    MODE_IDLE,
+    SLOT_SECONDS,
+    SLOTS,
+    BatteryLimits,
+    battery_step,
+    grid_cost,
+    grid_energy,
+)
+
+
+@dataclass
+class ScheduleConfig:
+    """What ChargeConfig and DisChargeConfig tell the inverter to do."""
+
+    grid_charge: bool
+    charge_windows: list[tuple[str, str]]
+    discharge_control: bool
+    discharge_windows: list[tuple[str, str]]
+    max_soc: float  # batHighCap (%)
+    min_soc: float  # batUseCap (%)
+
+
+@dataclass
+class SimulationResult:
+    """Energy totals (kWh) and cost of one config over the replayed period."""
+
+    grid_import: float
+    grid_export: float
+    cost: float
+    charged: float
+    discharged: float
+    end_soc: float
+    min_soc: float
+
+
+def _seconds(text: str) -> int:
+    """Return the seconds after midnight of an "HH:MM" time."""
+    hours, minutes = str(text).split(":")[:2]
+    return int(hours) * 3600 + int(minutes) * 60
+
+
+def window_mask(seconds_of_day: np.ndarray, windows: Sequence[tuple[str, str]]) -> np.ndarray:
+    """Return where any window is active; equal start and end means unset.
+
+    A window whose end is before its start runs over midnight.
+    """
+    mask = np.zeros(seconds_of_day.shape, dtype=bool)
+    for start, end in windows:
+        start, end = _seconds(start), _seconds(end)
+        if start < end:
+            mask |= (seconds_of_day >= start) & (seconds_of_day < end)
+        elif start > end:
+            mask |= (seconds_of_day >= start) | (seconds_of_day < end)
+    return mask
+
+
+def config_modes(seconds_of_day: np.ndarray, config: ScheduleConfig) -> np.ndarray:
+    """Return the battery mode at each time of day under a config.
+
+    Charge windows only apply with grid charging on and take precedence.
+    With discharge control off the battery discharges whenever the house
+    needs it; with it on, only inside the discharge windows.
+    """
+    if config.discharge_control:
+        modes = np.where(window_mask(seconds_of_day, config.discharge_windows), MODE_DISCHARGE, MODE_IDLE)
+    else:
+        modes = np.full(seconds_of_day.shape, MODE_DISCHARGE)
+    if config.grid_charge:
+        modes = np.where(window_mask(seconds_of_day, config.charge_windows), MODE_CHARGE, modes)
+    return modes.astype(np.int8)
+
+
+def samples_from_rows(rows: Sequence[Sequence[Any]], time_index: int, ppv_index: int, load_index: int):
+    """Return local epoch seconds, PV and load (W) from cached OneDayPower rows.
+
+    Upload times are local, so the seconds keep the inverter's time of day.
+    """
+    times = np.array([row[time_index] for row in rows], dtype="datetime64[s]").astype(np.int64)
+    ppv = np.array([_to_float(row[ppv_index]) for row in rows])
+    load = np.array([_to_float(row[load_index]) for row in rows])
+    return times, ppv, load
+
+
+def _to_float(value: Any) -> float:
+    """Convert an API value to float, using NaN for missing values."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def simulate(
+    local_seconds: Sequence[float],
+    load: Sequence[float],
+    pv: Sequence[float],
+    configs: Sequence[ScheduleConfig],
+    limits: BatteryLimits,
+    soc: float,
+    price_profile: Optional[Sequence[float]] = None,
+    export_price: float = 0.0,
+) -> list[SimulationResult]:
+    """Replay recorded load and PV (W) against several configs at once.
+
+    Every config steps through time together as one array, so the cost of
+    a replay hardly grows with the number of configs. Each sample lasts
+    until the next one; gaps in the recording count as one normal interval
+    so missing hours do not move energy. ``price_profile`` gives import
+    prices for the quarter-hours of a day from midnight.
+    """
+    order = np.argsort(local_seconds, kind="stable")
+    local_seconds = np.asarray(local_seconds, dtype=float)[order]
+    net = np.nan_to_num(np.asarray(load, dtype=float)[order] - np.asarray(pv, dtype=float)[order]) / 1000
+    if len(local_seconds) < 2:
+        raise ValueError("Not enough recorded samples to simulate")
+
+    spacing = np.diff(local_seconds)
+    normal = float(np.median(spacing))
+    spacing = np.where(spacing > 2 * normal, normal, spacing)
+    hours = np.append(spacing, normal) / 3600
+    net_kwh = net * hours
+
+    seconds_of_day = local_seconds % 86400
+    modes = np.stack([config_modes(seconds_of_day, config) for config in configs])
+    limits = replace(
+        limits,
+        min_soc=np.array([config.min_soc for config in configs], dtype=float),
+        max_soc=np.array([config.max_soc for config in configs], dtype=float),
+    )
+
+    # Only the battery state is sequential; totals are summed afterwards
+    energy = np.full(len(configs), limits.capacity * soc / 100)
+    stored = np.empty(modes.shape)
+    lowest = energy.copy()
+    for step in range(len(net_kwh)):
+        stored[:, step] = battery_step(energy, modes[:, step], net_kwh[step], limits, hours[step])
+        energy = energy + stored[:, step]
+        np.minimum(lowest, energy, out=lowest)
+
+    grid = grid_energy(net_kwh, stored, limits.efficiency)
+    prices = (
+        np.asarray(price_profile, dtype=float)[(seconds_of_day // SLOT_SECONDS).astype(int) % SLOTS]
+        if price_profile is not None else np.zeros(len(net_kwh))
+    )
+    cost = grid_cost(grid, prices, export_price).sum(axis=1)
+
+    return [
+        SimulationResult(
+            grid_import=float(np.maximum(grid[index], 0).sum()),
+            grid_export=float(-np.minimum(grid[index], 0).sum()),
+            cost=float(cost[index]),
+            charged=float(np.maximum(stored[index], 0).sum()),
+            discharged=float(-np.minimum(stored[index], 0).sum()),
+            end_soc=float(energy[index] / limits.capacity * 100),
+            min_soc=float(lowest[index] / limits.capacity * 100),
+        )
+        for index in range(len(configs))
+    ]
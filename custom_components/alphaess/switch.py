@@ -3,15 +3,19 @@ from typing import Any, List
 import logging
 
 from homeassistant.components.switch import SwitchEntity
+from homeassistant.const import STATE_ON
+from homeassistant.helpers.restore_state import RestoreEntity
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
 
 from .const import (
     DOMAIN, INVERTER_SETTING_BLACKLIST, CONF_SERIAL_NUMBER, SUBENTRY_TYPE_INVERTER,
+    SUBENTRY_TYPE_EV_CHARGER, CONF_PARENT_INVERTER,
 )
 from .coordinator import AlphaESSDataUpdateCoordinator
-from .enums import AlphaESSNames
-from .sensorlist import CHARGE_DISCHARGE_SWITCHES
-from .device import build_inverter_device_info
+from .sensorlist import CHARGE_DISCHARGE_SWITCHES, EV_CHARGER_SWITCHES, PEAK_SHAVING_SWITCHES
+from .device import build_inverter_device_info, build_ev_charger_device_info
+from .entity_manager import SubentryEntityManager
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
@@ -24,13 +28,29 @@ async def async_setup_entry(hass, entry, async_add_entities) -> None:
         description.key: description for description in CHARGE_DISCHARGE_SWITCHES
     }
 
-    for subentry in entry.subentries.values():
+    def _build_ev_entities(serial) -> List[SwitchEntity]:
+        data = coordinator.data[serial]
+        if not data.get("EV Charger S/N"):
+            return []
+        ev_device_info = build_ev_charger_device_info(data)
+        return [
+            AlphaEVSolarSwitch(coordinator, serial, entry, description, device_info=ev_device_info)
+            for description in EV_CHARGER_SWITCHES
+        ]
+
+    def _build_subentry_entities(subentry) -> List[SwitchEntity]:
+        if subentry.subentry_type == SUBENTRY_TYPE_EV_CHARGER:
+            parent_serial = subentry.data.get(CONF_PARENT_INVERTER)
+            if not parent_serial or parent_serial not in coordinator.data:
+                return []
+            return _build_ev_entities(parent_serial)
+
         if subentry.subentry_type != SUBENTRY_TYPE_INVERTER:
-            continue
+            return []
 
         serial = subentry.data.get(CONF_SERIAL_NUMBER)
         if not serial or serial not in coordinator.data:
-            continue
+            return []
 
         data = coordinator.data[serial]
         model = data.get("Model")
@@ -47,12 +67,26 @@ async def async_setup_entry(hass, entry, async_add_entities) -> None:
                         device_info=inverter_device_info,
                     )
                 )
+            for description in PEAK_SHAVING_SWITCHES:
+                switch_entities.append(
+                    AlphaPeakShavingSwitch(
+                        coordinator, serial, entry, description,
+                        device_info=inverter_device_info,
+                    )
+                )
 
-        if switch_entities:
-            async_add_entities(
-                switch_entities,
-                config_subentry_id=subentry.subentry_id,
-            )
+        # Auto-discovered EV charger switches (no dedicated EV subentry)
+        ev_subentry_serials = {
+            sub.data.get(CONF_SERIAL_NUMBER)
+            for sub in entry.subentries.values()
+            if sub.subentry_type == SUBENTRY_TYPE_EV_CHARGER
+        }
+        if data.get("EV Charger S/N") not in ev_subentry_serials:
+            switch_entities.extend(_build_ev_entities(serial))
+
+        return switch_entities
+
+    SubentryEntityManager(hass, entry, async_add_entities, _build_subentry_entities).async_setup()
 
 
 class AlphaSwitch(CoordinatorEntity, SwitchEntity):
@@ -68,7 +102,6 @@ class AlphaSwitch(CoordinatorEntity, SwitchEntity):
         self._icon = description.icon
         self._entity_category = description.entity_category
         self._coordinator_key = description.coordinator_key
-        self._optimistic_state: bool | None = None
 
         if device_info:
             self._attr_device_info = device_info
@@ -76,72 +109,185 @@ class AlphaSwitch(CoordinatorEntity, SwitchEntity):
     @property
     def is_on(self) -> bool | None:
         """Return True if the switch is on."""
-        if self._optimistic_state is not None:
-            return self._optimistic_state
-        data = self._coordinator.data.get(self._serial, {})
-        value = data.get(self._coordinator_key)
+        value = self._coordinator.get_value(self._serial, self._coordinator_key)
         if value is None:
             return None
         return int(value) == 1
 
-    def _handle_coordinator_update(self) -> None:
-        """Clear optimistic state when coordinator provides fresh data."""
-        self._optimistic_state = None
-        super()._handle_coordinator_update()
-
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on (enable) the setting."""
-        self._optimistic_state = True
-        self.async_write_ha_state()
         await self._set_value(1)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off (disable) the setting."""
-        self._optimistic_state = False
-        self.async_write_ha_state()
         await self._set_value(0)
 
     async def _set_value(self, value: int) -> None:
-        """Send the updated config to the API."""
-        data = self._coordinator.data.get(self._serial, {})
-
-        if self._coordinator_key == "gridCharge":
-            bat_high_cap = data.get(AlphaESSNames.batHighCap, 90)
-            result = await self._coordinator.api.updateChargeConfigInfo(
-                self._serial,
-                bat_high_cap,
-                value,
-                data.get("charge_timeChae1") or "00:00",
-                data.get("charge_timeChae2") or "00:00",
-                data.get("charge_timeChaf1") or "00:00",
-                data.get("charge_timeChaf2") or "00:00",
-            )
-            _LOGGER.info(
-                "Updated gridCharge for %s to %s - Result: %s",
-                self._serial, value, result,
-            )
-        elif self._coordinator_key == "ctrDis":
-            bat_use_cap = data.get(AlphaESSNames.batUseCap, 10)
-            result = await self._coordinator.api.updateDisChargeConfigInfo(
-                self._serial,
-                bat_use_cap,
-                value,
-                data.get("discharge_timeDise1") or "00:00",
-                data.get("discharge_timeDise2") or "00:00",
-                data.get("discharge_timeDisf1") or "00:00",
-                data.get("discharge_timeDisf2") or "00:00",
-            )
-            _LOGGER.info(
-                "Updated ctrDis for %s to %s - Result: %s",
-                self._serial, value, result,
-            )
-
-        # No immediate refresh — optimistic state is shown until the next
-        # scheduled coordinator update confirms the value from the API.
+        """Queue the updated config for the API, showing it as pending meanwhile."""
+        section = "ChargeConfig" if self._coordinator_key == "gridCharge" else "DisChargeConfig"
+        self._coordinator.async_queue_config(self._serial, section, {self._coordinator_key: value})
+
+    @property
+    def available(self) -> bool:
+        """Changes made while the cloud is down are queued until it returns."""
+        return self.coordinator.last_update_success
+
+    @property
+    def name(self):
+        return f"{self._name}"
+
+    @property
+    def unique_id(self):
+        return f"{self._config.entry_id}_{self._serial} - {self._name}"
+
+    @property
+    def entity_category(self):
+        return self._entity_category
+
+    @property
+    def icon(self):
+        return self._icon
+
+
+class AlphaEVSolarSwitch(CoordinatorEntity, SwitchEntity, RestoreEntity):
+    """Switch that lets the coordinator charge the EV from solar surplus."""
+
+    def __init__(self, coordinator, serial, config, description, device_info=None):
+        super().__init__(coordinator)
+        self._coordinator = coordinator
+        self._serial = serial
+        self._config = config
+        self._name = description.name
+        self._icon = description.icon
+        self._entity_category = description.entity_category
+
+        if device_info:
+            self._attr_device_info = device_info
+
+    async def async_added_to_hass(self) -> None:
+        """Resume solar surplus charging if it was on before a restart."""
+        await super().async_added_to_hass()
+        last_state = await self.async_get_last_state()
+        if last_state is not None and last_state.state == STATE_ON:
+            self._coordinator.async_set_ev_solar(self._serial, True)
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop controlling the charger when the entity goes away."""
+        self._coordinator.async_set_ev_solar(self._serial, False)
+        await super().async_will_remove_from_hass()
+
+    @property
+    def is_on(self) -> bool:
+        """Return True if solar surplus charging is active."""
+        return self._serial in self._coordinator.ev_solar
+
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        """Start following the solar surplus."""
+        self._coordinator.async_set_ev_solar(self._serial, True)
+        self.async_write_ha_state()
+
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        """Stop following the solar surplus; the charger keeps its last setting."""
+        self._coordinator.async_set_ev_solar(self._serial, False)
+        self.async_write_ha_state()
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Expose the current the surplus supports."""
+        controller = self._coordinator.ev_solar.get(self._serial)
+        if controller is None:
+            return None
+        return {"surplus_current": controller.target}
+
+    @property
+    def available(self) -> bool:
+        """EV charger controls require cloud API to function."""
+        if not self.coordinator.last_update_success:
+            return False
+        return self._coordinator.cloud_available
+
+    @property
+    def name(self):
+        return f"{self._name}"
+
+    @property
+    def unique_id(self):
+        return f"{self._config.entry_id}_{self._serial} - {self._name}"
+
+    @property
+    def entity_category(self):
+        return self._entity_category
+
+    @property
+    def icon(self):
+        return self._icon
+
+
+class AlphaPeakShavingSwitch(CoordinatorEntity, SwitchEntity, RestoreEntity):
+    """Switch that lets the coordinator open a discharge window during import peaks."""
+
+    def __init__(self, coordinator, serial, config, description, device_info=None):
+        super().__init__(coordinator)
+        self._coordinator = coordinator
+        self._serial = serial
+        self._config = config
+        self._name = description.name
+        self._icon = description.icon
+        self._entity_category = description.entity_category
+
+        if device_info:
+            self._attr_device_info = device_info
+
+    async def async_added_to_hass(self) -> None:
+        """Resume peak shaving, and any borrowed window, after a restart."""
+        await super().async_added_to_hass()
+        shaver = self._coordinator.peak_shaver(self._serial)
+        last_state = await self.async_get_last_state()
+        if last_state is None:
+            return
+
+        shaver.enabled = last_state.state == STATE_ON
+        active_until = dt_util.parse_datetime(last_state.attributes.get("active_until") or "")
+        shaver.restore_state(
+            active_until.timestamp() if active_until else None,
+            last_state.attributes.get("saved_window"),
+            last_state.attributes.get("window_start"),
+        )
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop watching for peaks; a borrowed window is still given back."""
+        self._coordinator.peak_shaver(self._serial).enabled = False
+        await super().async_will_remove_from_hass()
+
+    @property
+    def is_on(self) -> bool:
+        """Return True if peak shaving is enabled."""
+        return self._coordinator.peak_shaver(self._serial).enabled
+
+    async def async_turn_on(self, **kwargs: Any) -> None:
+        self._coordinator.peak_shaver(self._serial).enabled = True
+        self.async_write_ha_state()
+
+    async def async_turn_off(self, **kwargs: Any) -> None:
+        """Disable peak shaving; an open window is restored on the next update."""
+        self._coordinator.peak_shaver(self._serial).enabled = False
+        self.async_write_ha_state()
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Expose the borrowed window so it survives a restart."""
+        shaver = self._coordinator.peak_shaver(self._serial)
+        if not shaver.active:
+            return {"active_until": None, "saved_window": None, "window_start": None}
+        return {
+            "active_until": dt_util.utc_from_timestamp(shaver.active_until).isoformat(),
+            "saved_window": list(shaver.saved_window),
+            "window_start": shaver.window_start,
+        }
 
     @property
     def available(self) -> bool:
-        """Switch controls require cloud API to function."""
+        """Discharge windows are written through the cloud API."""
         if not self.coordinator.last_update_success:
             return False
         return self._coordinator.cloud_available
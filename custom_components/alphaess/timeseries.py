@@ -0,0 +1,107 @@
+"""Compact per-inverter power time series built from OneDayPower."""
+from __future__ import annotations
+
+from array import array
+from typing import Any, Dict, List, Optional
+
+from homeassistant.util import dt as dt_util
+
+# OneDayPower samples every 5 minutes, so this keeps two days per inverter
+DEFAULT_MAX_SAMPLES = 2 * 288
+
+
+def _to_float(value: Any) -> float:
+    """Convert an API value to float, using NaN for missing values."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+class PowerSeries:
+    """Array-backed time series of one inverter's OneDayPower samples.
+
+    Timestamps are epoch seconds (float64) and every column is float32,
+    which keeps a day of samples to a few kilobytes instead of a list of
+    dicts. Columns are:
+
+    - ppv: PV generation (W)
+    - load: household load (W)
+    - grid: net grid power, import positive (W)
+    - bat: battery power, discharge positive (W), derived from the balance
+    - cbat: battery state of charge (%)
+
+    Samples are appended incrementally; only entries newer than the last
+    seen ``uploadTime`` are parsed on each update.
+    """
+
+    COLUMNS = ("ppv", "load", "grid", "bat", "cbat")
+
+    def __init__(self, max_samples: int = DEFAULT_MAX_SAMPLES) -> None:
+        self.max_samples = max_samples
+        self.timestamps = array("d")
+        self.columns: Dict[str, array] = {name: array("f") for name in self.COLUMNS}
+        self._last_upload_time: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def last_timestamp(self) -> Optional[float]:
+        """Return the epoch timestamp of the newest sample."""
+        return self.timestamps[-1] if self.timestamps else None
+
+    def latest(self, column: str) -> Optional[float]:
+        """Return the newest value of a column."""
+        values = self.columns[column]
+        return values[-1] if values else None
+
+    def extend(self, one_day_power: Optional[List[Dict[str, Any]]]) -> int:
+        """Append samples newer than the last seen one and return how many were added."""
+        if not one_day_power:
+            return 0
+
+        # Upload times are fixed-format strings, so they compare chronologically
+        if (
+            len(one_day_power) > 1
+            and (one_day_power[0].get("uploadTime") or "") > (one_day_power[-1].get("uploadTime") or "")
+        ):
+            one_day_power = one_day_power[::-1]
+
+        # Walk back from the newest sample until we reach one already seen
+        start = len(one_day_power)
+        last = self._last_upload_time
+        while start > 0:
+            upload_time = one_day_power[start - 1].get("uploadTime")
+            if last is not None and upload_time is not None and upload_time <= last:
+                break
+            start -= 1
+
+        added = 0
+        time_zone = dt_util.get_default_time_zone()
+        for sample in one_day_power[start:]:
+            upload_time = sample.get("uploadTime")
+            parsed = dt_util.parse_datetime(upload_time) if upload_time else None
+            if parsed is None:
+                continue
+
+            ppv = _to_float(sample.get("ppv"))
+            load = _to_float(sample.get("load"))
+            grid = _to_float(sample.get("gridCharge")) - _to_float(sample.get("feedIn"))
+
+            self.timestamps.append(parsed.replace(tzinfo=time_zone).timestamp())
+            self.columns["ppv"].append(ppv)
+            self.columns["load"].append(load)
+            self.columns["grid"].append(grid)
+            self.columns["bat"].append(load - ppv - grid)
+            self.columns["cbat"].append(_to_float(sample.get("cbat")))
+            self._last_upload_time = upload_time
+            added += 1
+
+        overflow = len(self.timestamps) - self.max_samples
+        if overflow > 0:
+            del self.timestamps[:overflow]
+            for values in self.columns.values():
+                del values[:overflow]
+
+        return added
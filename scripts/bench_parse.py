@@ -0,0 +1,116 @@
+"""Benchmark the per-section parse cache of the coordinator.
+
+Parses a fleet of inverters tick after tick, where only LastPower changes
+between ticks, once with the section cache cleared before every tick (every
+section re-parsed) and once with it kept. Run from the repository root in an
+environment with the integration's requirements installed:
+
+    python scripts/bench_parse.py --inverters 50 --ticks 200
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from pathlib import Path
+import sys
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.alphaess.coordinator import (  # noqa: E402
+    AlphaESSDataUpdateCoordinator,
+    DataProcessor,
+    InverterDataParser,
+)
+
+
+def _payload(index: int) -> dict:
+    """Return the ESS list entry of one inverter with every section filled."""
+    return {
+        "sysSn": f"AL{index:010d}",
+        "minv": "SMILE5-INV",
+        "mbat": "SMILE5-BAT",
+        "poinv": 5,
+        "popv": 6.6,
+        "emsStatus": "Normal",
+        "usCapacity": 95,
+        "surplusCobat": 8.2,
+        "cobat": 10.1,
+        "LocalIPData": {
+            "ip": f"192.168.1.{index % 250 + 2}",
+            "status": {"devstatus": 1, "serverstatus": 1, "wifistatus": 1, "connssid": "home",
+                       "wifidhcp": 1, "wifiip": "192.168.1.20", "wifimask": "255.255.255.0",
+                       "wifigateway": "192.168.1.1"},
+            "device_info": {"sn": f"AL{index:010d}", "key": "KEY", "hw": "V1", "sw": "V2",
+                            "apn": "", "username": "", "password": "", "ethmoudle": 1, "g4moudle": 0},
+        },
+        "EVData": [{"evchargerSn": f"EV{index:08d}", "evchargerModel": "SMILE-EVCT11"}],
+        "EVStatus": {"evchargerStatus": 2},
+        "EVCurrent": {"currentsetting": 16},
+        "SumData": {"eload": 12000.5, "totalIncome": 850.2, "epvtotal": 15000.1, "treeNum": 20,
+                    "carbonNum": 9000, "epvtoday": 18.4, "todayIncome": 2.1, "moneyType": "EUR",
+                    "eselfConsumption": 0.71, "eselfSufficiency": 0.64},
+        "OneDateEnergy": {"epv": 18.4, "eOutput": 4.2, "eGridCharge": 0.5, "eCharge": 6.1,
+                          "eInput": 3.3, "eDischarge": 5.8, "eChargingPile": 7.0,
+                          "theDate": "2024-06-01"},
+        "ChargeConfig": {"gridCharge": 1, "batHighCap": 90, "timeChaf1": "01:00", "timeChae1": "05:00",
+                         "timeChaf2": "00:00", "timeChae2": "00:00"},
+        "DisChargeConfig": {"ctrDis": 1, "batUseCap": 10, "timeDisf1": "17:00", "timeDise1": "21:00",
+                            "timeDisf2": "00:00", "timeDise2": "00:00"},
+    }
+
+
+def _last_power(tick: int) -> dict:
+    """Return a LastPower payload that differs on every tick."""
+    return {
+        "soc": 50 + tick % 40, "pbat": 1200 - tick, "pload": 800 + tick, "ppv": 3000 - tick,
+        "pgrid": -400 + tick, "pev": 0, "prealL1": 500, "prealL2": 300, "prealL3": 200,
+        "ppvDetail": {"ppv1": 1500, "ppv2": 1500 - tick, "ppv3": 0, "ppv4": 0, "pmeterDc": 0},
+        "pgridDetail": {"pmeterL1": -100, "pmeterL2": -150, "pmeterL3": -150 + tick},
+        "pevDetail": {"ev1Power": 0},
+    }
+
+
+def _coordinator() -> AlphaESSDataUpdateCoordinator:
+    """Return a coordinator with just the state the parse path uses."""
+    coordinator = AlphaESSDataUpdateCoordinator.__new__(AlphaESSDataUpdateCoordinator)
+    coordinator.parser = InverterDataParser(DataProcessor())
+    coordinator._section_cache = {}
+    coordinator.power_series = {}
+    coordinator._phase_trackers = {}
+    return coordinator
+
+
+async def _run(inverters: int, ticks: int, cached: bool) -> float:
+    """Return the mean parse time (ms) of one tick over the whole fleet."""
+    coordinator = _coordinator()
+    units = [_payload(index) for index in range(inverters)]
+    elapsed = 0.0
+    for tick in range(ticks):
+        if not cached:
+            coordinator._section_cache.clear()
+        for unit in units:
+            unit["LastPower"] = _last_power(tick)
+        started = time.perf_counter()
+        for unit in units:
+            await coordinator._parse_inverter_data(unit)
+        elapsed += time.perf_counter() - started
+    return elapsed / ticks * 1000
+
+
+def main() -> None:
+    """Print the uncached and cached parse time per tick."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--inverters", type=int, default=50)
+    parser.add_argument("--ticks", type=int, default=200)
+    args = parser.parse_args()
+
+    uncached = asyncio.run(_run(args.inverters, args.ticks, cached=False))
+    cached = asyncio.run(_run(args.inverters, args.ticks, cached=True))
+    print(f"{args.inverters} inverters, {args.ticks} ticks")
+    print(f"  every section parsed: {uncached:.2f} ms/tick")
+    print(f"  section cache:        {cached:.2f} ms/tick ({uncached / cached:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()